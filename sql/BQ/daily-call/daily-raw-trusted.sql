@@ -1 +1,2 @@
-CALL `sauter-university-challenger.procedure.process_bronze_to_silver`();
\ No newline at end of file
+CALL `sauter-university-challenger.procedure.setup_incremental`();
+CALL `sauter-university-challenger.procedure.process_bronze_to_silver_incremental`(7);
\ No newline at end of file
@@ -1 +1 @@
-CALL `sauter-university-challenger.procedure.process_silver_to_gold`();
\ No newline at end of file
+CALL `sauter-university-challenger.procedure.process_silver_to_gold_incremental`();
\ No newline at end of file
@@ -0,0 +1,188 @@
+-- Versão incremental de process_bronze_to_silver.
+-- Em vez de recriar a silver com todo o histórico desde 2015, lê da bronze só a janela
+-- a partir do último dia já processado (menos `dias_reprocessamento`, para pegar
+-- revisões da ONS) e aplica o delta com MERGE. A completude de cada reservatório é
+-- mantida no resumo `silver.ena_completude_reservatorio`, somando apenas os dias novos.
+-- Requer `procedure.setup_incremental` (procedure-setup-incremental.sql).
+CREATE OR REPLACE PROCEDURE `sauter-university-challenger.procedure.process_bronze_to_silver_incremental`(dias_reprocessamento INT64)
+OPTIONS(strict_mode=false)
+BEGIN
+  -- Resumo vazio (primeira execução) => janela começa em 2015-01-01, ou seja, carga completa
+  DECLARE inicio_janela DATE DEFAULT (
+    SELECT GREATEST(
+      DATE('2015-01-01'),
+      DATE_SUB(COALESCE(MAX(ultima_data), DATE('2015-01-01')), INTERVAL dias_reprocessamento DAY)
+    )
+    FROM `sauter-university-challenger.silver.ena_completude_reservatorio`
+  );
+  DECLARE total_dias_esperados INT64 DEFAULT DATE_DIFF(CURRENT_DATE(), DATE('2015-01-01'), DAY) + 1;
+
+  -- 1) Delta: linhas válidas e normalizadas da janela, uma por (reservatório, dia)
+  CREATE TEMP TABLE delta_ena AS
+  SELECT
+    LOWER(TRIM(CAST(nom_reservatorio AS STRING))) AS nom_reservatorio,
+    LOWER(TRIM(CAST(tip_reservatorio AS STRING))) AS tip_reservatorio,
+    LOWER(TRIM(CAST(nom_bacia AS STRING))) AS nom_bacia,
+    LOWER(TRIM(CAST(nom_subsistema AS STRING))) AS nom_subsistema,
+    CAST(ena_data AS DATETIME) AS ena_data,
+    SAFE_CAST(ena_armazenavel_res_mwmed AS FLOAT64) AS ena_armazenavel_res_mwmed
+  FROM
+    `sauter-university-challenger.bronze.raw_ena-diario-por-reservatorio`
+  WHERE
+    year >= EXTRACT(YEAR FROM inicio_janela)  -- poda as pastas year=... anteriores à janela
+    AND DATE(CAST(ena_data AS DATETIME)) >= inicio_janela
+    AND SAFE_CAST(ena_armazenavel_res_mwmed AS FLOAT64) IS NOT NULL
+    AND CAST(ena_armazenavel_res_mwmed AS STRING) NOT IN ('NaN', 'nan', 'NAN', '')
+    AND TRIM(CAST(ena_armazenavel_res_mwmed AS STRING)) != ''
+  -- Arquivos reingeridos repetem dias: fica a linha da ingestão mais recente
+  QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY LOWER(TRIM(CAST(nom_reservatorio AS STRING))), CAST(ena_data AS DATETIME)
+    ORDER BY ingest_date DESC, _FILE_NAME DESC
+  ) = 1;
+
+  -- 2) Resumo de completude: soma só os dias posteriores ao último dia já contado
+  MERGE `sauter-university-challenger.silver.ena_completude_reservatorio` s
+  USING (
+    SELECT
+      d.nom_reservatorio,
+      COUNT(DISTINCT IF(r.ultima_data IS NULL OR DATE(d.ena_data) > r.ultima_data, DATE(d.ena_data), NULL)) AS dias_novos,
+      MIN(DATE(d.ena_data)) AS primeira_data,
+      MAX(DATE(d.ena_data)) AS ultima_data
+    FROM
+      delta_ena d
+    LEFT JOIN
+      `sauter-university-challenger.silver.ena_completude_reservatorio` r
+      ON r.nom_reservatorio = d.nom_reservatorio
+    GROUP BY d.nom_reservatorio
+  ) n
+  ON s.nom_reservatorio = n.nom_reservatorio
+  WHEN MATCHED THEN UPDATE SET
+    dias_validos = s.dias_validos + n.dias_novos,
+    primeira_data = LEAST(s.primeira_data, n.primeira_data),
+    ultima_data = GREATEST(s.ultima_data, n.ultima_data),
+    atualizado_em = CURRENT_TIMESTAMP()
+  WHEN NOT MATCHED THEN
+    INSERT (nom_reservatorio, dias_validos, primeira_data, ultima_data, completo, atualizado_em)
+    VALUES (n.nom_reservatorio, n.dias_novos, n.primeira_data, n.ultima_data, FALSE, CURRENT_TIMESTAMP());
+
+  -- 3) Mesma regra da carga completa: começa em 2015-01-01 e tem >= 99% dos dias.
+  --    O total esperado cresce a cada dia, então a flag é reavaliada sempre.
+  CREATE TEMP TABLE mudancas_completude AS
+  SELECT nom_reservatorio, novo_completo
+  FROM (
+    SELECT
+      nom_reservatorio,
+      completo,
+      (primeira_data = DATE('2015-01-01') AND dias_validos >= total_dias_esperados * 0.99) AS novo_completo
+    FROM
+      `sauter-university-challenger.silver.ena_completude_reservatorio`
+  )
+  WHERE completo != novo_completo;
+
+  UPDATE `sauter-university-challenger.silver.ena_completude_reservatorio` s
+  SET completo = m.novo_completo, atualizado_em = CURRENT_TIMESTAMP()
+  FROM mudancas_completude m
+  WHERE s.nom_reservatorio = m.nom_reservatorio;
+
+  -- 4) Reservatórios que deixaram de ser completos saem da silver
+  DELETE FROM `sauter-university-challenger.silver.ena-diario-por-reservatorio`
+  WHERE nom_reservatorio IN (SELECT nom_reservatorio FROM mudancas_completude WHERE NOT novo_completo);
+
+  -- 5) Reservatórios que acabaram de ficar completos entram com o histórico anterior à janela
+  --    (evento raro; a janela em si entra no MERGE abaixo)
+  INSERT INTO `sauter-university-challenger.silver.ena-diario-por-reservatorio`
+    (nom_reservatorio, tip_reservatorio, nom_bacia, nom_subsistema, ena_data, ena_armazenavel_res_mwmed, data_ingestao)
+  SELECT
+    LOWER(TRIM(CAST(b.nom_reservatorio AS STRING))),
+    LOWER(TRIM(CAST(b.tip_reservatorio AS STRING))),
+    LOWER(TRIM(CAST(b.nom_bacia AS STRING))),
+    LOWER(TRIM(CAST(b.nom_subsistema AS STRING))),
+    CAST(b.ena_data AS DATETIME),
+    SAFE_CAST(b.ena_armazenavel_res_mwmed AS FLOAT64),
+    CURRENT_DATE()
+  FROM
+    `sauter-university-challenger.bronze.raw_ena-diario-por-reservatorio` b
+  WHERE
+    LOWER(TRIM(CAST(b.nom_reservatorio AS STRING))) IN (
+      SELECT nom_reservatorio FROM mudancas_completude WHERE novo_completo
+    )
+    AND DATE(CAST(b.ena_data AS DATETIME)) >= DATE('2015-01-01')
+    AND DATE(CAST(b.ena_data AS DATETIME)) < inicio_janela
+    AND SAFE_CAST(b.ena_armazenavel_res_mwmed AS FLOAT64) IS NOT NULL
+    AND CAST(b.ena_armazenavel_res_mwmed AS STRING) NOT IN ('NaN', 'nan', 'NAN', '')
+  QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY LOWER(TRIM(CAST(b.nom_reservatorio AS STRING))), CAST(b.ena_data AS DATETIME)
+    ORDER BY b.ingest_date DESC, b._FILE_NAME DESC
+  ) = 1;
+
+  -- 6) Delta dos reservatórios completos; data_ingestao marca só o que mudou hoje
+  MERGE `sauter-university-challenger.silver.ena-diario-por-reservatorio` t
+  USING (
+    SELECT d.*
+    FROM delta_ena d
+    INNER JOIN `sauter-university-challenger.silver.ena_completude_reservatorio` s
+      ON s.nom_reservatorio = d.nom_reservatorio AND s.completo
+  ) d
+  ON t.nom_reservatorio = d.nom_reservatorio
+    AND t.ena_data = d.ena_data
+    AND t.ena_data >= DATETIME(inicio_janela)  -- poda os blocos fora da janela (cluster por ena_data)
+  WHEN MATCHED AND (
+    t.ena_armazenavel_res_mwmed IS DISTINCT FROM d.ena_armazenavel_res_mwmed
+    OR t.tip_reservatorio IS DISTINCT FROM d.tip_reservatorio
+    OR t.nom_bacia IS DISTINCT FROM d.nom_bacia
+    OR t.nom_subsistema IS DISTINCT FROM d.nom_subsistema
+  ) THEN UPDATE SET
+    tip_reservatorio = d.tip_reservatorio,
+    nom_bacia = d.nom_bacia,
+    nom_subsistema = d.nom_subsistema,
+    ena_armazenavel_res_mwmed = d.ena_armazenavel_res_mwmed,
+    data_ingestao = CURRENT_DATE()
+  WHEN NOT MATCHED THEN
+    INSERT (nom_reservatorio, tip_reservatorio, nom_bacia, nom_subsistema, ena_data, ena_armazenavel_res_mwmed, data_ingestao)
+    VALUES (d.nom_reservatorio, d.tip_reservatorio, d.nom_bacia, d.nom_subsistema, d.ena_data, d.ena_armazenavel_res_mwmed, CURRENT_DATE());
+
+
+  #Reservatorios (dimensão pequena: MERGE direto, uma linha por reservatório)
+  MERGE `sauter-university-challenger.silver.reservatorio` t
+  USING (
+    SELECT
+      LOWER(TRIM(CAST(nom_reservatorio AS STRING))) AS nom_reservatorio,
+      LOWER(TRIM(CAST(tip_reservatorio AS STRING))) AS tip_reservatorio,
+      LOWER(TRIM(CAST(nom_bacia AS STRING))) AS nom_bacia,
+      CAST(dat_entrada AS DATETIME) AS dat_entrada,
+      COALESCE(SAFE_CAST(val_produtibilidadeespecifica AS FLOAT64), -1000.0) AS val_produtibilidadeespecifica,
+      COALESCE(SAFE_CAST(val_latitude AS FLOAT64), -1000.0) AS val_latitude,
+      COALESCE(SAFE_CAST(val_longitude AS FLOAT64), -1000.0) AS val_longitude
+    FROM
+      `sauter-university-challenger.bronze.raw_reservatorio`
+    WHERE
+      SAFE_CAST(val_produtibilidadeespecifica AS FLOAT64) IS NOT NULL
+      AND CAST(val_produtibilidadeespecifica AS STRING) NOT IN ('NaN', 'nan', 'NAN', '')
+      AND TRIM(CAST(val_produtibilidadeespecifica AS STRING)) != ''
+    -- MERGE exige uma linha de origem por chave: fica a entrada mais recente
+    QUALIFY ROW_NUMBER() OVER (
+      PARTITION BY LOWER(TRIM(CAST(nom_reservatorio AS STRING)))
+      ORDER BY CAST(dat_entrada AS DATETIME) DESC, ingest_date DESC
+    ) = 1
+  ) s
+  ON t.nom_reservatorio = s.nom_reservatorio
+  WHEN MATCHED AND (
+    t.tip_reservatorio IS DISTINCT FROM s.tip_reservatorio
+    OR t.nom_bacia IS DISTINCT FROM s.nom_bacia
+    OR t.dat_entrada IS DISTINCT FROM s.dat_entrada
+    OR t.val_produtibilidadeespecifica IS DISTINCT FROM s.val_produtibilidadeespecifica
+    OR t.val_latitude IS DISTINCT FROM s.val_latitude
+    OR t.val_longitude IS DISTINCT FROM s.val_longitude
+  ) THEN UPDATE SET
+    tip_reservatorio = s.tip_reservatorio,
+    nom_bacia = s.nom_bacia,
+    dat_entrada = s.dat_entrada,
+    val_produtibilidadeespecifica = s.val_produtibilidadeespecifica,
+    val_latitude = s.val_latitude,
+    val_longitude = s.val_longitude,
+    data_ingestao = CURRENT_DATE()
+  WHEN NOT MATCHED THEN
+    INSERT (nom_reservatorio, tip_reservatorio, nom_bacia, dat_entrada, val_produtibilidadeespecifica, val_latitude, val_longitude, data_ingestao)
+    VALUES (s.nom_reservatorio, s.tip_reservatorio, s.nom_bacia, s.dat_entrada, s.val_produtibilidadeespecifica, s.val_latitude, s.val_longitude, CURRENT_DATE());
+
+END;
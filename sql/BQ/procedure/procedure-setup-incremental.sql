@@ -0,0 +1,118 @@
+-- Setup idempotente das tabelas usadas pelas procedures incrementais.
+-- Pode ser chamado a cada execução diária: só cria/converte o que ainda não existe.
+CREATE SCHEMA IF NOT EXISTS `sauter-university-challenger.silver`;
+CREATE SCHEMA IF NOT EXISTS `sauter-university-challenger.gold`;
+
+CREATE OR REPLACE PROCEDURE `sauter-university-challenger.procedure.setup_incremental`()
+OPTIONS(strict_mode=false)
+BEGIN
+  -- Tabelas silver criadas pela carga completa não têm clustering
+  DECLARE ena_sem_cluster BOOL DEFAULT (
+    SELECT COUNT(*) > 0 AND COUNTIF(clustering_ordinal_position IS NOT NULL) = 0
+    FROM `sauter-university-challenger.silver.INFORMATION_SCHEMA.COLUMNS`
+    WHERE table_name = 'ena-diario-por-reservatorio'
+  );
+  DECLARE reservatorio_sem_cluster BOOL DEFAULT (
+    SELECT COUNT(*) > 0 AND COUNTIF(clustering_ordinal_position IS NOT NULL) = 0
+    FROM `sauter-university-challenger.silver.INFORMATION_SCHEMA.COLUMNS`
+    WHERE table_name = 'reservatorio'
+  );
+  -- A gold era uma materialized view recriada todo dia; passa a ser tabela mantida por MERGE
+  DECLARE gold_e_view BOOL DEFAULT (
+    SELECT COUNT(*) > 0
+    FROM `sauter-university-challenger.gold.INFORMATION_SCHEMA.TABLES`
+    WHERE table_name = 'dados_reservatorios_completo' AND table_type = 'MATERIALIZED VIEW'
+  );
+
+  -- 1) Resumo de completude por reservatório, atualizado só com os dias novos
+  CREATE TABLE IF NOT EXISTS `sauter-university-challenger.silver.ena_completude_reservatorio` (
+    nom_reservatorio STRING NOT NULL,
+    dias_validos INT64 NOT NULL,
+    primeira_data DATE,
+    ultima_data DATE,
+    completo BOOL NOT NULL,
+    atualizado_em TIMESTAMP
+  )
+  CLUSTER BY nom_reservatorio;
+
+  -- 2) Controle da última partição data_ingestao processada por etapa
+  CREATE TABLE IF NOT EXISTS `sauter-university-challenger.silver.controle_incremental` (
+    processo STRING NOT NULL,
+    ultima_data_ingestao DATE NOT NULL,
+    atualizado_em TIMESTAMP
+  );
+
+  -- 3) Silver ENA: particionada por data_ingestao e clusterizada por reservatório/dia
+  IF ena_sem_cluster THEN
+    CREATE OR REPLACE TABLE `sauter-university-challenger.silver.ena-diario-por-reservatorio`
+    PARTITION BY data_ingestao
+    CLUSTER BY nom_reservatorio, ena_data AS
+    SELECT * FROM `sauter-university-challenger.silver.ena-diario-por-reservatorio`;
+  END IF;
+
+  CREATE TABLE IF NOT EXISTS `sauter-university-challenger.silver.ena-diario-por-reservatorio` (
+    nom_reservatorio STRING,
+    tip_reservatorio STRING,
+    nom_bacia STRING,
+    nom_subsistema STRING,
+    ena_data DATETIME,
+    ena_armazenavel_res_mwmed FLOAT64,
+    data_ingestao DATE
+  )
+  PARTITION BY data_ingestao
+  CLUSTER BY nom_reservatorio, ena_data;
+
+  -- 4) Silver reservatório (dimensão)
+  IF reservatorio_sem_cluster THEN
+    CREATE OR REPLACE TABLE `sauter-university-challenger.silver.reservatorio`
+    PARTITION BY data_ingestao
+    CLUSTER BY nom_reservatorio AS
+    SELECT * FROM `sauter-university-challenger.silver.reservatorio`;
+  END IF;
+
+  CREATE TABLE IF NOT EXISTS `sauter-university-challenger.silver.reservatorio` (
+    nom_reservatorio STRING,
+    tip_reservatorio STRING,
+    nom_bacia STRING,
+    dat_entrada DATETIME,
+    val_produtibilidadeespecifica FLOAT64,
+    val_latitude FLOAT64,
+    val_longitude FLOAT64,
+    data_ingestao DATE
+  )
+  PARTITION BY data_ingestao
+  CLUSTER BY nom_reservatorio;
+
+  -- 5) Gold: tabela particionada por mês de ena_data (filtro da API) e clusterizada por reservatório
+  IF gold_e_view THEN
+    DROP MATERIALIZED VIEW `sauter-university-challenger.gold.dados_reservatorios_completo`;
+  END IF;
+
+  CREATE TABLE IF NOT EXISTS `sauter-university-challenger.gold.dados_reservatorios_completo`
+  PARTITION BY DATETIME_TRUNC(ena_data, MONTH)
+  CLUSTER BY nom_reservatorio, nom_bacia, nom_subsistema AS
+  SELECT
+    ena.nom_reservatorio,
+    ena.tip_reservatorio,
+    ena.nom_bacia,
+    ena.nom_subsistema,
+    ena.ena_data,
+    ena.ena_armazenavel_res_mwmed,
+    res.dat_entrada,
+    res.val_produtibilidadeespecifica,
+    res.val_latitude,
+    res.val_longitude,
+    CONCAT(CAST(res.val_latitude AS STRING), ", ", CAST(res.val_longitude AS STRING)) AS coordenadas,
+    CASE
+      WHEN res.val_produtibilidadeespecifica != 0
+           AND res.val_produtibilidadeespecifica IS NOT NULL
+      THEN ena.ena_armazenavel_res_mwmed / res.val_produtibilidadeespecifica
+      ELSE NULL
+    END AS volume_reservatorio
+  FROM
+    `sauter-university-challenger.silver.ena-diario-por-reservatorio` ena
+  INNER JOIN
+    `sauter-university-challenger.silver.reservatorio` res
+    ON ena.nom_reservatorio = res.nom_reservatorio;
+
+END;
@@ -0,0 +1,78 @@
+-- Versão incremental de process_silver_to_gold.
+-- A gold deixa de ser uma materialized view recriada todo dia: é uma tabela
+-- (criada por procedure.setup_incremental) que recebe via MERGE apenas as partições
+-- data_ingestao da silver alteradas desde a última execução, mais o histórico dos
+-- reservatórios cuja dimensão mudou no período.
+CREATE OR REPLACE PROCEDURE `sauter-university-challenger.procedure.process_silver_to_gold_incremental`()
+BEGIN
+  DECLARE desde DATE DEFAULT (
+    SELECT COALESCE(MAX(ultima_data_ingestao), DATE('1970-01-01'))
+    FROM `sauter-university-challenger.silver.controle_incremental`
+    WHERE processo = 'silver_to_gold'
+  );
+
+  -- 1) Reservatórios que perderam a completude já saíram da silver
+  DELETE FROM `sauter-university-challenger.gold.dados_reservatorios_completo`
+  WHERE nom_reservatorio IN (
+    SELECT nom_reservatorio
+    FROM `sauter-university-challenger.silver.ena_completude_reservatorio`
+    WHERE NOT completo
+  );
+
+  -- 2) Delta: partições novas da silver ENA + reservatórios com dimensão alterada
+  MERGE `sauter-university-challenger.gold.dados_reservatorios_completo` g
+  USING (
+    SELECT
+      ena.nom_reservatorio,
+      ena.tip_reservatorio,
+      ena.nom_bacia,
+      ena.nom_subsistema,
+      ena.ena_data,
+      ena.ena_armazenavel_res_mwmed,
+      res.dat_entrada,
+      res.val_produtibilidadeespecifica,
+      res.val_latitude,
+      res.val_longitude,
+      CONCAT(CAST(res.val_latitude AS STRING), ", ", CAST(res.val_longitude AS STRING)) AS coordenadas,
+      CASE
+        WHEN res.val_produtibilidadeespecifica != 0
+             AND res.val_produtibilidadeespecifica IS NOT NULL
+        THEN ena.ena_armazenavel_res_mwmed / res.val_produtibilidadeespecifica
+        ELSE NULL
+      END AS volume_reservatorio
+    FROM
+      `sauter-university-challenger.silver.ena-diario-por-reservatorio` ena
+    INNER JOIN
+      `sauter-university-challenger.silver.reservatorio` res
+      ON ena.nom_reservatorio = res.nom_reservatorio
+    WHERE
+      ena.data_ingestao >= desde
+      OR res.data_ingestao >= desde
+  ) s
+  ON g.nom_reservatorio = s.nom_reservatorio AND g.ena_data = s.ena_data
+  WHEN MATCHED THEN UPDATE SET
+    tip_reservatorio = s.tip_reservatorio,
+    nom_bacia = s.nom_bacia,
+    nom_subsistema = s.nom_subsistema,
+    ena_armazenavel_res_mwmed = s.ena_armazenavel_res_mwmed,
+    dat_entrada = s.dat_entrada,
+    val_produtibilidadeespecifica = s.val_produtibilidadeespecifica,
+    val_latitude = s.val_latitude,
+    val_longitude = s.val_longitude,
+    coordenadas = s.coordenadas,
+    volume_reservatorio = s.volume_reservatorio
+  WHEN NOT MATCHED THEN
+    INSERT ROW;
+
+  -- 3) Registra até onde a gold foi atualizada
+  MERGE `sauter-university-challenger.silver.controle_incremental` c
+  USING (SELECT 'silver_to_gold' AS processo, CURRENT_DATE() AS ultima_data_ingestao) n
+  ON c.processo = n.processo
+  WHEN MATCHED THEN UPDATE SET
+    ultima_data_ingestao = n.ultima_data_ingestao,
+    atualizado_em = CURRENT_TIMESTAMP()
+  WHEN NOT MATCHED THEN
+    INSERT (processo, ultima_data_ingestao, atualizado_em)
+    VALUES (n.processo, n.ultima_data_ingestao, CURRENT_TIMESTAMP());
+
+END;
@@ -1,6 +1,11 @@
--- External table
+-- External table (layout hive: package=<p>/year=<ano>/ingest_date=<AAAA-MM-DD>/)
 CREATE OR REPLACE EXTERNAL TABLE `sauter-university-challenger.bronze.raw_ena-diario-por-reservatorio`
+WITH PARTITION COLUMNS (
+  year INT64,
+  ingest_date DATE
+)
 OPTIONS (
   format = 'PARQUET',
-  uris = ['gs://sauter-university-challenger-dev-raw/ena-diario-por-reservatorio/*']
+  uris = ['gs://sauter-university-challenger-dev-raw/package=ena-diario-por-reservatorio/*'],
+  hive_partition_uri_prefix = 'gs://sauter-university-challenger-dev-raw/package=ena-diario-por-reservatorio'
 );
\ No newline at end of file
@@ -1,6 +1,11 @@
--- External table 
+-- External table (layout hive: package=<p>/year=<ano>/ingest_date=<AAAA-MM-DD>/)
 CREATE OR REPLACE EXTERNAL TABLE `sauter-university-challenger.bronze.raw_reservatorio`
+WITH PARTITION COLUMNS (
+  year INT64,
+  ingest_date DATE
+)
 OPTIONS (
   format = 'PARQUET',
-  uris = ['gs://sauter-university-challenger-dev-raw/reservatorio/*']
+  uris = ['gs://sauter-university-challenger-dev-raw/package=reservatorio/*'],
+  hive_partition_uri_prefix = 'gs://sauter-university-challenger-dev-raw/package=reservatorio'
 );
\ No newline at end of file
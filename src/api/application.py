@@ -0,0 +1,71 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from fastapi import FastAPI, Response
+from routers.ons_router import create_router as create_router
+from routers.bigquery_router import create_router as create_reservoir_router
+from services.bigquery_service import ReservoirService
+from services.ons_service import OnsService
+from utils.http_client import create_http_client
+from utils.metrics import CONTENT_TYPE, REGISTRY, track_executor
+from utils.request_metrics import RequestMetricsMiddleware
+
+# Same size ThreadPoolExecutor picks by default
+TO_THREAD_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def create_app(
+    reservoir_service: ReservoirService, ons_service: Optional[OnsService] = None, title: str = "ONS Data Fetcher API"
+) -> FastAPI:
+    """Build the API on injected services; without an OnsService only the reservoir routes are served."""
+    if ons_service is not None:
+        # Cached reservoir pages are stale once an ingestion lands new files
+        ons_service.ingestion_listeners.append(reservoir_service.invalidate_cache)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        """Share one pooled HTTP client across requests and keep the reservoir replica refreshed."""
+        # Own the asyncio.to_thread pool so /metrics can report its queue depth
+        to_thread_pool = ThreadPoolExecutor(max_workers=TO_THREAD_MAX_WORKERS, thread_name_prefix="to-thread")
+        asyncio.get_running_loop().set_default_executor(to_thread_pool)
+        track_executor("to_thread", to_thread_pool, TO_THREAD_MAX_WORKERS)
+        replica_task = (
+            asyncio.create_task(reservoir_service.replica.run()) if reservoir_service.replica else None
+        )
+        async with create_http_client() as http_client:
+            if ons_service is not None:
+                ons_service.http_client = http_client
+            try:
+                yield
+            finally:
+                if replica_task is not None:
+                    replica_task.cancel()
+                if ons_service is not None:
+                    ons_service.http_client = None
+                    ons_service.executor.shutdown()
+                reservoir_service.close()
+                to_thread_pool.shutdown(wait=False)
+
+    app = FastAPI(
+        title=title,
+        description="An API to fetch and filter PARQUET file resources from the ONS open data portal.",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(RequestMetricsMiddleware)
+    if ons_service is not None:
+        app.include_router(create_router(ons_service))
+    app.include_router(create_reservoir_router(reservoir_service))
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "healthy"}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,295 @@
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa  # type: ignore[import-untyped]
+from google.api_core.exceptions import BadRequest  # type: ignore[import-untyped]
+from google.cloud import bigquery
+
+from benchmarks.fixtures import RESERVOIRS
+from repositories.bigquery_repository import GCPBigQueryRepository
+
+GOLD_TABLE_ID = "gold.dados_reservatorios_completo"
+FIRST_DAY = date(2015, 1, 1)
+
+# Gold table columns and their BigQuery types (see procedure-setup-incremental.sql)
+GOLD_SCHEMA = (
+    ("nom_reservatorio", "STRING"),
+    ("tip_reservatorio", "STRING"),
+    ("nom_bacia", "STRING"),
+    ("nom_subsistema", "STRING"),
+    ("ena_data", "DATETIME"),
+    ("ena_armazenavel_res_mwmed", "FLOAT"),
+    ("dat_entrada", "DATE"),
+    ("val_produtibilidadeespecifica", "FLOAT"),
+    ("val_latitude", "FLOAT"),
+    ("val_longitude", "FLOAT"),
+    ("coordenadas", "STRING"),
+    ("volume_reservatorio", "FLOAT"),
+)
+_SQLITE_TYPES = {"STRING": "TEXT", "DATETIME": "TEXT", "DATE": "TEXT", "FLOAT": "REAL"}
+# Result columns read back as datetime/date, as the BigQuery client returns them
+_DATETIME_COLUMNS = {"ena_data", "periodo"}
+_DATE_COLUMNS = {"dat_entrada"}
+
+# DATETIME_TRUNC parts used by ReservoirQueryBuilder.build_aggregate, as SQLite date functions
+_TRUNC = re.compile(r"DATETIME_TRUNC\((\w+), (ISOWEEK|MONTH|YEAR)\)")
+_TRUNC_SQLITE = {
+    "ISOWEEK": "datetime({column}, '-6 days', 'weekday 1')",
+    "MONTH": "strftime('%Y-%m-01 00:00:00', {column})",
+    "YEAR": "strftime('%Y-01-01 00:00:00', {column})",
+}
+
+
+def to_sqlite(query: str) -> str:
+    """
+    Rewrite the BigQuery dialect emitted by ReservoirQueryBuilder for SQLite.
+
+    Backquoted ``project.dataset.table`` names, ``@name`` parameters, window
+    counts and LIMIT/OFFSET are understood by SQLite as they are.
+    """
+    return _TRUNC.sub(lambda m: _TRUNC_SQLITE[m.group(2)].format(column=m.group(1)), query)
+
+
+def _sqlite_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _result_value(column: str, value: Any) -> Any:
+    if column in _DATETIME_COLUMNS and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if column in _DATE_COLUMNS and isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def _gold_rows(days: int, seed: int) -> Iterator[Tuple[Any, ...]]:
+    rng = random.Random(seed)
+    reservoirs = [
+        (
+            name,
+            "Fio d'água" if i % 3 == 0 else "Reservatório",
+            basin,
+            subsystem,
+            (FIRST_DAY - timedelta(days=365 * (5 + i % 30))).isoformat(),
+            round(rng.uniform(0.1, 1.5), 4),
+            round(rng.uniform(-30.0, -2.0), 5),
+            round(rng.uniform(-60.0, -40.0), 5),
+        )
+        for i, (name, basin, subsystem) in enumerate(RESERVOIRS)
+    ]
+    for day in range(days):
+        ena_data = f"{FIRST_DAY + timedelta(days=day)} 00:00:00"
+        for name, kind, basin, subsystem, entrada, produtibilidade, latitude, longitude in reservoirs:
+            ena = round(rng.gammavariate(2.0, 150.0), 3)
+            yield (
+                name,
+                kind,
+                basin,
+                subsystem,
+                ena_data,
+                ena,
+                entrada,
+                produtibilidade,
+                latitude,
+                longitude,
+                f"{latitude}, {longitude}",
+                round(ena / produtibilidade, 3),
+            )
+
+
+def build_gold_database(path: str, table: str, days: int, seed: int = 0) -> int:
+    """Create ``table`` at ``path`` with ``days`` of data for every reservoir; returns the row count."""
+    columns = ", ".join(f"{name} {_SQLITE_TYPES[kind]}" for name, kind in GOLD_SCHEMA)
+    placeholders = ", ".join("?" for _ in GOLD_SCHEMA)
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"DROP TABLE IF EXISTS `{table}`")
+        connection.execute(f"CREATE TABLE `{table}` ({columns})")
+        connection.executemany(f"INSERT INTO `{table}` VALUES ({placeholders})", _gold_rows(days, seed))
+        # Same role as the gold table's clustering: range scans in keyset order
+        connection.execute(f"CREATE INDEX idx_keyset ON `{table}` (ena_data, nom_reservatorio)")
+        connection.execute(f"CREATE INDEX idx_bacia ON `{table}` (nom_bacia, ena_data)")
+        (rows,) = connection.execute(f"SELECT COUNT(*) FROM `{table}`").fetchone()
+    connection.close()
+    return int(rows)
+
+
+class SQLiteRowIterator(list):
+    """The parts of ``google.cloud.bigquery.table.RowIterator`` the repository reads."""
+
+    def __init__(self, rows: List[Dict[str, Any]], page_size: Optional[int] = None) -> None:
+        super().__init__(rows)
+        self.total_rows = len(rows)
+        self.page_size = page_size or 10000
+
+    def to_arrow_iterable(self, bqstorage_client: Any = None) -> Iterator[pa.RecordBatch]:
+        for start in range(0, len(self), self.page_size):
+            yield pa.RecordBatch.from_pylist(self[start:start + self.page_size])
+
+
+class SQLiteQueryJob:
+    """
+    A finished-at-``ready_at`` stand-in for ``bigquery.QueryJob``.
+
+    The SQL already ran when the job was created; ``done()`` turns true and
+    ``result()`` stops blocking once the injected job latency has elapsed.
+    """
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        error: Optional[Exception],
+        latency_seconds: float,
+        rpc_latency_seconds: float,
+    ) -> None:
+        self._rows = rows
+        self._error = error
+        self._rpc_latency_seconds = rpc_latency_seconds
+        self.ready_at = time.monotonic() + latency_seconds
+        self.error_result = {"reason": "invalidQuery", "message": str(error)} if error else None
+        self.cache_hit = False
+        self.cancelled = False
+
+    def done(self) -> bool:
+        time.sleep(self._rpc_latency_seconds)
+        return time.monotonic() >= self.ready_at
+
+    def exception(self) -> Optional[Exception]:
+        return self._error
+
+    def cancel(self) -> bool:
+        time.sleep(self._rpc_latency_seconds)
+        self.cancelled = True
+        return True
+
+    def result(self, page_size: Optional[int] = None) -> SQLiteRowIterator:
+        time.sleep(max(self._rpc_latency_seconds, self.ready_at - time.monotonic()))
+        if self._error is not None:
+            raise self._error
+        return SQLiteRowIterator(self._rows, page_size)
+
+
+class SQLiteBigQueryClient:
+    """
+    The ``query``/``get_table`` surface of ``bigquery.Client`` over a SQLite file.
+
+    Every call sleeps ``rpc_latency_seconds`` in the calling thread, like an
+    API round trip, and each job takes ``latency_seconds`` (± ``latency_jitter``
+    as a fraction) to finish, like BigQuery queueing and running it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        project_id: str,
+        latency_seconds: float = 0.0,
+        latency_jitter: float = 0.0,
+        rpc_latency_seconds: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.project_id = project_id
+        self.latency_seconds = latency_seconds
+        self.latency_jitter = latency_jitter
+        self.rpc_latency_seconds = rpc_latency_seconds
+        self._random = random.Random(seed)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One read-only connection per worker thread, so queries run in parallel
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def _job_latency(self) -> float:
+        spread = self.latency_seconds * self.latency_jitter
+        return max(0.0, self.latency_seconds + self._random.uniform(-spread, spread))
+
+    def run_sql(
+        self, query: str, query_parameters: Sequence[bigquery.ScalarQueryParameter] = ()
+    ) -> List[Dict[str, Any]]:
+        parameters = {str(parameter.name): _sqlite_value(parameter.value) for parameter in query_parameters}
+        cursor = self._connection().execute(to_sqlite(query), parameters)
+        columns = [description[0] for description in cursor.description]
+        return [
+            {column: _result_value(column, value) for column, value in zip(columns, values)}
+            for values in cursor.fetchall()
+        ]
+
+    def query(self, query: str, job_config: Optional[bigquery.QueryJobConfig] = None) -> SQLiteQueryJob:
+        time.sleep(self.rpc_latency_seconds)
+        parameters = job_config.query_parameters if job_config is not None else []
+        try:
+            rows, error = self.run_sql(query, parameters), None
+        except sqlite3.Error as e:
+            rows, error = [], BadRequest(f"{e} in query: {query}")
+        return SQLiteQueryJob(rows, error, self._job_latency(), self.rpc_latency_seconds)
+
+    def get_table(self, table_ref: str) -> bigquery.Table:
+        time.sleep(self.rpc_latency_seconds)
+        cursor = self._connection().execute(f"SELECT * FROM `{table_ref}` LIMIT 0")
+        types = dict(GOLD_SCHEMA)
+        return bigquery.Table(
+            table_ref,
+            schema=[
+                bigquery.SchemaField(description[0], types.get(description[0], "STRING"))
+                for description in cursor.description
+            ],
+        )
+
+
+class SQLiteBigQueryRepository(GCPBigQueryRepository):
+    """
+    GCPBigQueryRepository whose client runs the queries on a local SQLite copy
+    of the gold table, with injected latency. No Google credentials are needed.
+
+    A database already at ``path`` is reused; otherwise one with ``days`` of
+    generated data per reservoir is built there, or in a temporary file that
+    ``close()`` removes when no ``path`` is given.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        days: int = 365,
+        latency_seconds: float = 0.0,
+        latency_jitter: float = 0.0,
+        rpc_latency_seconds: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        super().__init__()
+        self.rows: Optional[int] = None
+        self._temporary = path is None
+        if path is None:
+            path = tempfile.NamedTemporaryFile(prefix="gold_", suffix=".sqlite", delete=False).name
+        if self._temporary or not os.path.exists(path):
+            self.rows = build_gold_database(path, f"{self.project_id}.{GOLD_TABLE_ID}", days, seed)
+        self.path = path
+        self.client = SQLiteBigQueryClient(  # type: ignore[assignment]
+            path,
+            self.project_id,
+            latency_seconds=latency_seconds,
+            latency_jitter=latency_jitter,
+            rpc_latency_seconds=rpc_latency_seconds,
+            seed=seed,
+        )
+
+    @property
+    def bqstorage_client(self) -> Any:
+        return None
+
+    def close(self) -> None:
+        if self._temporary and os.path.exists(self.path):
+            os.remove(self.path)
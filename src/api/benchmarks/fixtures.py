@@ -0,0 +1,190 @@
+import io
+import json
+import os
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.csv as pa_csv  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+from openpyxl import Workbook  # type: ignore[import-untyped]
+from pydantic import BaseModel
+
+FORMATS = ("csv", "xlsx", "parquet")
+
+# Worksheets stop at 1,048,576 rows (header included), which caps XLSX fixtures
+XLSX_MAX_ROWS = 1_048_575
+
+BASINS = (
+    ("GRANDE", "SUDESTE"),
+    ("PARANAÍBA", "SUDESTE"),
+    ("TIETÊ", "SUDESTE"),
+    ("PARANAPANEMA", "SUDESTE"),
+    ("IGUAÇU", "SUL"),
+    ("URUGUAI", "SUL"),
+    ("SÃO FRANCISCO", "NORDESTE"),
+    ("TOCANTINS", "NORTE"),
+)
+RESERVOIRS_PER_BASIN = 20
+# Reservoir -> (name, basin, subsystem), one row per reservoir and day
+RESERVOIRS = tuple(
+    (f"RESERVATÓRIO {basin} {i:02d}", basin, subsystem)
+    for basin, subsystem in BASINS
+    for i in range(1, RESERVOIRS_PER_BASIN + 1)
+)
+FIRST_DAY = np.datetime64("2000-01-01", "D")
+
+SCHEMA = pa.schema(
+    [
+        ("nom_reservatorio", pa.string()),
+        ("tip_reservatorio", pa.string()),
+        ("nom_bacia", pa.string()),
+        ("nom_subsistema", pa.string()),
+        ("ear_data", pa.date32()),
+        ("ear_reservatorio_subsistema_proprio_mwmes", pa.float64()),
+        ("earmax_reservatorio_subsistema_proprio_mwmes", pa.float64()),
+        ("ear_reservatorio_percentual", pa.float64()),
+        ("ena_bruta_res_mwmed", pa.float64()),
+        ("ena_armazenavel_res_mwmed", pa.float64()),
+    ]
+)
+
+
+class Fixture(BaseModel):
+    path: str
+    data_type: str
+    size_bytes: int
+    rows: int
+
+
+def parse_size(value: str) -> int:
+    """``512KB``, ``16MB``, ``1GB`` (binary multiples) or a plain byte count."""
+    units = {"KB": 1024, "MB": 1024**2, "GB": 1024**3}
+    text = value.strip().upper()
+    for suffix, factor in units.items():
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * factor)
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for suffix, factor in (("GB", 1024**3), ("MB", 1024**2), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return f"{size}B"
+
+
+def synthetic_batch(start: int, rows: int, seed: int = 0) -> pa.Table:
+    """
+    Rows ``start``..``start + rows`` of a deterministic EAR/ENA-per-reservoir series.
+
+    Numeric columns carry about 1% nulls, like gaps in the ONS files.
+    """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, start + rows)
+    reservoir = index % len(RESERVOIRS)
+    names, basins, subsystems = (np.array(column)[reservoir] for column in zip(*RESERVOIRS))
+    days = (FIRST_DAY + index // len(RESERVOIRS)).astype("datetime64[D]")
+
+    capacity = 50.0 + (reservoir * 37 % 997) * 10.0
+    stored = capacity * rng.uniform(0.05, 1.0, rows)
+
+    def measure(values: np.ndarray) -> pa.Array:
+        return pa.array(np.round(values, 3), mask=rng.random(rows) < 0.01)
+
+    return pa.table(
+        [
+            pa.array(names),
+            pa.array(np.where(reservoir % 3 == 0, "Fio d'água", "Reservatório")),
+            pa.array(basins),
+            pa.array(subsystems),
+            pa.array(days, type=pa.date32()),
+            measure(stored),
+            measure(capacity),
+            measure(stored / capacity * 100),
+            measure(rng.gamma(2.0, capacity / 4)),
+            measure(rng.gamma(2.0, capacity / 5)),
+        ],
+        schema=SCHEMA,
+    )
+
+
+def _batch_rows(size_bytes: int) -> int:
+    # ~16 batches per file, so the last one overshoots the target by a few percent at most
+    return int(min(65536, max(1024, size_bytes // 100 // 16)))
+
+
+def _write_csv(target: IO[bytes], size_bytes: int, seed: int) -> int:
+    """ONS layout: ``;`` separated, latin1 encoded."""
+    rows, batch_rows = 0, _batch_rows(size_bytes)
+    options = pa_csv.WriteOptions(delimiter=";", include_header=True, quoting_style="needed")
+    while target.tell() < size_bytes:
+        buffer = io.BytesIO()
+        pa_csv.write_csv(synthetic_batch(rows, batch_rows, seed), buffer, write_options=options)
+        # Arrow writes UTF-8 only; re-encode each block instead of the whole file
+        target.write(buffer.getvalue().decode("utf-8").encode("latin1"))
+        options = pa_csv.WriteOptions(delimiter=";", include_header=False, quoting_style="needed")
+        rows += batch_rows
+    return rows
+
+
+def _write_parquet(target: IO[bytes], size_bytes: int, seed: int) -> int:
+    rows, batch_rows = 0, _batch_rows(size_bytes)
+    with pq.ParquetWriter(target, SCHEMA) as writer:
+        while target.tell() < size_bytes:
+            # One row group per batch, flushed to ``target`` as it is written
+            writer.write_table(synthetic_batch(rows, batch_rows, seed))
+            rows += batch_rows
+    return rows
+
+
+def _write_xlsx_rows(target: IO[bytes], rows: int, seed: int) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Plan1")
+    sheet.append(SCHEMA.names)
+    for start in range(0, rows, 65536):
+        batch = synthetic_batch(start, min(65536, rows - start), seed)
+        for row in zip(*(column.to_pylist() for column in batch.columns)):
+            sheet.append(row)
+    workbook.save(target)
+
+
+def _write_xlsx(target: IO[bytes], size_bytes: int, seed: int) -> int:
+    # A workbook's size is only known once the zip is written; size it from a sample
+    sample_rows = 2000
+    sample = io.BytesIO()
+    _write_xlsx_rows(sample, sample_rows, seed)
+    rows = max(1, int(size_bytes / (sample.tell() / sample_rows)))
+    if rows > XLSX_MAX_ROWS:
+        raise ValueError(
+            f"{format_size(size_bytes)} needs {rows} rows, more than a worksheet holds ({XLSX_MAX_ROWS})"
+        )
+    _write_xlsx_rows(target, rows, seed)
+    return rows
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def ensure_fixture(directory: str, data_type: str, size_bytes: int, seed: int = 0) -> Fixture:
+    """
+    Return the fixture for (``data_type``, ``size_bytes``, ``seed``), generating it
+    into ``directory`` the first time. The same arguments always produce the same file.
+    """
+    if data_type not in WRITERS:
+        raise ValueError(f"Unsupported data_type: {data_type} (expected one of {FORMATS})")
+    name = f"ons_{format_size(size_bytes).lower()}_seed{seed}.{data_type}"
+    path = Path(directory) / name
+    sidecar = path.with_suffix(path.suffix + ".json")
+    if path.exists() and sidecar.exists():
+        return Fixture(**json.loads(sidecar.read_text()))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(path.suffix + ".partial")
+    with open(partial, "wb") as f:
+        rows = WRITERS[data_type](f, size_bytes, seed)
+    os.replace(partial, path)
+    fixture = Fixture(path=str(path), data_type=data_type, size_bytes=path.stat().st_size, rows=rows)
+    sidecar.write_text(fixture.model_dump_json())
+    return fixture
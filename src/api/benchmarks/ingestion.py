@@ -0,0 +1,355 @@
+"""
+Throughput and memory benchmark of the ONS ingestion hot path.
+
+Runs ``OnsService._download_parquet`` against synthetic ONS files served from a
+local HTTP server, uploading into a NullGCSRepository, and reports MB/s, rows/s
+and peak RSS end to end and per stage (fetch, read, convert, encode, upload...).
+Each case runs in its own spawned process so its peak RSS is not inflated by
+earlier cases. From ``src/api``:
+
+    python -m benchmarks.ingestion --sizes 1MB,16MB,128MB --save-baseline benchmarks.json
+    python -m benchmarks.ingestion --sizes 1MB,16MB,128MB --baseline benchmarks.json --fail-on-regression
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import pyarrow as pa  # type: ignore[import-untyped]
+from pydantic import BaseModel
+
+from benchmarks.fixtures import FORMATS, Fixture, ensure_fixture, format_size, parse_size
+from benchmarks.stand_ins import LocalFileServer, NullGCSRepository
+from services.ons_service import DownloadInfo, DownloadResult, OnsService
+from utils import logger
+from utils.http_client import create_http_client
+from utils.logger import LogLevel
+from utils.stage_timer import StageTiming
+
+MODES = ("buffer", "stream")
+MB = 1024 * 1024
+# Stages faster than this in the baseline are reported but never flagged: too noisy
+MIN_STAGE_SECONDS = 0.05
+
+
+class BenchmarkCase(BaseModel):
+    data_type: str
+    size_bytes: int
+    mode: str = "buffer"
+    engine: str = "arrow"
+    repeat: int = 3
+
+    @property
+    def case_id(self) -> str:
+        return f"{self.data_type}-{format_size(self.size_bytes)}-{self.mode}-{self.engine}"
+
+
+class StageResult(BaseModel):
+    stage: str
+    seconds: float
+    bytes_in: int | None = None
+    bytes_out: int | None = None
+    rows: int | None = None
+    mb_per_s: float | None = None
+    rows_per_s: float | None = None
+
+
+class CaseResult(BaseModel):
+    case_id: str
+    data_type: str
+    size_bytes: int
+    rows: int
+    mode: str
+    engine: str
+    repeat: int
+    # Best (minimum) wall time of the repetitions, and their median
+    seconds: float
+    seconds_median: float
+    mb_per_s: float
+    rows_per_s: float
+    # Peak RSS of the case process, and its growth over the RSS before the first run
+    peak_rss_mb: float
+    rss_growth_mb: float
+    stages: List[StageResult] = []
+
+
+class BenchmarkReport(BaseModel):
+    environment: Dict[str, str] = {}
+    results: List[CaseResult] = []
+
+
+class Comparison(BaseModel):
+    case_id: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    regressed: bool
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / MB if sys.platform == "darwin" else peak / 1024
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "pyarrow": pa.__version__,
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "executor": os.environ.get("ONS_PARSE_EXECUTOR", "thread"),
+    }
+
+
+def _stage_result(timing: StageTiming) -> StageResult:
+    moved = timing.bytes_in or timing.bytes_out
+    seconds = timing.duration_seconds
+    return StageResult(
+        stage=timing.stage,
+        seconds=seconds,
+        bytes_in=timing.bytes_in,
+        bytes_out=timing.bytes_out,
+        rows=timing.rows,
+        mb_per_s=moved / MB / seconds if moved and seconds > 0 else None,
+        rows_per_s=timing.rows / seconds if timing.rows and seconds > 0 else None,
+    )
+
+
+async def _ingest_once(case: BenchmarkCase, url: str) -> Tuple[float, DownloadResult]:
+    # A fresh service per run: its FetchCache would skip an unchanged URL
+    service = OnsService(repository=NullGCSRepository(), conversion_engine=case.engine)
+    download_info = DownloadInfo(
+        url=url,
+        year=2000,
+        package="benchmark",
+        data_type=case.data_type,
+        streaming=case.mode == "stream",
+    )
+    try:
+        async with create_http_client() as client:
+            started = time.perf_counter()
+            result = await service._download_parquet(client, download_info)
+            return time.perf_counter() - started, result
+    finally:
+        service.executor.shutdown()
+
+
+def run_case(case: BenchmarkCase, url: str, fixture: Fixture) -> CaseResult:
+    """Ingest ``fixture``, served at ``url``, ``case.repeat`` times in this process."""
+    logger.set_level(LogLevel.ERROR)
+    rss_before = peak_rss_mb()
+    runs: List[Tuple[float, DownloadResult]] = []
+    for _ in range(case.repeat):
+        seconds, result = asyncio.run(_ingest_once(case, url))
+        if not result.success:
+            raise RuntimeError(f"{case.case_id} failed: {result.error_message}")
+        runs.append((seconds, result))
+
+    best_seconds, best = min(runs, key=lambda run: run[0])
+    peak = peak_rss_mb()
+    return CaseResult(
+        case_id=case.case_id,
+        data_type=case.data_type,
+        size_bytes=fixture.size_bytes,
+        rows=fixture.rows,
+        mode=case.mode,
+        engine=case.engine,
+        repeat=case.repeat,
+        seconds=best_seconds,
+        seconds_median=statistics.median(seconds for seconds, _ in runs),
+        mb_per_s=fixture.size_bytes / MB / best_seconds,
+        rows_per_s=fixture.rows / best_seconds,
+        peak_rss_mb=peak,
+        rss_growth_mb=peak - rss_before,
+        stages=[_stage_result(timing) for timing in best.stages],
+    )
+
+
+def run_case_isolated(case: BenchmarkCase, url: str, fixture: Fixture) -> CaseResult:
+    """``run_case`` in a fresh spawned process, so peak RSS belongs to this case alone."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, case, url, fixture).result()
+
+
+def compare(
+    results: Sequence[CaseResult], baseline: Sequence[CaseResult], tolerance: float = 0.10
+) -> List[Comparison]:
+    """
+    Throughput and peak RSS of each case against the baseline run of the same case.
+
+    A case regresses when it is more than ``tolerance`` slower (MB/s, overall or
+    for a stage that took at least MIN_STAGE_SECONDS) or uses that much more memory.
+    """
+    previous = {result.case_id: result for result in baseline}
+    comparisons: List[Comparison] = []
+
+    def add(
+        case_id: str, metric: str, base: float, current: float, higher_is_better: bool, flag: bool = True
+    ) -> None:
+        change = current / base - 1 if base else 0.0
+        regressed = flag and (change < -tolerance if higher_is_better else change > tolerance)
+        comparisons.append(
+            Comparison(
+                case_id=case_id,
+                metric=metric,
+                baseline=base,
+                current=current,
+                change=change,
+                regressed=regressed,
+            )
+        )
+
+    for result in results:
+        base = previous.get(result.case_id)
+        if base is None:
+            continue
+        add(result.case_id, "mb_per_s", base.mb_per_s, result.mb_per_s, higher_is_better=True)
+        add(result.case_id, "peak_rss_mb", base.peak_rss_mb, result.peak_rss_mb, higher_is_better=False)
+        base_stages = {stage.stage: stage for stage in base.stages}
+        for stage in result.stages:
+            base_stage = base_stages.get(stage.stage)
+            if base_stage is None or base_stage.mb_per_s is None or stage.mb_per_s is None:
+                continue
+            add(
+                result.case_id,
+                f"{stage.stage}.mb_per_s",
+                base_stage.mb_per_s,
+                stage.mb_per_s,
+                higher_is_better=True,
+                flag=base_stage.seconds >= MIN_STAGE_SECONDS,
+            )
+    return comparisons
+
+
+def _format_rate(value: float | None) -> str:
+    return f"{value:,.1f}" if value is not None else "-"
+
+
+def format_results(results: Sequence[CaseResult]) -> str:
+    lines = [
+        f"{'case':<32} {'stage':<13} {'seconds':>9} {'MB/s':>10} {'rows/s':>14} {'peak RSS MB':>12}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.case_id:<32} {'total':<13} {result.seconds:>9.3f} {_format_rate(result.mb_per_s):>10} "
+            f"{_format_rate(result.rows_per_s):>14} {result.peak_rss_mb:>12.1f}"
+        )
+        for stage in result.stages:
+            lines.append(
+                f"{'':<32} {stage.stage:<13} {stage.seconds:>9.3f} {_format_rate(stage.mb_per_s):>10} "
+                f"{_format_rate(stage.rows_per_s):>14}"
+            )
+    return "\n".join(lines)
+
+
+def format_comparisons(comparisons: Sequence[Comparison]) -> str:
+    lines = [f"{'case':<32} {'metric':<22} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for item in comparisons:
+        marker = "  REGRESSION" if item.regressed else ""
+        lines.append(
+            f"{item.case_id:<32} {item.metric:<22} {item.baseline:>10.1f} {item.current:>10.1f} "
+            f"{item.change:>+8.1%}{marker}"
+        )
+    return "\n".join(lines)
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.ingestion", description="Benchmark the ONS ingestion hot path."
+    )
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma separated: csv,xlsx,parquet")
+    parser.add_argument("--sizes", default="1MB,16MB,128MB", help="comma separated, e.g. 1MB,128MB,1GB")
+    parser.add_argument("--modes", default=",".join(MODES), help="buffer (whole file) and/or stream")
+    parser.add_argument("--engines", default="arrow", help="conversion engines of the buffer mode: arrow,pandas")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures-dir", default=".benchmarks/fixtures", help="generated files are reused from here")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline JSON")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown/RSS growth (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with 1 on any regression")
+    parser.add_argument("--in-process", action="store_true", help="skip the per-case process (RSS is then cumulative)")
+    return parser.parse_args(argv)
+
+
+def build_cases(args: argparse.Namespace) -> List[BenchmarkCase]:
+    cases: List[BenchmarkCase] = []
+    for data_type in _split(args.formats):
+        for size in _split(args.sizes):
+            for mode in _split(args.modes):
+                # The streaming path always converts with Arrow
+                engines = _split(args.engines) if mode == "buffer" else ["arrow"]
+                for engine in engines:
+                    cases.append(
+                        BenchmarkCase(
+                            data_type=data_type,
+                            size_bytes=parse_size(size),
+                            mode=mode,
+                            engine=engine,
+                            repeat=args.repeat,
+                        )
+                    )
+    return cases
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    # A persisted fetch cache would turn every repetition into a 304
+    os.environ.pop("ONS_FETCH_CACHE_PATH", None)
+
+    report = BenchmarkReport(environment=environment())
+    fixtures: Dict[Tuple[str, int], Fixture] = {}
+    Path(args.fixtures_dir).mkdir(parents=True, exist_ok=True)
+    with LocalFileServer(args.fixtures_dir) as server:
+        for case in build_cases(args):
+            key = (case.data_type, case.size_bytes)
+            if key not in fixtures:
+                print(f"Preparing {case.data_type} fixture of {format_size(case.size_bytes)}...", flush=True)
+                try:
+                    fixtures[key] = ensure_fixture(args.fixtures_dir, case.data_type, case.size_bytes, args.seed)
+                except ValueError as e:
+                    print(f"Skipping {case.case_id}: {e}", flush=True)
+                    continue
+            fixture = fixtures[key]
+            url = server.url(Path(fixture.path).name)
+            print(f"Running {case.case_id} ({case.repeat}x)...", flush=True)
+            runner = run_case if args.in_process else run_case_isolated
+            report.results.append(runner(case, url, fixture))
+
+    print(format_results(report.results))
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(report.model_dump_json(indent=2))
+
+    if not args.baseline:
+        return 0
+    baseline = BenchmarkReport.model_validate_json(Path(args.baseline).read_text())
+    comparisons = compare(report.results, baseline.results, args.tolerance)
+    print()
+    print(format_comparisons(comparisons))
+    regressions = [item for item in comparisons if item.regressed]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
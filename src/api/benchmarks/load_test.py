@@ -0,0 +1,414 @@
+"""
+Load test of GET /reservoir/data.
+
+By default the reservoir API is started in its own process on top of
+SQLiteBigQueryRepository, a local stand-in for BigQuery with injected job and
+RPC latency; ``--url`` targets an already running API instead. Requests are
+sent at a fixed rate (open loop: a slow response never delays the next send,
+and latency is measured from the scheduled send time) and the report gives
+p50/p95/p99 latency, throughput and the saturation of the API thread pools,
+scraped from /metrics during the run. From ``src/api``:
+
+    python -m benchmarks.load_test --rps 50 --duration 30 --latency 0.3 --bq-workers 8
+    python -m benchmarks.load_test --url http://localhost:8080 --rps 20 --first-day 2020-01-01
+"""
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import random
+import re
+import socket
+import statistics
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import uvicorn
+from pydantic import BaseModel
+
+from application import create_app
+from benchmarks.bigquery_stand_in import FIRST_DAY, SQLiteBigQueryRepository
+from benchmarks.fixtures import BASINS
+from repositories.async_bigquery_repository import AsyncBigQueryRepository
+from services.bigquery_service import ReservoirService
+from utils import logger
+from utils.logger import LogLevel
+from utils.result_cache import LRUResultCache
+
+_SAMPLE = re.compile(r"^(\w+)(?:\{(.*)\})? (\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class StandInSettings(BaseModel):
+    database_path: Optional[str] = None
+    days: int = 1825
+    latency_seconds: float = 0.3
+    latency_jitter: float = 0.5
+    rpc_latency_seconds: float = 0.02
+    bq_max_workers: Optional[int] = None
+    result_cache: bool = True
+    seed: int = 0
+
+
+class PoolSaturation(BaseModel):
+    executor: str
+    max_workers: int
+    max_active_tasks: int
+    max_queue_depth: int
+    mean_queue_depth: float
+    # Share of samples with every worker busy and tasks still waiting
+    saturated_ratio: float
+
+
+class LatencySummary(BaseModel):
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    mean_ms: float = 0.0
+
+
+class LoadReport(BaseModel):
+    target_rps: float
+    duration_seconds: float
+    sent: int
+    completed: int
+    # Sends skipped because max_in_flight requests were already waiting
+    dropped: int
+    statuses: Dict[str, int]
+    achieved_rps: float
+    latency: LatencySummary
+    max_in_flight: int
+    pools: List[PoolSaturation] = []
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, ``q`` in 0-100."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize_latencies(seconds: Sequence[float]) -> LatencySummary:
+    if not seconds:
+        return LatencySummary()
+    return LatencySummary(
+        p50_ms=percentile(seconds, 50) * 1000,
+        p95_ms=percentile(seconds, 95) * 1000,
+        p99_ms=percentile(seconds, 99) * 1000,
+        max_ms=max(seconds) * 1000,
+        mean_ms=statistics.fmean(seconds) * 1000,
+    )
+
+
+def parse_metrics(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """(name, labels, value) of every sample in a Prometheus text exposition."""
+    samples = []
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None or line.startswith("#"):
+            continue
+        name, labels, value = match.groups()
+        samples.append((name, dict(_LABEL.findall(labels or "")), float(value)))
+    return samples
+
+
+def create_stand_in_service(settings: StandInSettings) -> ReservoirService:
+    repository = SQLiteBigQueryRepository(
+        path=settings.database_path,
+        days=settings.days,
+        latency_seconds=settings.latency_seconds,
+        latency_jitter=settings.latency_jitter,
+        rpc_latency_seconds=settings.rpc_latency_seconds,
+        seed=settings.seed,
+    )
+    return ReservoirService(
+        repository=AsyncBigQueryRepository(repository, max_workers=settings.bq_max_workers),
+        # A zero-byte LRU stores nothing: every request reaches the repository
+        result_cache=None if settings.result_cache else LRUResultCache(0),
+    )
+
+
+def serve_stand_in(settings: StandInSettings, host: str, port: int) -> None:
+    logger.set_level(LogLevel.ERROR)
+    app = create_app(create_stand_in_service(settings), title="Reservoir API load test")
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+def start_stand_in(settings: StandInSettings, host: str = "127.0.0.1") -> Tuple[BaseProcess, str]:
+    """Serve the stand-in API from a spawned process, so it does not share the client's GIL."""
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        port = probe.getsockname()[1]
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_stand_in, args=(settings, host, port), daemon=True
+    )
+    process.start()
+    return process, f"http://{host}:{port}"
+
+
+def request_mix(
+    count: int, first_day: date, days: int, page_size: int = 100, seed: int = 0
+) -> List[Dict[str, str]]:
+    """
+    ``count`` distinct-ish /reservoir/data queries over ``days`` from ``first_day``:
+    windows of a week to a year, the first pages, some filtered by basin and some
+    without the total. Requests cycle through them, so repeats can hit the caches.
+    """
+    rng = random.Random(seed)
+    last_day = first_day + timedelta(days=days - 1)
+    mix = []
+    for _ in range(count):
+        start = first_day + timedelta(days=rng.randrange(max(1, days - 7)))
+        end = min(start + timedelta(days=rng.choice((7, 30, 90, 365))), last_day)
+        params = {
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "page_offset": str(rng.randint(1, 5)),
+            "page_size": str(page_size),
+        }
+        if rng.random() < 0.3:
+            params["bacia"] = rng.choice(BASINS)[0]
+        if rng.random() < 0.3:
+            params["include_total"] = "false"
+        mix.append(params)
+    return mix
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if asyncio.get_running_loop().time() > deadline:
+            raise TimeoutError(f"{client.base_url} did not become healthy in {timeout:.0f}s")
+        await asyncio.sleep(0.25)
+
+
+async def _sample_pools(
+    client: httpx.AsyncClient, interval: float, samples: List[List[Tuple[str, Dict[str, str], float]]]
+) -> None:
+    while True:
+        try:
+            response = await client.get("/metrics")
+            if response.status_code == 200:
+                samples.append(parse_metrics(response.text))
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+def summarize_pools(samples: Sequence[Sequence[Tuple[str, Dict[str, str], float]]]) -> List[PoolSaturation]:
+    """Queue depth and busy workers of every ``executor`` seen in the /metrics samples."""
+    series: Dict[str, Dict[str, List[float]]] = {}
+    for sample in samples:
+        for name, labels, value in sample:
+            if name.startswith("executor_") and "executor" in labels:
+                series.setdefault(labels["executor"], {}).setdefault(name, []).append(value)
+
+    pools = []
+    for executor, values in sorted(series.items()):
+        depth = values.get("executor_queue_depth", [0.0])
+        active = values.get("executor_active_tasks", [0.0])
+        max_workers = int(max(values.get("executor_max_workers", [0.0])))
+        saturated = sum(
+            1 for queued, running in zip(depth, active) if queued > 0 and running >= max_workers
+        )
+        pools.append(
+            PoolSaturation(
+                executor=executor,
+                max_workers=max_workers,
+                max_active_tasks=int(max(active)),
+                max_queue_depth=int(max(depth)),
+                mean_queue_depth=statistics.fmean(depth),
+                saturated_ratio=saturated / len(depth),
+            )
+        )
+    return pools
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: Sequence[Dict[str, str]],
+    rps: float,
+    duration: float,
+    warmup: float = 0.0,
+    max_in_flight: int = 1000,
+    sample_interval: float = 0.5,
+) -> LoadReport:
+    """
+    Send GET /reservoir/data at ``rps`` for ``warmup + duration`` seconds; only
+    requests scheduled after the warmup are measured.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    measure_from = started + warmup
+    latencies: List[float] = []
+    statuses: Counter[str] = Counter()
+    sent = dropped = in_flight = peak_in_flight = 0
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def send(params: Dict[str, str], scheduled: float) -> None:
+        nonlocal in_flight
+        try:
+            response = await client.get("/reservoir/data", params=params)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            in_flight -= 1
+        if scheduled >= measure_from:
+            latencies.append(loop.time() - scheduled)
+            statuses[status] += 1
+
+    pool_samples: List[List[Tuple[str, Dict[str, str], float]]] = []
+    sampler: Optional[asyncio.Task[None]] = None
+    for i in range(int(rps * (warmup + duration))):
+        scheduled = started + i / rps
+        if sampler is None and scheduled >= measure_from:
+            sampler = asyncio.create_task(_sample_pools(client, sample_interval, pool_samples))
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        measured = int(scheduled >= measure_from)
+        if in_flight >= max_in_flight:
+            dropped += measured
+            continue
+        sent += measured
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        task = asyncio.create_task(send(mix[i % len(mix)], scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - measure_from
+    if sampler is not None:
+        sampler.cancel()
+
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return LoadReport(
+        target_rps=rps,
+        duration_seconds=duration,
+        sent=sent,
+        completed=len(latencies),
+        dropped=dropped,
+        statuses=dict(statuses),
+        achieved_rps=ok / elapsed if elapsed > 0 else 0.0,
+        latency=summarize_latencies(latencies),
+        max_in_flight=peak_in_flight,
+        pools=summarize_pools(pool_samples),
+    )
+
+
+def format_report(report: LoadReport) -> str:
+    latency = report.latency
+    lines = [
+        f"target {report.target_rps:g} rps for {report.duration_seconds:g}s: "
+        f"{report.sent} sent, {report.completed} completed, {report.dropped} dropped",
+        f"throughput   {report.achieved_rps:.1f} rps (2xx)",
+        f"statuses     {', '.join(f'{status}: {count}' for status, count in sorted(report.statuses.items()))}",
+        f"latency ms   p50 {latency.p50_ms:.1f}  p95 {latency.p95_ms:.1f}  p99 {latency.p99_ms:.1f}  "
+        f"max {latency.max_ms:.1f}  mean {latency.mean_ms:.1f}",
+        f"in flight    max {report.max_in_flight}",
+    ]
+    if report.pools:
+        lines.append(
+            f"{'pool':<12} {'workers':>8} {'active':>8} {'max queue':>10} {'mean queue':>11} {'saturated':>10}"
+        )
+        for pool in report.pools:
+            lines.append(
+                f"{pool.executor:<12} {pool.max_workers:>8} {pool.max_active_tasks:>8} {pool.max_queue_depth:>10} "
+                f"{pool.mean_queue_depth:>11.1f} {pool.saturated_ratio:>10.0%}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load_test", description="Load test /reservoir/data."
+    )
+    parser.add_argument("--url", help="running API to target; without it a SQLite stand-in is started")
+    parser.add_argument("--rps", type=float, default=20.0, help="requests per second to send")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before the measurement")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="sends are dropped beyond this")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--queries", type=int, default=1000, help="distinct queries the requests cycle through")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--first-day", type=date.fromisoformat, default=FIRST_DAY, help="first day of the data behind --url (the stand-in starts on %(default)s)")
+    parser.add_argument("--days", type=int, default=1825, help="days of data (generated by the stand-in)")
+    parser.add_argument("--seed", type=int, default=0)
+    stand_in = parser.add_argument_group("stand-in")
+    stand_in.add_argument("--latency", type=float, default=0.3, help="BigQuery job latency in seconds")
+    stand_in.add_argument("--latency-jitter", type=float, default=0.5, help="± fraction of --latency")
+    stand_in.add_argument("--rpc-latency", type=float, default=0.02, help="seconds each API call holds a thread")
+    stand_in.add_argument("--bq-workers", type=int, help="BigQuery pool size (BQ_MAX_WORKERS otherwise)")
+    stand_in.add_argument("--no-result-cache", action="store_true", help="send every request to the repository")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="exit with 1 when p95 latency is above this")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace, base_url: str) -> LoadReport:
+    # No RetryTransport here: a retried request would hide its failure inside its latency
+    # One connection per in-flight request, plus one for the /metrics sampler
+    connections = args.max_in_flight + 1
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        await wait_until_healthy(client, timeout=300.0)
+        mix = request_mix(args.queries, args.first_day, args.days, args.page_size, args.seed)
+        return await run_load(client, mix, args.rps, args.duration, args.warmup, args.max_in_flight)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    process: Optional[BaseProcess] = None
+    base_url = args.url
+    # Holds the stand-in database, built by the server process
+    directory = tempfile.TemporaryDirectory(prefix="reservoir_load_test_")
+    if base_url is None:
+        settings = StandInSettings(
+            database_path=os.path.join(directory.name, "gold.sqlite"),
+            days=args.days,
+            latency_seconds=args.latency,
+            latency_jitter=args.latency_jitter,
+            rpc_latency_seconds=args.rpc_latency,
+            bq_max_workers=args.bq_workers,
+            result_cache=not args.no_result_cache,
+            seed=args.seed,
+        )
+        args.first_day = FIRST_DAY
+        print(f"Starting the reservoir API on a SQLite stand-in ({args.days} days of data)...", flush=True)
+        process, base_url = start_stand_in(settings)
+    try:
+        report = asyncio.run(_run(args, base_url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join(10)
+        directory.cleanup()
+
+    print(format_report(report))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(report.model_dump_json(indent=2))
+    if args.max_p95_ms is not None and report.latency.p95_ms > args.max_p95_ms:
+        print(f"p95 {report.latency.p95_ms:.1f} ms is above {args.max_p95_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
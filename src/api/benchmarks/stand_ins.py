@@ -0,0 +1,92 @@
+import functools
+import threading
+from datetime import date
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import IO, Any, Dict
+
+from repositories.gcs_repository import GCSFileRepository
+
+READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class LocalFileServer:
+    """
+    Serves a directory over HTTP from a background thread, standing in for the
+    ONS CDN. Responses carry Content-Length and Last-Modified like the real one.
+    """
+
+    def __init__(self, directory: str, host: str = "127.0.0.1", port: int = 0) -> None:
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.host = host
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="benchmark-http", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.server_port}"
+
+    def url(self, filename: str) -> str:
+        return f"{self.base_url}/{filename}"
+
+    def start(self) -> "LocalFileServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalFileServer":
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+class NullGCSRepository(GCSFileRepository):
+    """
+    GCSFileRepository that reads every upload to the end and discards it, and
+    reports an empty raw table. No Google clients are created.
+    """
+
+    def __init__(self, bucket_name: str = "benchmark-bucket") -> None:
+        self.bucket_name = bucket_name
+        self.uploaded_bytes = 0
+        self.uploads = 0
+
+    def _drain(self, file: IO[bytes]) -> int:
+        size = 0
+        while chunk := file.read(READ_CHUNK_SIZE):
+            size += len(chunk)
+        self.uploaded_bytes += size
+        self.uploads += 1
+        return size
+
+    def upload(self, file: IO[bytes], filename: str, content_type: str, _bucket_name: str | None) -> str:
+        self._drain(file)
+        return f"gs://{_bucket_name or self.bucket_name}/{filename}"
+
+    def upload_stream(self, file: IO[bytes], filename: str, content_type: str, _bucket_name: str | None) -> str:
+        file.seek(0)
+        self._drain(file)
+        return f"gs://{_bucket_name or self.bucket_name}/{filename}"
+
+    def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool:
+        return False
+
+    def raw_table_watermarks(self, package_name: str) -> Dict[int, date]:
+        return {}
@@ -3,21 +3,18 @@ from fastapi import FastAPI
 from pydantic import BaseModel
 import uvicorn
 from datetime import date
-from routers.ons_router import create_router as create_router
-from routers.bigquery_router import create_router as create_reservoir_router
+from application import create_app
+from services.bigquery_service import ReservoirService
+from services.ons_service import OnsService
 from dotenv import load_dotenv
 
 # carrega o arquivo .env que está no mesmo diretório do main.py
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI(
-    title="ONS Data Fetcher API",
-    description="An API to fetch and filter PARQUET file resources from the ONS open data portal.",
-    version="1.0.0",
-)
+ons_service = OnsService()
+reservoir_service = ReservoirService()
 
-app.include_router(create_router())
-app.include_router(create_reservoir_router())  
+app: FastAPI = create_app(reservoir_service, ons_service)
 
 
 class DataFilter(BaseModel):
@@ -31,15 +28,14 @@ async def root() -> dict:
         "message": "Hello World",
         "endpoints": {
             "ons": "/ons/filter-parquet-files",
-            "reservoir": "/reservoir/data",  
+            "reservoir": "/reservoir/data",
+            "reservoir_aggregate": "/reservoir/aggregate",
+            "reservoir_export": "/reservoir/export",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
-@app.get("/health")
-async def health() -> dict:
-    return {"status": "healthy"}
-
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
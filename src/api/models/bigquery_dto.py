@@ -5,7 +5,18 @@ from datetime import date, datetime
 class ReservoirResponseDTO(BaseModel):
     """Simple DTO for reservoir response"""
     data: List[Dict[str, Any]]
-    total_records: int
+    total_records: Optional[int] = Field(
+        default=None, description="Rows matching the filter; null when requested with include_total=false."
+    )
     page: int
-    page_size: int    
-   
\ No newline at end of file
+    page_size: int
+    next_cursor: Optional[str] = Field(
+        default=None, description="Opaque cursor for the next page; null when this is the last page."
+    )
+
+
+class ReservoirAggregateResponseDTO(BaseModel):
+    """Aggregated reservoir time series"""
+    data: List[Dict[str, Any]]
+    granularity: str
+    group_by: Optional[str] = Field(default=None, description="Dimension the series is split by, if any.")
@@ -17,3 +17,8 @@ class DateFilterDTO(BaseModel):
     package: str | None = Field(None, description="Package name to filter resources.")
 
     bucket: str | None = Field(None, description="GCS bucket to save files.")
+
+    streaming: bool = Field(
+        default=False,
+        description="Stream downloads to disk and convert them in record batches (bounded memory).",
+    )
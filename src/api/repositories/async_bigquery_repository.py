@@ -0,0 +1,213 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import pyarrow as pa  # type: ignore[import-untyped]
+from google.cloud import bigquery
+from pydantic import BaseModel
+
+from repositories.bigquery_repository import GCPBigQueryRepository, QueryParameters, record_job_metrics
+from utils.logger import LogLevel, log
+from utils.metrics import track_executor
+
+T = TypeVar("T")
+
+
+class BigQueryStats(BaseModel):
+    jobs_submitted: int
+    jobs_completed: int
+    jobs_failed: int
+    jobs_in_flight: int
+    polls: int
+    executor_workers: int
+    executor_busy: int
+
+
+class AsyncBigQueryRepository:
+    """
+    Async facade over ``GCPBigQueryRepository``.
+
+    Jobs are submitted and then polled cooperatively with ``asyncio.sleep``
+    between ``job.done()`` checks, so a thread is only held for each short RPC
+    and never while BigQuery is running the job. Those RPCs run on a dedicated
+    pool (``BQ_MAX_WORKERS``) instead of the default executor, which keeps
+    reservoir queries from starving other ``to_thread`` users and vice versa.
+    A job whose caller goes away (client disconnect, failed sibling query) is
+    cancelled in BigQuery, so it stops using slots and billing bytes.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[GCPBigQueryRepository] = None,
+        max_workers: Optional[int] = None,
+        poll_initial: Optional[float] = None,
+        poll_max: Optional[float] = None,
+    ) -> None:
+        self.repository = repository or GCPBigQueryRepository()
+        self.max_workers = max_workers or int(os.environ.get("BQ_MAX_WORKERS", 8))
+        self.poll_initial = poll_initial or float(os.environ.get("BQ_POLL_INITIAL_SECONDS", 0.05))
+        self.poll_max = poll_max or float(os.environ.get("BQ_POLL_MAX_SECONDS", 1.0))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bigquery")
+        track_executor("bigquery", self._executor, self.max_workers)
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "polls": 0, "busy": 0}
+
+    @property
+    def project_id(self) -> str:
+        return self.repository.project_id
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += delta
+
+    @property
+    def stats(self) -> BigQueryStats:
+        with self._lock:
+            counters = dict(self._counters)
+        return BigQueryStats(
+            jobs_submitted=counters["submitted"],
+            jobs_completed=counters["completed"],
+            jobs_failed=counters["failed"],
+            jobs_in_flight=counters["submitted"] - counters["completed"] - counters["failed"],
+            polls=counters["polls"],
+            executor_workers=self.max_workers,
+            executor_busy=counters["busy"],
+        )
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        def call() -> T:
+            self._count("busy")
+            try:
+                return func(*args)
+            finally:
+                self._count("busy", -1)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def _cancel(self, job: bigquery.QueryJob) -> None:
+        """Ask BigQuery to stop an abandoned job; the RPC runs on the pool, unawaited."""
+
+        def cancel() -> None:
+            try:
+                job.cancel()
+                log(f"Cancelled BigQuery job {getattr(job, 'job_id', None)}", LogLevel.DEBUG)
+            except Exception as e:
+                log(f"Could not cancel BigQuery job {getattr(job, 'job_id', None)}: {e}", LogLevel.ERROR)
+
+        try:
+            self._executor.submit(cancel)
+        except RuntimeError:
+            # Pool already shut down: the process is exiting and the job is left to finish
+            pass
+
+    def _cancel_when_submitted(self, submission: "asyncio.Future[bigquery.QueryJob]") -> None:
+        if not submission.cancelled() and submission.exception() is None:
+            self._count("submitted")
+            self._count("failed")
+            self._cancel(submission.result())
+
+    async def _execute(self, query: str, query_parameters: QueryParameters) -> bigquery.QueryJob:
+        """Submit ``query`` and wait for it to finish without blocking a thread."""
+        submission = asyncio.ensure_future(self._run(self.repository.submit_query, query, query_parameters))
+        try:
+            job = await asyncio.shield(submission)
+        except asyncio.CancelledError:
+            # The submit RPC still returns a running job: cancel it once it does
+            submission.add_done_callback(self._cancel_when_submitted)
+            raise
+        self._count("submitted")
+        delay = self.poll_initial
+        finished = False
+        try:
+            while not await self._run(job.done):
+                self._count("polls")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.poll_max)
+            finished = True
+            if job.error_result:
+                raise job.exception() or RuntimeError(str(job.error_result))
+        except BaseException:
+            self._count("failed")
+            if not finished:
+                self._cancel(job)
+            raise
+        self._count("completed")
+        record_job_metrics(job)
+        return job
+
+    async def execute_query(self, query: str, query_parameters: QueryParameters = ()) -> List[Dict[str, Any]]:
+        job = await self._execute(query, query_parameters)
+        data = await self._run(self.repository.fetch_rows, job)
+        log(f"Query executed successfully: {len(data)} rows", LogLevel.INFO)
+        return data
+
+    async def execute_count_query(
+        self, count_query: Optional[str], query_parameters: QueryParameters = ()
+    ) -> Optional[int]:
+        if count_query is None:
+            return None
+        rows = await self.execute_query(count_query, query_parameters)
+        return rows[0]["total"] if rows else 0
+
+    async def _page_with_count(
+        self,
+        query: str,
+        count_query: Optional[str],
+        query_parameters: QueryParameters,
+        count_parameters: QueryParameters,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        # Both jobs run at the same time; latency is the slower one, not the sum
+        page = asyncio.ensure_future(self.execute_query(query, query_parameters))
+        count = asyncio.ensure_future(self.execute_count_query(count_query, count_parameters))
+        try:
+            data, total_records = await asyncio.gather(page, count)
+        except BaseException:
+            # gather leaves the other job running when one fails; cancelling its
+            # task cancels the job in BigQuery as well
+            for task in (page, count):
+                task.cancel()
+            await asyncio.gather(page, count, return_exceptions=True)
+            raise
+        return data, total_records
+
+    async def execute_paginated_query(
+        self,
+        query: str,
+        count_query: Optional[str],
+        page: int,
+        page_size: int,
+        query_parameters: QueryParameters = (),
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        offset = (page - 1) * page_size
+        log(f"Executing paginated query - Page: {page}, Size: {page_size}", LogLevel.DEBUG)
+        return await self._page_with_count(
+            f"{query} LIMIT {page_size} OFFSET {offset}", count_query, query_parameters, query_parameters
+        )
+
+    async def execute_keyset_query(
+        self,
+        query: str,
+        count_query: Optional[str],
+        page_size: int,
+        query_parameters: QueryParameters,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        log(f"Executing keyset query - Size: {page_size}", LogLevel.DEBUG)
+        # The count ignores the cursor, so it only binds the parameters it names
+        count_parameters = [p for p in query_parameters if count_query and f"@{p.name}" in count_query]
+        return await self._page_with_count(
+            f"{query} LIMIT {page_size}", count_query, query_parameters, count_parameters
+        )
+
+    async def execute_arrow_query(
+        self, query: str, page_size: int, query_parameters: QueryParameters = ()
+    ) -> Iterator[pa.RecordBatch]:
+        job = await self._execute(query, query_parameters)
+        return await self._run(self.repository.arrow_batches, job, page_size)
+
+    async def get_table_schema(self, table_id: str) -> Dict[str, str]:
+        return await self._run(self.repository.get_table_schema, table_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -7,3 +7,8 @@ class FileRepository(ABC):
     def upload(self, file: IO[bytes], filename: str, content_type: str, _bucket_name: str | None) -> str:
         """Upload the given bytes stream and return a public URL or path."""
         raise NotImplementedError
+
+    @abstractmethod
+    def upload_stream(self, file: IO[bytes], filename: str, content_type: str, _bucket_name: str | None) -> str:
+        """Upload a seekable file object in chunks and return a public URL or path."""
+        raise NotImplementedError
@@ -1,22 +1,80 @@
 import os
 import json
+import importlib.util
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Sequence
+import pyarrow as pa  # type: ignore[import-untyped]
 from google.cloud import bigquery
-from google.cloud.exceptions import GoogleCloudError
 from google.oauth2 import service_account  # type: ignore[import-untyped]
 from utils.logger import LogLevel, log
+from utils.metrics import REGISTRY
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+QueryParameters = Sequence[bigquery.ScalarQueryParameter]
+
+BIGQUERY_JOBS = REGISTRY.counter(
+    "bigquery_jobs_total", "Finished BigQuery query jobs", labels=("cache_hit",)
+)
+BIGQUERY_BYTES_PROCESSED = REGISTRY.counter(
+    "bigquery_bytes_processed_total", "total_bytes_processed summed over query jobs"
+)
+BIGQUERY_BYTES_BILLED = REGISTRY.counter(
+    "bigquery_bytes_billed_total", "total_bytes_billed summed over query jobs"
+)
+BIGQUERY_SLOT_MS = REGISTRY.counter(
+    "bigquery_slot_milliseconds_total", "slot_millis summed over query jobs"
+)
+BIGQUERY_JOB_BYTES = REGISTRY.histogram(
+    "bigquery_job_bytes_processed",
+    "total_bytes_processed per query job",
+    buckets=tuple(float(10**exponent) for exponent in range(3, 13)),
+)
+
+
+def _job_statistic(job: bigquery.QueryJob, name: str) -> int:
+    # None until the job is done, and for some cached results
+    value = getattr(job, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def record_job_metrics(job: bigquery.QueryJob) -> None:
+    """Publish the cost statistics of a finished job."""
+    processed = _job_statistic(job, "total_bytes_processed")
+    BIGQUERY_JOBS.inc(cache_hit="true" if getattr(job, "cache_hit", None) is True else "false")
+    BIGQUERY_BYTES_PROCESSED.inc(processed)
+    BIGQUERY_BYTES_BILLED.inc(_job_statistic(job, "total_bytes_billed"))
+    BIGQUERY_SLOT_MS.inc(_job_statistic(job, "slot_millis"))
+    BIGQUERY_JOB_BYTES.observe(processed)
+
 
 class BigQueryRepository(ABC):
+    """
+    Primitivas bloqueantes do BigQuery. O AsyncBigQueryRepository as executa no seu
+    pool: submete o job, consulta ``job.done()`` sem segurar thread e lê o resultado.
+    """
+
+    @abstractmethod
+    def submit_query(
+        self, query: str, query_parameters: QueryParameters = ()
+    ) -> bigquery.QueryJob:
+        """Inicia o job sem esperar pelo resultado"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_rows(self, job: bigquery.QueryJob) -> List[Dict[str, Any]]:
+        """Linhas de um job concluído (levanta o erro do job se ele falhou)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def arrow_batches(self, query_job: bigquery.QueryJob, page_size: int) -> Iterator[pa.RecordBatch]:
+        """Resultado de um job concluído em record batches Arrow, sob demanda"""
+        raise NotImplementedError
+
     @abstractmethod
-    def execute_paginated_query(
-        self, query: str, count_query: str, page: int, page_size: int
-    ) -> Tuple[List[Dict[str, Any]], int]:
-        """Executa query paginada no BigQuery"""
+    def get_table_schema(self, table_id: str) -> Dict[str, str]:
+        """Colunas de ``dataset.tabela`` no projeto, com o tipo de cada uma (ex.: FLOAT)"""
         raise NotImplementedError
 
 
@@ -29,6 +87,9 @@ class GCPBigQueryRepository(BigQueryRepository):
             LogLevel.DEBUG,
         )
         self._client: bigquery.Client | None = None  # lazy init
+        self._bqstorage_client: Any = None
+        # Results at least this large are read through the Storage Read API when available
+        self.storage_api_min_rows = int(os.environ.get("BQ_STORAGE_API_MIN_ROWS", 100000))
 
     @property
     def client(self) -> bigquery.Client:
@@ -40,6 +101,20 @@ class GCPBigQueryRepository(BigQueryRepository):
     def client(self, value: bigquery.Client) -> None:  # 👈 setter só pra testes
         self._client = value
 
+    @property
+    def bqstorage_client(self) -> Any:
+        """BigQuery Storage Read client, or None when the package is not installed."""
+        if self._bqstorage_client is None:
+            if importlib.util.find_spec("google.cloud.bigquery_storage") is None:
+                return None
+            from google.cloud import bigquery_storage  # type: ignore[attr-defined, unused-ignore]
+
+            log("Creating BigQuery Storage Read client", LogLevel.DEBUG)
+            self._bqstorage_client = bigquery_storage.BigQueryReadClient(
+                credentials=self.client._credentials
+            )
+        return self._bqstorage_client
+
     def _create_bigquery_client(self) -> bigquery.Client:
         log("Creating BigQuery client", LogLevel.DEBUG)
 
@@ -78,34 +153,66 @@ class GCPBigQueryRepository(BigQueryRepository):
             log(f"All authentication methods failed: {e}", LogLevel.ERROR)
             raise Exception(f"Could not authenticate with BigQuery: {e}")
 
-    def execute_paginated_query(
-        self, query: str, count_query: str, page: int, page_size: int
-    ) -> Tuple[List[Dict[str, Any]], int]:
-        try:
-            log(
-                f"Executing count query (project={self.project_id} | location={self.location}): {count_query}",
-                LogLevel.DEBUG,
-            )
-            count_job = self.client.query(count_query)  # 🔑 usa o property → cria só se precisar
-            count_result = list(count_job.result())
-            total_records = count_result[0]["total"] if count_result else 0
-
-            offset = (page - 1) * page_size
-            paginated_query = f"{query} LIMIT {page_size} OFFSET {offset}"
-
-            log(f"Executing paginated query - Page: {page}, Size: {page_size}", LogLevel.DEBUG)
-            log(f"Running query: {paginated_query}", LogLevel.DEBUG)
-
-            query_job = self.client.query(paginated_query)
-            results = query_job.result()
-            data = [dict(row) for row in results]
+    @staticmethod
+    def _job_config(query_parameters: QueryParameters) -> bigquery.QueryJobConfig:
+        """Same settings for every job: bound parameters and BigQuery's result cache on."""
+        return bigquery.QueryJobConfig(
+            query_parameters=list(query_parameters), use_query_cache=True
+        )
 
-            log(f"Query executed successfully: {len(data)} rows of {total_records} total", LogLevel.INFO)
-            return data, total_records
+    def submit_query(
+        self, query: str, query_parameters: QueryParameters = ()
+    ) -> bigquery.QueryJob:
+        """Start a job without waiting for it; poll with ``job.done()``."""
+        log(f"Submitting query: {query}", LogLevel.DEBUG)
+        return self.client.query(query, job_config=self._job_config(query_parameters))
+
+    @staticmethod
+    def fetch_rows(job: bigquery.QueryJob) -> List[Dict[str, Any]]:
+        """Rows of a finished job (raises the job error if it failed)."""
+        return [dict(row) for row in job.result()]
+
+    def get_table_schema(self, table_id: str) -> Dict[str, str]:
+        log(f"Fetching schema of {self.project_id}.{table_id}", LogLevel.DEBUG)
+        table = self.client.get_table(f"{self.project_id}.{table_id}")
+        return {field.name: field.field_type for field in table.schema}
+
+    def arrow_batches(self, query_job: bigquery.QueryJob, page_size: int) -> Iterator[pa.RecordBatch]:
+        """
+        Record batches of ``query_job``, fetched lazily.
+
+        Results with at least ``storage_api_min_rows`` rows are read in parallel
+        streams through the BigQuery Storage Read API; smaller results, or any
+        environment without ``google-cloud-bigquery-storage``, page through REST
+        (``page_size`` rows per call). A Storage API failure before the first
+        batch falls back to REST as well.
+        """
+        rows = query_job.result(page_size=page_size)
+        total_rows = rows.total_rows or 0
+
+        bqstorage_client = (
+            self.bqstorage_client if total_rows >= self.storage_api_min_rows else None
+        )
+        log(
+            f"Arrow query ready: {total_rows} rows via "
+            f"{'Storage Read API' if bqstorage_client is not None else 'REST'}",
+            LogLevel.INFO,
+        )
+        if bqstorage_client is None:
+            return rows.to_arrow_iterable()
 
-        except GoogleCloudError as e:
-            log(f"BigQuery error: {e}", LogLevel.ERROR)
-            raise
+        batches = rows.to_arrow_iterable(bqstorage_client=bqstorage_client)
+        try:
+            first = next(batches, None)
         except Exception as e:
-            log(f"Unexpected error in paginated query: {e}", LogLevel.ERROR)
-            raise
+            log(f"Storage Read API failed, falling back to REST: {e}", LogLevel.ERROR)
+            return query_job.result(page_size=page_size).to_arrow_iterable()
+        return self._chain_first(first, batches)
+
+    @staticmethod
+    def _chain_first(
+        first: Optional[pa.RecordBatch], rest: Iterator[pa.RecordBatch]
+    ) -> Iterator[pa.RecordBatch]:
+        if first is not None:
+            yield first
+        yield from rest
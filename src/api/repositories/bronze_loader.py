@@ -0,0 +1,82 @@
+from typing import Set
+
+import google.cloud.bigquery as bigquery  # type: ignore[import-untyped]
+from google.api_core.exceptions import NotFound  # type: ignore[import-untyped]
+
+from repositories.gcs_repository import HIVE_PARTITION_KEYS, GCSFileRepository
+from utils.logger import LogLevel, log
+
+_HIVE_KEY_TYPES = {"year": "INTEGER", "ingest_date": "DATE"}
+
+
+def hive_prefix(bucket_name: str, package: str) -> str:
+    return f"gs://{bucket_name}/package={package}"
+
+
+class BronzeTableLoader:
+    """
+    Keeps ``bronze.raw_{package}`` a hive-partitioned external table over the
+    ``package=<p>/year=<y>/ingest_date=<d>/`` layout.
+
+    BigQuery lists the files at query time, so an ingestion batch needs no
+    load job and never rescans old files; queries filtering on ``year`` or
+    ``ingest_date`` only read the matching folders. The table definition is
+    checked once per package per process and only rewritten when it is
+    missing or still points at the old flat layout.
+    """
+
+    def __init__(self, repository: GCSFileRepository, dataset_id: str = "bronze") -> None:
+        self.repository = repository
+        self.dataset_id = dataset_id
+        self._registered: Set[str] = set()
+
+    def external_config(self, bucket_name: str, package: str) -> bigquery.ExternalConfig:
+        prefix = hive_prefix(bucket_name, package)
+        options = bigquery.HivePartitioningOptions()
+        options.mode = "CUSTOM"
+        options.source_uri_prefix = prefix + "".join(
+            f"/{{{key}:{_HIVE_KEY_TYPES[key]}}}" for key in HIVE_PARTITION_KEYS
+        )
+        options.require_partition_filter = False
+        config = bigquery.ExternalConfig("PARQUET")
+        config.source_uris = [f"{prefix}/*"]
+        config.hive_partitioning = options
+        return config
+
+    @staticmethod
+    def _is_current(table: bigquery.Table, config: bigquery.ExternalConfig) -> bool:
+        current = table.external_data_configuration
+        return (
+            current is not None
+            and current.hive_partitioning is not None
+            and list(current.source_uris or []) == config.source_uris
+        )
+
+    def ensure_table(self, package: str, bucket_name: str) -> bool:
+        """Create or migrate the external table; True when its definition changed."""
+        key = f"{bucket_name}/{package}"
+        if key in self._registered:
+            return False
+
+        client = self.repository.bq_client
+        table_ref = client.dataset(self.dataset_id).table(f"raw_{package}")
+        config = self.external_config(bucket_name, package)
+        try:
+            existing = client.get_table(table_ref)
+        except NotFound:
+            existing = None
+
+        changed = existing is None or not self._is_current(existing, config)
+        if changed:
+            if existing is not None:
+                # Only the definition goes away; the files stay in GCS
+                client.delete_table(table_ref)
+            table = bigquery.Table(table_ref)
+            table.external_data_configuration = config
+            client.create_table(table)
+            log(
+                f"Registered {self.dataset_id}.raw_{package} over {config.source_uris[0]}",
+                LogLevel.INFO,
+            )
+        self._registered.add(key)
+        return changed
@@ -1,17 +1,31 @@
 import os
 import json
-from typing import IO, Tuple
+from datetime import date
+from typing import IO, Dict, Tuple
 import google.cloud.storage as storage  # type: ignore[import-untyped]
 import google.cloud.bigquery as bigquery  # type: ignore[import-untyped]
 from google.oauth2 import service_account  # type: ignore[import-untyped]
 from google.api_core.exceptions import NotFound  # type: ignore[import-untyped]
 from repositories.base_repository import FileRepository
 from utils.logger import LogLevel, log
+from utils.metrics import REGISTRY
 from dotenv import load_dotenv
 
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+# Resumable uploads send the object in chunks of this size (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = int(os.environ.get("GCS_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+
+# Hive path keys of the raw layout (package=<p>/year=<y>/ingest_date=<d>/), in folder order
+HIVE_PARTITION_KEYS = ("year", "ingest_date")
+
+GCS_UPLOADED_BYTES = REGISTRY.counter(
+    "gcs_uploaded_bytes_total", "Bytes uploaded to GCS", labels=("bucket", "mode")
+)
+GCS_UPLOADS = REGISTRY.counter(
+    "gcs_uploads_total", "Objects uploaded to GCS", labels=("bucket", "mode")
+)
 
 class GCSFileRepository(FileRepository):
     def __init__(self) -> None:
@@ -139,15 +153,45 @@ class GCSFileRepository(FileRepository):
                 raise Exception(f"Bucket '{bucket.name}' does not exist.")
 
             blob = bucket.blob(filename)
-            blob.upload_from_string(file.read(), content_type=content_type)
+            data = file.read()
+            blob.upload_from_string(data, content_type=content_type)
+            GCS_UPLOADED_BYTES.inc(len(data), bucket=_bucket_name or self.bucket_name, mode="buffer")
+            GCS_UPLOADS.inc(bucket=_bucket_name or self.bucket_name, mode="buffer")
             return blob.public_url
         except Exception as e:
             log(f"Error uploading file to GCS: {e}", LogLevel.ERROR)
             raise
 
+    def upload_stream(self, file: IO[bytes], filename: str, content_type: str, _bucket_name: str | None) -> str:
+        """Upload a file object through a chunked resumable upload, without reading it into memory."""
+        try:
+            if _bucket_name:
+                log(f"Using custom bucket: {_bucket_name}", LogLevel.DEBUG)
+                bucket = self.client.bucket(_bucket_name)
+            else:
+                bucket = self.bucket
+
+            if not bucket.exists():
+                log(f"Bucket '{bucket.name}' does not exist.", LogLevel.ERROR)
+                raise Exception(f"Bucket '{bucket.name}' does not exist.")
+
+            blob = bucket.blob(filename, chunk_size=UPLOAD_CHUNK_SIZE)
+            size = file.seek(0, os.SEEK_END)
+            file.seek(0)
+            blob.upload_from_file(file, rewind=True, content_type=content_type)
+            GCS_UPLOADED_BYTES.inc(size, bucket=_bucket_name or self.bucket_name, mode="stream")
+            GCS_UPLOADS.inc(bucket=_bucket_name or self.bucket_name, mode="stream")
+            return blob.public_url
+        except Exception as e:
+            log(f"Error streaming file to GCS: {e}", LogLevel.ERROR)
+            raise
+
     def save(self, file: IO[bytes], filename: str, _bucket_name: str | None) -> str:
         return self.upload(file, filename, "application/octet-stream", _bucket_name)
 
+    def save_stream(self, file: IO[bytes], filename: str, _bucket_name: str | None) -> str:
+        return self.upload_stream(file, filename, "application/octet-stream", _bucket_name)
+
     def _table_exists(self, dataset_id: str, table_id: str) -> bool:
         """Check if a BigQuery table exists"""
         try:
@@ -200,4 +244,46 @@ class GCSFileRepository(FileRepository):
             
         except Exception as e:
             log(f"Error querying table {dataset_id}.{table_id}: {e}", LogLevel.ERROR)
-            return False
\ No newline at end of file
+            return False
+
+    def raw_table_watermarks(self, package_name: str) -> Dict[int, date]:
+        """
+        Return the last ingested day of each year in the raw table of a package,
+        using one table lookup and one query. Empty when the table doesn't exist.
+        """
+        table_id = f"raw_{package_name}"
+        dataset_id = "bronze"
+
+        try:
+            table = self.bq_client.get_table(self.bq_client.dataset(dataset_id).table(table_id))
+        except NotFound:
+            log(f"Table {dataset_id}.{table_id} doesn't exist, no watermarks", LogLevel.INFO)
+            return {}
+
+        date_column = next(
+            (
+                field.name
+                for field in table.schema
+                if "dat" in field.name.lower() and field.name not in HIVE_PARTITION_KEYS
+            ),
+            None,
+        )
+        if not date_column:
+            log(f"No date column in {dataset_id}.{table_id}, no watermarks", LogLevel.INFO)
+            return {}
+
+        query = f"""
+            SELECT EXTRACT(YEAR FROM day) AS year, MAX(day) AS last_day
+            FROM (
+                SELECT SAFE_CAST(SUBSTR(CAST(`{date_column}` AS STRING), 1, 10) AS DATE) AS day
+                FROM `sauter-university-challenger.{dataset_id}.{table_id}`
+            )
+            WHERE day IS NOT NULL
+            GROUP BY year
+        """
+
+        log(f"Querying watermarks of {dataset_id}.{table_id} on column {date_column}", LogLevel.DEBUG)
+        results = self.bq_client.query(query).result()
+        watermarks = {int(row["year"]): row["last_day"] for row in results}
+        log(f"Found watermarks for {len(watermarks)} years in {dataset_id}.{table_id}", LogLevel.INFO)
+        return watermarks
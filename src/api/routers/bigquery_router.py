@@ -1,11 +1,19 @@
 from fastapi import APIRouter, HTTPException, Query
-from models.bigquery_dto import ReservoirResponseDTO
-from services.bigquery_service import ReservoirService
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from models.bigquery_dto import ReservoirAggregateResponseDTO, ReservoirResponseDTO
+from services.bigquery_service import EXPORT_MEDIA_TYPES, ReservoirService
+from typing import List, Literal, Optional
 from utils.logger import LogLevel, log
 from datetime import date
 
 
+def _split_csv(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated query parameter, ignoring blanks."""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()] or None
+
+
 class ReservoirRouter:
     def __init__(self, service: Optional[ReservoirService] = None) -> None:
         self.service = service or ReservoirService()
@@ -18,13 +26,30 @@ class ReservoirRouter:
             "/data",
             response_model=ReservoirResponseDTO,
             summary="Get Reservoir Data by Date Range",
-            description="Fetch reservoir data filtered by start and end date with pagination."
+            description=(
+                "Fetch reservoir data filtered by start and end date with pagination, "
+                "optionally narrowed to some columns and to a reservoir, basin or subsystem. "
+                "Pass the returned next_cursor as cursor to read the next page by keyset."
+            )
         )
         async def get_reservoir_data_endpoint(
             start_date: date = Query(..., description="Start date to filter (YYYY-MM-DD)"),
             end_date: date = Query(..., description="End date to filter (YYYY-MM-DD)"),
             page_offset: int = Query(1, ge=1, description="Page number"),
-            page_size: int = Query(100, ge=1, le=1000, description="Records per page")
+            page_size: int = Query(100, ge=1, le=1000, description="Records per page"),
+            cursor: Optional[str] = Query(
+                None,
+                description="next_cursor from a previous response; when set, page_offset is ignored",
+            ),
+            include_total: bool = Query(
+                True, description="Compute total_records; false skips the count entirely"
+            ),
+            fields: Optional[str] = Query(
+                None, description="Comma-separated columns to return (ena_data and nom_reservatorio are always included)"
+            ),
+            reservatorio: Optional[str] = Query(None, description="Filter by nom_reservatorio"),
+            bacia: Optional[str] = Query(None, description="Filter by nom_bacia"),
+            subsistema: Optional[str] = Query(None, description="Filter by nom_subsistema"),
         ) -> ReservoirResponseDTO:
             """Get reservoir data filtered by date range"""
             try:
@@ -35,14 +60,108 @@ class ReservoirRouter:
                         detail="Start date must be before end date"
                     )
                 
-                return await self.service.get_reservoir_data(start_date, end_date, page_offset, page_size)
+                return await self.service.get_reservoir_data(
+                    start_date,
+                    end_date,
+                    page_offset,
+                    page_size,
+                    cursor,
+                    include_total,
+                    reservatorio=reservatorio,
+                    bacia=bacia,
+                    subsistema=subsistema,
+                    fields=_split_csv(fields),
+                )
                 
+            except HTTPException:
+                raise
             except ValueError as exc:
                 raise HTTPException(status_code=400, detail=str(exc))
             except Exception as exc:
                 log(f"Error in reservoir endpoint: {exc}", LogLevel.ERROR)
                 raise HTTPException(status_code=500, detail=f"Internal error: {str(exc)}")
 
+        @self.router.get(
+            "/aggregate",
+            response_model=ReservoirAggregateResponseDTO,
+            summary="Aggregate Reservoir Data by Period",
+            description=(
+                "Aggregate reservoir metrics by week, month or year, optionally split by "
+                "reservoir, basin or subsystem, in a single BigQuery GROUP BY job."
+            )
+        )
+        async def get_reservoir_aggregate_endpoint(
+            start_date: date = Query(..., description="Start date to filter (YYYY-MM-DD)"),
+            end_date: date = Query(..., description="End date to filter (YYYY-MM-DD)"),
+            granularity: Literal["week", "month", "year"] = Query("month", description="Period size"),
+            group_by: Optional[Literal["reservatorio", "bacia", "subsistema"]] = Query(
+                None, description="Split the series by this dimension"
+            ),
+            metrics: Optional[str] = Query(
+                None, description="Comma-separated numeric columns (default ena_armazenavel_res_mwmed)"
+            ),
+            functions: Optional[str] = Query(
+                None, description="Comma-separated aggregates: avg, sum, min, max, count (default avg)"
+            ),
+            reservatorio: Optional[str] = Query(None, description="Filter by nom_reservatorio"),
+            bacia: Optional[str] = Query(None, description="Filter by nom_bacia"),
+            subsistema: Optional[str] = Query(None, description="Filter by nom_subsistema"),
+        ) -> ReservoirAggregateResponseDTO:
+            """Get reservoir data aggregated by period"""
+            if start_date > end_date:
+                raise HTTPException(status_code=400, detail="Start date must be before end date")
+
+            try:
+                return await self.service.get_reservoir_aggregate(
+                    start_date,
+                    end_date,
+                    granularity,
+                    group_by,
+                    metrics=_split_csv(metrics),
+                    functions=_split_csv(functions),
+                    reservatorio=reservatorio,
+                    bacia=bacia,
+                    subsistema=subsistema,
+                )
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            except Exception as exc:
+                log(f"Error in reservoir aggregate endpoint: {exc}", LogLevel.ERROR)
+                raise HTTPException(status_code=500, detail=f"Internal error: {str(exc)}")
+
+        @self.router.get(
+            "/export",
+            summary="Stream Reservoir Data by Date Range",
+            description=(
+                "Stream every row in the date range, without pagination, as NDJSON "
+                "or an Arrow IPC stream."
+            ),
+            response_class=StreamingResponse,
+        )
+        async def export_reservoir_data_endpoint(
+            start_date: date = Query(..., description="Start date to filter (YYYY-MM-DD)"),
+            end_date: date = Query(..., description="End date to filter (YYYY-MM-DD)"),
+            format: str = Query("ndjson", description="ndjson or arrow"),
+        ) -> StreamingResponse:
+            """Stream reservoir data filtered by date range"""
+            if start_date > end_date:
+                raise HTTPException(status_code=400, detail="Start date must be before end date")
+            if format not in EXPORT_MEDIA_TYPES:
+                raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+
+            try:
+                chunks = await self.service.export_reservoir_data(start_date, end_date, format)
+            except Exception as exc:
+                log(f"Error in reservoir export endpoint: {exc}", LogLevel.ERROR)
+                raise HTTPException(status_code=500, detail=f"Internal error: {str(exc)}")
+
+            filename = f"reservoir_{start_date}_{end_date}.{'arrows' if format == 'arrow' else 'ndjson'}"
+            return StreamingResponse(
+                chunks,
+                media_type=EXPORT_MEDIA_TYPES[format],
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+
 
-def create_router() -> APIRouter:
-    return ReservoirRouter().router
\ No newline at end of file
+def create_router(service: Optional[ReservoirService] = None) -> APIRouter:
+    return ReservoirRouter(service).router
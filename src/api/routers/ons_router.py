@@ -95,6 +95,7 @@ class OnsRouter:
                     "total_processed": result.total_processed,
                     "success_count": result.success_count,
                     "failure_count": result.failure_count,
+                    "stage_totals": [timing.model_dump() for timing in result.stage_totals],
                 }
 
                 if result.failure_count == 0:
@@ -167,5 +168,5 @@ class OnsRouter:
                 )
 
 
-def create_router() -> APIRouter:
-    return OnsRouter().router
\ No newline at end of file
+def create_router(service: OnsService | None = None) -> APIRouter:
+    return OnsRouter(service).router
\ No newline at end of file
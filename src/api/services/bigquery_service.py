@@ -1,67 +1,431 @@
-from typing import List, Dict, Any, Optional, Tuple
-from repositories.bigquery_repository import GCPBigQueryRepository
-from models.bigquery_dto import ReservoirResponseDTO
+from typing import List, Dict, Any, Awaitable, Callable, Iterable, Iterator, Optional, Sequence, Tuple, Type, TypeVar
+import pyarrow as pa  # type: ignore[import-untyped]
+from pydantic import BaseModel
+from repositories.async_bigquery_repository import AsyncBigQueryRepository
+from models.bigquery_dto import ReservoirAggregateResponseDTO, ReservoirResponseDTO
+from services.reservoir_query import TOTAL_COLUMN, ReservoirQueryBuilder
+from services.reservoir_replica import ReservoirReplica
 from utils.logger import LogLevel, log
-from datetime import date
+from utils.result_cache import ResultCache, create_result_cache
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import TTLCache
+from datetime import date, datetime, timedelta
 import asyncio
+import base64
+import io
+import json
+import os
+
+M = TypeVar("M", bound=BaseModel)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor pointing right after ``row`` in (ena_data, nom_reservatorio) order."""
+    ena_data = row["ena_data"]
+    payload = {
+        "ena_data": ena_data.isoformat() if isinstance(ena_data, (date, datetime)) else str(ena_data),
+        "nom_reservatorio": row["nom_reservatorio"],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return datetime.fromisoformat(payload["ena_data"]), str(payload["nom_reservatorio"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 
 class ReservoirService:
-    def __init__(self, repository: Optional[GCPBigQueryRepository] = None) -> None:
+    def __init__(
+        self,
+        repository: Optional[AsyncBigQueryRepository] = None,
+        result_cache: Optional[ResultCache] = None,
+        replica: Optional[ReservoirReplica] = None,
+    ) -> None:
         self._repository = repository  # guarda a ref
         self.table_id = "gold.dados_reservatorios_completo"
+        # Optional in-process snapshot of the gold table, kept fresh by replica.run()
+        if replica is None and os.environ.get("RESERVOIR_REPLICA_ENABLED", "false").lower() == "true":
+            replica = ReservoirReplica(self.repository, self.table_id)
+        self.replica = replica
+        self._total_cache: TTLCache[Tuple[Any, ...], int] = TTLCache(
+            float(os.environ.get("RESERVOIR_COUNT_TTL_SECONDS", 300))
+        )
+        self.result_cache = result_cache or create_result_cache()
+        self.historical_ttl = float(os.environ.get("RESERVOIR_CACHE_HISTORICAL_TTL_SECONDS", 86400))
+        self.recent_ttl = float(os.environ.get("RESERVOIR_CACHE_RECENT_TTL_SECONDS", 60))
+        # The daily gold MERGE rewrites this many trailing days (dias_reprocessamento)
+        self.reprocess_days = int(os.environ.get("RESERVOIR_CACHE_REPROCESS_DAYS", 7))
+        self.export_page_size = int(os.environ.get("RESERVOIR_EXPORT_PAGE_SIZE", 10000))
+        # Identical requests in flight at the same time share one BigQuery job
+        self._inflight: SingleFlight[str, Any] = SingleFlight()
+        self._schema_cache: TTLCache[str, Dict[str, str]] = TTLCache(
+            float(os.environ.get("RESERVOIR_SCHEMA_TTL_SECONDS", 3600))
+        )
 
     @property
-    def repository(self) -> GCPBigQueryRepository:
+    def repository(self) -> AsyncBigQueryRepository:
         """Só cria o repositório se realmente precisar"""
         if self._repository is None:
-            self._repository = GCPBigQueryRepository()
+            self._repository = AsyncBigQueryRepository()
         return self._repository
 
+    def close(self) -> None:
+        """Release the BigQuery worker pool, if it was ever created."""
+        if self._repository is not None:
+            self._repository.shutdown()
+
+    async def get_schema(self) -> Dict[str, str]:
+        """Column name -> BigQuery type of the reservoir table, fetched once per TTL."""
+        if self.replica is not None and self.replica.fresh:
+            return self.replica.schema
+        schema = self._schema_cache.get(self.table_id)
+        if schema is None:
+            schema = await self.repository.get_table_schema(self.table_id)
+            self._schema_cache.set(self.table_id, schema)
+        return schema
+
+    async def get_columns(self) -> List[str]:
+        """Column names of the reservoir table, fetched once per TTL."""
+        return list(await self.get_schema())
+
+    async def validate_fields(self, fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+        """Deduplicated ``fields``, or ValueError naming any column not in the table."""
+        if not fields:
+            return None
+        columns = await self.get_columns()
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(fields))
+
+    def _result_ttl(self, end_date: date) -> float:
+        """Ranges that end before the reprocessed window no longer change between refreshes."""
+        historical = end_date < date.today() - timedelta(days=self.reprocess_days)
+        return self.historical_ttl if historical else self.recent_ttl
+
+    def invalidate_cache(self, package: Optional[str] = None) -> None:
+        """Ingestion hook: drop cached pages and totals once new data lands."""
+        log(f"Invalidating reservoir result cache (package={package})", LogLevel.INFO)
+        self.result_cache.clear()
+        self._total_cache.invalidate()
+        if self.replica is not None:
+            self.replica.request_refresh()
+
+    @staticmethod
+    def _column_filters(
+        reservatorio: Optional[str], bacia: Optional[str], subsistema: Optional[str]
+    ) -> Dict[str, Optional[str]]:
+        return {"nom_reservatorio": reservatorio, "nom_bacia": bacia, "nom_subsistema": subsistema}
+
     async def get_reservoir_data(
         self,
         start_date: date,
         end_date: date,
         page_offset: int,
-        page_size: int
+        page_size: int,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        reservatorio: Optional[str] = None,
+        bacia: Optional[str] = None,
+        subsistema: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> ReservoirResponseDTO:
-        """Get reservoir data filtered by date range with pagination"""
+        """
+        Get reservoir data filtered by date range with pagination.
+
+        Without ``cursor`` pages are addressed by ``page_offset`` (LIMIT/OFFSET).
+        With ``cursor`` (the ``next_cursor`` of a previous response) the next page
+        is read with a keyset predicate, so deep pages cost the same as the first.
+
+        ``fields`` narrows the SELECT list (validated against the cached table
+        schema) and ``reservatorio``/``bacia``/``subsistema`` add equality filters.
+
+        The total is cached per filter. On a miss, offset pages compute it
+        with a window count in the same job; keyset pages (whose window would only
+        see rows after the cursor) fall back to the count query. With
+        ``include_total=False`` no total is computed and every page is one job.
+        """
         log(f"Fetching reservoir data from {start_date} to {end_date}", LogLevel.INFO)
 
-        try:
-            base_query = f"""
-                SELECT *
-                FROM `{self.repository.project_id}.{self.table_id}`
-                WHERE ena_data >= '{start_date}' 
-                  AND ena_data <= '{end_date}'
-                ORDER BY ena_data ASC
-            """
-
-            count_query = f"""
-                SELECT COUNT(*) as total 
-                FROM `{self.repository.project_id}.{self.table_id}`
-                WHERE ena_data >= '{start_date}' 
-                  AND ena_data <= '{end_date}'
-            """
-
-            log(f"Base query: {base_query}", LogLevel.DEBUG)
-            log(f"Count query: {count_query}", LogLevel.DEBUG)
+        fields = await self.validate_fields(fields)
 
+        if self.replica is not None and self.replica.fresh:
+            log("Serving reservoir data from local replica", LogLevel.DEBUG)
             data, total_records = await asyncio.to_thread(
-                self.repository.execute_paginated_query,
-                base_query,
-                count_query,
+                self.replica.query_page,
+                start_date,
+                end_date,
+                self._column_filters(reservatorio, bacia, subsistema),
+                fields,
                 page_offset,
-                page_size
+                page_size,
+                decode_cursor(cursor) if cursor else None,
             )
-
             return ReservoirResponseDTO(
                 data=data,
-                total_records=total_records,
+                total_records=total_records if include_total else None,
                 page=page_offset,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=encode_cursor(data[-1]) if len(data) == page_size else None,
+            )
+
+        filters = (start_date, end_date, reservatorio, bacia, subsistema)
+        result_key = "|".join(
+            str(part)
+            for part in (
+                self.table_id, *filters, ",".join(fields or ()), page_offset, page_size, cursor, include_total
+            )
+        )
+
+        async def load() -> ReservoirResponseDTO:
+            try:
+                cached_total = self._total_cache.get(filters) if include_total else None
+                needs_total = include_total and cached_total is None
+
+                builder = self._query_builder(start_date, end_date, reservatorio, bacia, subsistema).select(fields)
+                count_query, count_parameters = builder.build_count()
+
+                if cursor is None:
+                    base_query, parameters = builder.build(with_total=needs_total)
+                    log(f"Base query: {base_query}", LogLevel.DEBUG)
+
+                    data, total_records = await self.repository.execute_paginated_query(
+                        base_query,
+                        None,
+                        page_offset,
+                        page_size,
+                        parameters
+                    )
+                    if needs_total:
+                        total_records = self._pop_window_total(data)
+                        if total_records is None:
+                            # Page past the end: the window had no row to ride on
+                            log(f"Count query: {count_query}", LogLevel.DEBUG)
+                            total_records = await self.repository.execute_count_query(
+                                count_query, count_parameters
+                            )
+                else:
+                    keyset_query, parameters = builder.after_cursor(*decode_cursor(cursor)).build()
+
+                    log(f"Keyset query: {keyset_query}", LogLevel.DEBUG)
+                    if needs_total:
+                        log(f"Count query: {count_query}", LogLevel.DEBUG)
+
+                    data, total_records = await self.repository.execute_keyset_query(
+                        keyset_query,
+                        count_query if needs_total else None,
+                        page_size,
+                        parameters
+                    )
+
+                if needs_total and total_records is not None:
+                    self._total_cache.set(filters, total_records)
+                elif include_total:
+                    total_records = cached_total
+
+                next_cursor = encode_cursor(data[-1]) if len(data) == page_size else None
+
+                response = ReservoirResponseDTO(
+                    data=data,
+                    total_records=total_records,
+                    page=page_offset,
+                    page_size=page_size,
+                    next_cursor=next_cursor
+                )
+                return response
+
+            except Exception as e:
+                log(f"Error fetching reservoir data: {e}", LogLevel.ERROR)
+                raise
+
+        return await self._cached(result_key, ReservoirResponseDTO, end_date, load)
+
+    async def get_reservoir_aggregate(
+        self,
+        start_date: date,
+        end_date: date,
+        granularity: str,
+        group_by: Optional[str] = None,
+        metrics: Optional[Sequence[str]] = None,
+        functions: Optional[Sequence[str]] = None,
+        reservatorio: Optional[str] = None,
+        bacia: Optional[str] = None,
+        subsistema: Optional[str] = None,
+    ) -> ReservoirAggregateResponseDTO:
+        """
+        Reservoir time series aggregated in BigQuery: one GROUP BY job per
+        request, cached like ``get_reservoir_data``.
+        """
+        log(
+            f"Aggregating reservoir data from {start_date} to {end_date} by {granularity}/{group_by}",
+            LogLevel.INFO,
+        )
+        metrics = await self.validate_fields(metrics or ["ena_armazenavel_res_mwmed"]) or []
+        functions = list(dict.fromkeys(functions or ["avg"]))
+
+        result_key = "|".join(
+            str(part)
+            for part in (
+                "aggregate", self.table_id, start_date, end_date, reservatorio, bacia, subsistema,
+                granularity, group_by, ",".join(metrics), ",".join(functions),
             )
+        )
+        # Built up front so invalid options fail the same way on both paths
+        query, parameters = self._query_builder(
+            start_date, end_date, reservatorio, bacia, subsistema
+        ).build_aggregate(granularity, group_by, metrics, functions, await self.get_schema())
 
+        if self.replica is not None and self.replica.fresh:
+            log("Serving reservoir aggregate from local replica", LogLevel.DEBUG)
+            data = await asyncio.to_thread(
+                self.replica.aggregate,
+                start_date,
+                end_date,
+                self._column_filters(reservatorio, bacia, subsistema),
+                granularity,
+                group_by,
+                metrics,
+                functions,
+            )
+            return ReservoirAggregateResponseDTO(data=data, granularity=granularity, group_by=group_by)
+
+        async def load() -> ReservoirAggregateResponseDTO:
+            log(f"Aggregate query: {query}", LogLevel.DEBUG)
+
+            try:
+                data = await self.repository.execute_query(query, parameters)
+            except Exception as e:
+                log(f"Error aggregating reservoir data: {e}", LogLevel.ERROR)
+                raise
+            return ReservoirAggregateResponseDTO(data=data, granularity=granularity, group_by=group_by)
+
+        return await self._cached(result_key, ReservoirAggregateResponseDTO, end_date, load)
+
+    async def _cached(
+        self,
+        result_key: str,
+        model: Type[M],
+        end_date: date,
+        load: Callable[[], Awaitable[M]],
+    ) -> M:
+        """
+        Serve ``result_key`` from the result cache, or run ``load`` once for all
+        concurrent callers of the same key and cache what it returns.
+        """
+        try:
+            cached = self.result_cache.get(result_key)
         except Exception as e:
-            log(f"Error fetching reservoir data: {e}", LogLevel.ERROR)
-            raise
+            log(f"Result cache read failed: {e}", LogLevel.ERROR)
+            cached = None
+        if cached is not None:
+            log(f"Result cache hit for {result_key}", LogLevel.DEBUG)
+            return model.model_validate_json(cached)
+
+        async def load_and_store() -> M:
+            response = await load()
+            try:
+                self.result_cache.set(
+                    result_key, response.model_dump_json().encode("utf-8"), self._result_ttl(end_date)
+                )
+            except Exception as e:
+                log(f"Result cache write failed: {e}", LogLevel.ERROR)
+            return response
+
+        response: M = await self._inflight.run(result_key, load_and_store)
+        return response
+
+    def _query_builder(
+        self,
+        start_date: date,
+        end_date: date,
+        reservatorio: Optional[str] = None,
+        bacia: Optional[str] = None,
+        subsistema: Optional[str] = None,
+    ) -> ReservoirQueryBuilder:
+        return (
+            ReservoirQueryBuilder(f"{self.repository.project_id}.{self.table_id}", start_date, end_date)
+            .where_equals("nom_reservatorio", reservatorio)
+            .where_equals("nom_bacia", bacia)
+            .where_equals("nom_subsistema", subsistema)
+        )
+
+    @staticmethod
+    def _pop_window_total(data: List[Dict[str, Any]]) -> Optional[int]:
+        """Strip the window count column from the rows and return its value."""
+        total: Optional[int] = None
+        for row in data:
+            total = row.pop(TOTAL_COLUMN, total)
+        return total
+
+    async def export_reservoir_data(
+        self, start_date: date, end_date: date, export_format: str = "ndjson"
+    ) -> Iterator[bytes]:
+        """
+        Run the export query and return a lazy iterator of encoded chunks.
+
+        The job is awaited here, so query errors surface before the response
+        starts; record batches are then pulled from BigQuery (Storage Read API
+        for large results, REST pages otherwise) while the client reads,
+        keeping memory flat for any range size.
+        """
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        log(f"Exporting reservoir data from {start_date} to {end_date} as {export_format}", LogLevel.INFO)
+        query, parameters = self._query_builder(start_date, end_date).build()
+        log(f"Export query: {query}", LogLevel.DEBUG)
+
+        batches = await self.repository.execute_arrow_query(
+            query, self.export_page_size, parameters
+        )
+        if export_format == "arrow":
+            return self._iter_arrow_ipc(batches)
+        return self._iter_ndjson(batches)
+
+    @staticmethod
+    def _iter_ndjson(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+        """One chunk per record batch, one JSON object per line."""
+        for batch in batches:
+            lines = [json.dumps(row, default=_json_default) for row in batch.to_pylist()]
+            if lines:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _iter_arrow_ipc(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+        """Arrow IPC stream: the schema message, then one chunk per record batch."""
+        sink = io.BytesIO()
+        writer: Optional[pa.ipc.RecordBatchStreamWriter] = None
+
+        def drain() -> bytes:
+            chunk = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return chunk
+
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, batch.schema)
+            writer.write_batch(batch)
+            yield drain()
+
+        if writer is None:
+            # Empty result: still send a valid (schema-only) stream
+            writer = pa.ipc.new_stream(sink, pa.schema([]))
+        writer.close()
+        yield drain()
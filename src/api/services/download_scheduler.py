@@ -0,0 +1,158 @@
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Tuple, TypeVar
+from urllib.parse import urlparse
+
+from utils.logger import LogLevel, log
+
+T = TypeVar("T")
+
+
+class DownloadScheduler:
+    """
+    Limits how many downloads run at once, globally and per host.
+
+    Waiting downloads are grouped (one group per DTO) and slots are handed out
+    round-robin across groups, so a 25-year backfill cannot starve a small
+    request queued behind it. Callers beyond ``max_pending`` wait before being
+    queued at all, which is the backpressure for very large bulk requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        per_host_limit: int | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency or int(os.environ.get("ONS_MAX_CONCURRENT_DOWNLOADS", 8))
+        self.per_host_limit = per_host_limit or int(os.environ.get("ONS_MAX_DOWNLOADS_PER_HOST", 4))
+        self.max_pending = max_pending or int(os.environ.get("ONS_MAX_PENDING_DOWNLOADS", 256))
+        if self.max_pending < self.max_concurrency:
+            self.max_pending = self.max_concurrency
+
+        self._active = 0
+        self._active_per_host: Dict[str, int] = {}
+        self._waiting: "OrderedDict[str, Deque[Tuple[str, asyncio.Future[None]]]]" = OrderedDict()
+        self._admitted = 0
+        self._admission_waiters: Deque[asyncio.Future[None]] = deque()
+
+        log(
+            f"DownloadScheduler init - max_concurrency={self.max_concurrency}, "
+            f"per_host_limit={self.per_host_limit}, max_pending={self.max_pending}",
+            LogLevel.DEBUG,
+        )
+
+    @property
+    def active(self) -> int:
+        """Downloads currently running."""
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        """Downloads admitted but still waiting for a slot."""
+        return sum(len(queue) for queue in self._waiting.values())
+
+    async def run(self, group: str, url: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Wait for a slot for ``url`` inside ``group``, then await ``factory()``."""
+        host = urlparse(url).netloc
+        await self._admit()
+        try:
+            await self._acquire(group, host)
+            try:
+                return await factory()
+            finally:
+                self._release(host)
+        finally:
+            self._leave()
+
+    async def _admit(self) -> None:
+        if self._admitted < self.max_pending and not self._admission_waiters:
+            self._admitted += 1
+            return
+
+        log(f"Download queue full ({self.max_pending}), waiting for admission", LogLevel.DEBUG)
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._admission_waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._leave()
+            elif future in self._admission_waiters:
+                self._admission_waiters.remove(future)
+            raise
+
+    def _leave(self) -> None:
+        # Hand the admission over to the next waiter instead of freeing it
+        while self._admission_waiters:
+            future = self._admission_waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._admitted -= 1
+
+    async def _acquire(self, group: str, host: str) -> None:
+        if not self._waiting and self._has_capacity(host):
+            self._start(host)
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(group, deque()).append((host, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(host)
+            else:
+                queue = self._waiting.get(group)
+                if queue is not None and (host, future) in queue:
+                    queue.remove((host, future))
+                    if not queue:
+                        del self._waiting[group]
+            raise
+
+    def _has_capacity(self, host: str) -> bool:
+        return (
+            self._active < self.max_concurrency
+            and self._active_per_host.get(host, 0) < self.per_host_limit
+        )
+
+    def _start(self, host: str) -> None:
+        self._active += 1
+        self._active_per_host[host] = self._active_per_host.get(host, 0) + 1
+
+    def _release(self, host: str) -> None:
+        self._active -= 1
+        remaining = self._active_per_host.get(host, 1) - 1
+        if remaining:
+            self._active_per_host[host] = remaining
+        else:
+            self._active_per_host.pop(host, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the head of each group in turn (round-robin)."""
+        while self._active < self.max_concurrency and self._waiting:
+            granted = False
+            for group in list(self._waiting):
+                queue = self._waiting[group]
+                host, future = queue[0]
+                if not future.done() and not self._has_capacity(host):
+                    continue
+                queue.popleft()
+                if queue:
+                    self._waiting.move_to_end(group)
+                else:
+                    del self._waiting[group]
+                if future.done():
+                    # Cancelled while queued; its task no longer wants the slot
+                    granted = True
+                    break
+                self._start(host)
+                future.set_result(None)
+                granted = True
+                break
+            if not granted:
+                return
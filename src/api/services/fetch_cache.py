@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Tuple
+
+from pydantic import BaseModel
+
+from utils.logger import LogLevel, log
+
+
+class FetchCacheEntry(BaseModel):
+    url: str
+    # Destination bucket: the same resource is ingested separately into each bucket
+    bucket: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int | None = None
+    content_hash: str | None = None
+
+
+class FetchCache:
+    """
+    HTTP validators and content hash of the last ingested version of each ONS
+    resource, per destination bucket.
+
+    Entries are kept in memory and, when ``ONS_FETCH_CACHE_PATH`` is set, persisted
+    to that JSON file so they survive restarts. Only record an entry once the
+    resource is in its bucket (uploaded, or already in the raw table); otherwise a
+    failed run would be skipped forever.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.environ.get("ONS_FETCH_CACHE_PATH")
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str | None], FetchCacheEntry] = self._load()
+
+    def _load(self) -> Dict[Tuple[str, str | None], FetchCacheEntry]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            # Files written before entries had a bucket map url -> entry; those never match
+            items = raw.values() if isinstance(raw, dict) else raw
+            entries = {
+                (entry.url, entry.bucket): entry
+                for entry in (FetchCacheEntry(**item) for item in items)
+            }
+            log(f"Loaded {len(entries)} fetch cache entries from {self.path}", LogLevel.DEBUG)
+            return entries
+        except Exception as e:
+            log(f"Could not load fetch cache from {self.path}: {e}", LogLevel.ERROR)
+            return {}
+
+    def _persist(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump([entry.model_dump() for entry in self._entries.values()], f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, url: str, bucket: str | None) -> FetchCacheEntry | None:
+        with self._lock:
+            return self._entries.get((url, bucket))
+
+    def conditional_headers(self, url: str, bucket: str | None) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for the version of ``url`` in ``bucket``."""
+        entry = self.get(url, bucket)
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def is_unchanged(self, entry: FetchCacheEntry) -> bool:
+        """True when a freshly downloaded body hashes the same as the cached one."""
+        cached = self.get(entry.url, entry.bucket)
+        return (
+            cached is not None
+            and cached.content_hash is not None
+            and cached.content_hash == entry.content_hash
+        )
+
+    def record(self, entry: FetchCacheEntry) -> None:
+        with self._lock:
+            self._entries[(entry.url, entry.bucket)] = entry
+            try:
+                self._persist()
+            except Exception as e:
+                log(f"Could not persist fetch cache to {self.path}: {e}", LogLevel.ERROR)
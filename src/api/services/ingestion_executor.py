@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from utils.logger import LogLevel, log
+from utils.metrics import track_executor
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+
+class IngestionExecutor:
+    """
+    Runs the CPU-bound ingestion stages (parse, convert, encode) off the event loop.
+
+    ``kind`` selects the pool: ``thread`` (default), ``process`` for pandas-heavy
+    workloads that hold the GIL, or ``inline`` to run on the loop (debugging).
+    Functions sent to a process pool must be picklable (module-level or static);
+    stages that work on open file handles use ``run_threaded`` instead.
+    """
+
+    def __init__(self, kind: str | None = None, max_workers: int | None = None) -> None:
+        self.kind = (kind or os.environ.get("ONS_PARSE_EXECUTOR") or "thread").lower()
+        if self.kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unsupported executor kind: {self.kind} (expected one of {EXECUTOR_KINDS})")
+        self.max_workers = max_workers or int(os.environ.get("ONS_PARSE_WORKERS", os.cpu_count() or 1))
+        self._pool: Executor | None = None
+        self._thread_pool: ThreadPoolExecutor | None = None
+        log(f"IngestionExecutor init - kind={self.kind}, max_workers={self.max_workers}", LogLevel.DEBUG)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = self._get_thread_pool()
+        return self._pool
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ingestion"
+            )
+            track_executor("ingestion", self._thread_pool, self.max_workers)
+        return self._thread_pool
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in the configured pool."""
+        if self.kind == "inline":
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args))
+
+    async def run_threaded(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in a thread, for arguments that cannot be pickled."""
+        if self.kind == "inline":
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_thread_pool(), functools.partial(fn, *args))
+
+    def shutdown(self) -> None:
+        for pool in (self._pool, self._thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._thread_pool = None
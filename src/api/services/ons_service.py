@@ -1,19 +1,46 @@
+import functools
+import hashlib
 import os
 import re
-from typing import List
+import tempfile
+from contextlib import asynccontextmanager
+from typing import IO, AsyncIterator, Callable, Dict, Iterator, List, Mapping
 import httpx
 import pandas as pd  # type: ignore[import-untyped]
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.compute as pc  # type: ignore[import-untyped]
+import pyarrow.csv as pa_csv  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
 import asyncio
 
 from pydantic import BaseModel
+from repositories.bronze_loader import BronzeTableLoader
 from repositories.gcs_repository import GCSFileRepository
+from services.download_scheduler import DownloadScheduler
+from services.fetch_cache import FetchCache, FetchCacheEntry
+from services.ingestion_executor import IngestionExecutor
+from services.watermark_index import WatermarkIndex
 import io
 from pathlib import Path
 from datetime import datetime
 from models.ons_dto import DateFilterDTO
+from utils.http_client import create_http_client
 from utils.logger import LogLevel, log
+from utils.stage_timer import StageRecorder, StageTiming, observe_stages, summarize_stages
 import traceback
 
+# Streaming mode: HTTP chunk size, bytes kept in memory before spilling to disk,
+# and rows per Parquet row group
+STREAM_CHUNK_SIZE = int(os.environ.get("ONS_STREAM_CHUNK_SIZE", 1024 * 1024))
+STREAM_SPOOL_MAX_SIZE = int(os.environ.get("ONS_STREAM_SPOOL_MAX_SIZE", 32 * 1024 * 1024))
+STREAM_BATCH_SIZE = int(os.environ.get("ONS_STREAM_BATCH_SIZE", 65536))
+
+CONVERSION_ENGINES = ("arrow", "pandas")
+
+# String renderings of timestamp columns (see OnsService._timestamp_format)
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class DownloadInfo(BaseModel):
     url: str
@@ -21,6 +48,33 @@ class DownloadInfo(BaseModel):
     package: str
     data_type: str
     bucket: str | None = None
+    streaming: bool = False
+
+
+class ParquetStreamSummary(BaseModel):
+    rows: int = 0
+    date_column: str | None = None
+    last_value: str | None = None
+
+
+class TransformedContent(BaseModel):
+    parquet: bytes
+    rows: int
+    date_column: str | None = None
+    last_value: str | None = None
+    stages: list[StageTiming] = []
+
+
+class TransformStageError(Exception):
+    """Raised by the parse/convert/encode stage; ``stage`` tells which step failed."""
+
+    def __init__(self, stage: str, message: str) -> None:
+        super().__init__(stage, message)
+        self.stage = stage
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
 
 
 class DownloadResult(BaseModel):
@@ -32,6 +86,8 @@ class DownloadResult(BaseModel):
     gcs_path: str = ""
     error_message: str = ""
     bucket: str = ""
+    # Per-stage duration, bytes and rows of this resource (fetch, read, convert, ...)
+    stages: list[StageTiming] = []
 
 
 class ProcessResponse(BaseModel):
@@ -40,20 +96,97 @@ class ProcessResponse(BaseModel):
     total_processed: int
     success_count: int
     failure_count: int
+    # Stage timings summed over every resource of the run
+    stage_totals: list[StageTiming] = []
 
 
 class OnsService:
-    def __init__(self) -> None:
-        self.repository = GCSFileRepository()
+    def __init__(
+        self,
+        scheduler: DownloadScheduler | None = None,
+        executor: IngestionExecutor | None = None,
+        conversion_engine: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        repository: GCSFileRepository | None = None,
+    ) -> None:
+        self.repository = repository or GCSFileRepository()
+        # Application-lifetime client, injected by the FastAPI lifespan in main.py
+        self.http_client = http_client
+        self.scheduler = scheduler or DownloadScheduler()
+        self.executor = executor or IngestionExecutor()
+        self.watermarks = WatermarkIndex(self.repository)
+        self.bronze_loader = BronzeTableLoader(self.repository)
+        self.fetch_cache = FetchCache()
+        # Called with the package name after a run that uploaded at least one file
+        self.ingestion_listeners: list[Callable[[str], None]] = []
+        self.conversion_engine = (
+            conversion_engine or os.environ.get("ONS_CONVERSION_ENGINE") or "arrow"
+        ).lower()
+        if self.conversion_engine not in CONVERSION_ENGINES:
+            raise ValueError(f"Unsupported conversion engine: {self.conversion_engine}")
+
+    def _notify_ingestion(self, package: str) -> None:
+        for listener in self.ingestion_listeners:
+            try:
+                listener(package)
+            except Exception as e:
+                log(f"Ingestion listener failed for package {package}: {e}", level=LogLevel.ERROR)
+
+    async def _register_bronze_table(self, package: str, bucket: str | None) -> None:
+        # bronze.raw_{package} reads the configured raw bucket; ad-hoc buckets stay out of it
+        if bucket and bucket != self.repository.bucket_name:
+            log(f"Uploads to custom bucket {bucket} are not registered in bronze", level=LogLevel.DEBUG)
+            return
+        try:
+            await asyncio.to_thread(self.bronze_loader.ensure_table, package, self.repository.bucket_name)
+        except Exception as e:
+            log(f"Could not register bronze table for package {package}: {e}", level=LogLevel.ERROR)
+
+    @asynccontextmanager
+    async def _client_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the shared HTTP client, or a pooled client for this call when none was injected."""
+        if self.http_client is not None:
+            yield self.http_client
+            return
+        async with create_http_client() as client:
+            yield client
 
-    async def _fetch_bytes(self, client: httpx.AsyncClient, url: str) -> bytes:
+    @staticmethod
+    def _validators_from_response(
+        url: str, bucket: str, response: httpx.Response, size: int | None, content_hash: str | None
+    ) -> FetchCacheEntry:
+        return FetchCacheEntry(
+            url=url,
+            bucket=bucket,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            size=size,
+            content_hash=content_hash,
+        )
+
+    async def _fetch_bytes(
+        self, client: httpx.AsyncClient, url: str, bucket: str
+    ) -> tuple[bytes | None, FetchCacheEntry]:
+        """
+        Conditional GET of ``url``, against the version last ingested into ``bucket``.
+        Returns ``None`` as content on 304 Not Modified, along with the validators
+        to record once the resource is ingested.
+        """
         log(f"Fetching content: {url}", level=LogLevel.DEBUG)
-        response = await client.get(url, timeout=60.0)
+        headers = self.fetch_cache.conditional_headers(url, bucket)
+        response = await client.get(url, timeout=60.0, headers=headers)
+        if response.status_code == 304:
+            log(f"Not modified since last ingestion: {url}", level=LogLevel.DEBUG)
+            return None, self._validators_from_response(url, bucket, response, None, None)
         response.raise_for_status()
-        log(f"Fetched {len(response.content)} bytes", level=LogLevel.DEBUG)
-        return response.content
+        content = response.content
+        log(f"Fetched {len(content)} bytes", level=LogLevel.DEBUG)
+        return content, self._validators_from_response(
+            url, bucket, response, len(content), hashlib.sha256(content).hexdigest()
+        )
 
-    def _read_to_dataframe(self, content: bytes, data_type: str) -> pd.DataFrame:
+    @staticmethod
+    def _read_to_dataframe(content: bytes, data_type: str) -> pd.DataFrame:
         with io.BytesIO(content) as buffer:
             log(f"Reading content as {data_type}", level=LogLevel.DEBUG)
             if data_type == "parquet":
@@ -64,30 +197,316 @@ class OnsService:
                 return pd.read_excel(buffer)
             raise ValueError(f"Unsupported data_type: {data_type}")
 
-    def _convert_all_columns_to_string(self, df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _convert_all_columns_to_string(df: pd.DataFrame) -> pd.DataFrame:
         log("Converting all columns to string", level=LogLevel.DEBUG)
         return df.astype(str)
 
-    def _dataframe_to_parquet_buffer(self, df: pd.DataFrame) -> io.BytesIO:
+    @staticmethod
+    def _dataframe_to_parquet_buffer(df: pd.DataFrame) -> io.BytesIO:
         log("Serializing DataFrame to Parquet buffer", level=LogLevel.DEBUG)
         out = io.BytesIO()
         df.to_parquet(out, engine="pyarrow", index=False)
         out.seek(0)
         return out
 
+    @staticmethod
+    def _csv_options(source: IO[bytes] | pa.NativeFile) -> tuple:
+        """Arrow CSV options for ONS files, with every column read as a nullable string."""
+        read_options = pa_csv.ReadOptions(encoding="latin1")
+        parse_options = pa_csv.ParseOptions(delimiter=";")
+        # Type inference only looks at the first block, so pin every column to string
+        column_names = pa_csv.open_csv(
+            source, read_options=read_options, parse_options=parse_options
+        ).schema.names
+        source.seek(0)
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in column_names},
+            strings_can_be_null=True,
+        )
+        return read_options, parse_options, convert_options
+
+    @staticmethod
+    def _read_to_table(content: bytes, data_type: str) -> pa.Table:
+        log(f"Reading content as {data_type} (arrow)", level=LogLevel.DEBUG)
+        source = pa.BufferReader(content)
+        if data_type == "parquet":
+            return pq.read_table(source)
+        if data_type == "csv":
+            read_options, parse_options, convert_options = OnsService._csv_options(source)
+            return pa_csv.read_csv(
+                source,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+        if data_type == "xlsx":
+            # No Arrow reader for workbooks; pandas' nullable string dtype keeps NA as null
+            df = pd.read_excel(io.BytesIO(content)).astype("string")
+            return pa.Table.from_pandas(df, preserve_index=False)
+        raise ValueError(f"Unsupported data_type: {data_type}")
+
+    @staticmethod
+    def _timestamp_format(column: pa.Array | pa.ChunkedArray) -> str:
+        """Format like pandas does: no sub-second digits, date only when all times are midnight."""
+        seconds = pc.cast(column, pa.timestamp("s", tz=column.type.tz), safe=False)
+        midnight = pc.equal(pc.floor_temporal(seconds, unit="day"), seconds)
+        return DATE_FORMAT if pc.all(midnight).as_py() is not False else DATETIME_FORMAT
+
+    @staticmethod
+    def _arrow_column_to_string(
+        column: pa.Array | pa.ChunkedArray, timestamp_format: str | None = None
+    ) -> pa.Array | pa.ChunkedArray:
+        """
+        Vectorized cast of one column to string; nulls stay null. Timestamps use
+        ``timestamp_format`` when given, otherwise the one that fits this column.
+        """
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            return column
+        if pa.types.is_dictionary(column.type):
+            return OnsService._arrow_column_to_string(
+                pc.cast(column, column.type.value_type), timestamp_format
+            )
+        if pa.types.is_timestamp(column.type):
+            seconds = pc.cast(column, pa.timestamp("s", tz=column.type.tz), safe=False)
+            return pc.strftime(seconds, format=timestamp_format or OnsService._timestamp_format(column))
+        if pa.types.is_large_binary(column.type):
+            return pc.cast(column, pa.large_string())
+        return pc.cast(column, pa.string())
+
+    @staticmethod
+    def _table_to_string(table: pa.Table) -> pa.Table:
+        log("Converting all columns to string (arrow)", level=LogLevel.DEBUG)
+        return pa.Table.from_arrays(
+            [OnsService._arrow_column_to_string(column) for column in table.columns],
+            names=table.column_names,
+        )
+
+    @staticmethod
+    def _table_to_parquet_buffer(table: pa.Table) -> io.BytesIO:
+        log("Serializing Arrow table to Parquet buffer", level=LogLevel.DEBUG)
+        out = io.BytesIO()
+        pq.write_table(table, out)
+        out.seek(0)
+        return out
+
+    @staticmethod
+    def _transform_content(content: bytes, data_type: str, engine: str = "arrow") -> TransformedContent:
+        """
+        Parse -> convert -> encode stage of the whole-file path. Static (and so
+        picklable) because IngestionExecutor may run it in a worker process.
+        """
+        if engine == "arrow":
+            return OnsService._transform_content_arrow(content, data_type)
+
+        recorder = StageRecorder()
+        try:
+            with recorder.stage("read") as timing:
+                timing.bytes_in = len(content)
+                df = OnsService._read_to_dataframe(content, data_type)
+                timing.rows = len(df)
+        except Exception as e:
+            raise TransformStageError("read", str(e))
+
+        try:
+            with recorder.stage("convert") as timing:
+                df = OnsService._convert_all_columns_to_string(df)
+                timing.rows = len(df)
+            with recorder.stage("encode") as timing:
+                buffer = OnsService._dataframe_to_parquet_buffer(df)
+                timing.rows = len(df)
+                timing.bytes_out = buffer.getbuffer().nbytes
+        except Exception as e:
+            raise TransformStageError("convert", str(e))
+
+        date_column = next((col for col in df.columns if "dat" in col.lower()), None)
+        transformed = TransformedContent(
+            parquet=buffer.getvalue(), rows=len(df), date_column=date_column, stages=recorder.stages
+        )
+        if date_column and not df.empty:
+            try:
+                # Columns are strings here, so max() is the last value of a sort
+                transformed.last_value = df[date_column].max()
+            except Exception as e:
+                raise TransformStageError("check", str(e))
+        return transformed
+
+    @staticmethod
+    def _transform_content_arrow(content: bytes, data_type: str) -> TransformedContent:
+        """Arrow-native variant of the stage: no pandas object columns are materialized."""
+        recorder = StageRecorder()
+        try:
+            with recorder.stage("read") as timing:
+                timing.bytes_in = len(content)
+                table = OnsService._read_to_table(content, data_type)
+                timing.rows = table.num_rows
+        except Exception as e:
+            raise TransformStageError("read", str(e))
+
+        try:
+            with recorder.stage("convert") as timing:
+                table = OnsService._table_to_string(table)
+                timing.rows = table.num_rows
+            with recorder.stage("encode") as timing:
+                buffer = OnsService._table_to_parquet_buffer(table)
+                timing.rows = table.num_rows
+                timing.bytes_out = buffer.getbuffer().nbytes
+        except Exception as e:
+            raise TransformStageError("convert", str(e))
+
+        date_column = next((col for col in table.column_names if "dat" in col.lower()), None)
+        transformed = TransformedContent(
+            parquet=buffer.getvalue(), rows=table.num_rows, date_column=date_column, stages=recorder.stages
+        )
+        if date_column:
+            try:
+                transformed.last_value = pc.max(table.column(date_column)).as_py()
+            except Exception as e:
+                raise TransformStageError("check", str(e))
+        return transformed
+
+    async def _fetch_to_spool(
+        self, client: httpx.AsyncClient, url: str, bucket: str
+    ) -> tuple[IO[bytes] | None, FetchCacheEntry]:
+        """
+        Stream the response body in chunks into a spooled temporary file, hashing it
+        on the way. Returns ``None`` instead of a file on 304 Not Modified.
+        """
+        log(f"Streaming content: {url}", level=LogLevel.DEBUG)
+        headers = self.fetch_cache.conditional_headers(url, bucket)
+        spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_SIZE)
+        digest = hashlib.sha256()
+        try:
+            async with client.stream("GET", url, timeout=60.0, headers=headers) as response:
+                if response.status_code == 304:
+                    log(f"Not modified since last ingestion: {url}", level=LogLevel.DEBUG)
+                    spool.close()
+                    return None, self._validators_from_response(url, bucket, response, None, None)
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                    digest.update(chunk)
+                    spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        size = spool.tell()
+        log(f"Streamed {size} bytes", level=LogLevel.DEBUG)
+        spool.seek(0)
+        return spool, self._validators_from_response(url, bucket, response, size, digest.hexdigest())  # type: ignore[return-value]
+
+    def _iter_record_batches(self, source: IO[bytes], data_type: str) -> Iterator[pa.RecordBatch]:
+        """
+        Yield the source file as Arrow record batches, reading one block at a time.
+        A file without rows yields one empty batch, so its columns are still known.
+        """
+        log(f"Reading content as {data_type} record batches", level=LogLevel.DEBUG)
+        if data_type == "parquet":
+            parquet = pq.ParquetFile(source)
+            schema = parquet.schema_arrow
+            batches: Iterator[pa.RecordBatch] = parquet.iter_batches(batch_size=STREAM_BATCH_SIZE)
+        elif data_type == "csv":
+            read_options, parse_options, convert_options = self._csv_options(source)
+            reader = pa_csv.open_csv(
+                source,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+            schema, batches = reader.schema, reader
+        elif data_type == "xlsx":
+            # Workbooks cannot be read incrementally; they are small enough to load at once
+            df = pd.read_excel(source).astype("string")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            schema, batches = table.schema, iter(table.to_batches(STREAM_BATCH_SIZE))
+        else:
+            raise ValueError(f"Unsupported data_type: {data_type}")
+
+        empty = True
+        for batch in batches:
+            empty = False
+            yield batch
+        if empty:
+            yield pa.RecordBatch.from_pylist([], schema=schema)
+
+    @staticmethod
+    def _stream_timestamp_formats(source: IO[bytes], data_type: str) -> Dict[str, str]:
+        """
+        Format of each timestamp column over the whole file, from a pre-pass that reads
+        only those columns, so streamed row groups match the buffer path. CSV and
+        workbook columns are read as strings and have no timestamps.
+        """
+        if data_type != "parquet":
+            return {}
+        parquet = pq.ParquetFile(source)
+        names = [field.name for field in parquet.schema_arrow if pa.types.is_timestamp(field.type)]
+        formats = {name: DATE_FORMAT for name in names}
+        if names:
+            for batch in parquet.iter_batches(batch_size=STREAM_BATCH_SIZE, columns=names):
+                for name in names:
+                    if formats[name] == DATE_FORMAT:
+                        formats[name] = OnsService._timestamp_format(batch.column(name))
+        source.seek(0)
+        return formats
+
+    def _transform_stream(self, source: IO[bytes], data_type: str, sink: IO[bytes]) -> ParquetStreamSummary:
+        """Read, convert and encode of the streaming path, interleaved per record batch."""
+        timestamp_formats = self._stream_timestamp_formats(source, data_type)
+        return self._write_parquet_stream(self._iter_record_batches(source, data_type), sink, timestamp_formats)
+
+    def _write_parquet_stream(
+        self, batches: Iterator[pa.RecordBatch], sink: IO[bytes], timestamp_formats: Mapping[str, str]
+    ) -> ParquetStreamSummary:
+        """
+        Cast each batch to string columns and write it to ``sink`` as its own row group.
+        Timestamp columns use ``timestamp_formats``, fixed for the whole file.
+        """
+        log("Writing record batches to Parquet stream", level=LogLevel.DEBUG)
+        summary = ParquetStreamSummary()
+        writer: pq.ParquetWriter | None = None
+        try:
+            for batch in batches:
+                if writer is None:
+                    schema = pa.schema([pa.field(name, pa.string()) for name in batch.schema.names])
+                    writer = pq.ParquetWriter(sink, schema)
+                    summary.date_column = next(
+                        (name for name in schema.names if "dat" in name.lower()), None
+                    )
+                columns = [
+                    pc.cast(self._arrow_column_to_string(column, timestamp_formats.get(name)), pa.string())
+                    for name, column in zip(batch.schema.names, batch.columns)
+                ]
+                batch = pa.RecordBatch.from_arrays(columns, schema=writer.schema)
+                writer.write_batch(batch)
+                summary.rows += batch.num_rows
+
+                if summary.date_column is not None:
+                    batch_max = pc.max(batch.column(summary.date_column)).as_py()
+                    if batch_max is not None and (
+                        summary.last_value is None or batch_max > summary.last_value
+                    ):
+                        summary.last_value = batch_max
+        finally:
+            if writer is not None:
+                writer.close()
+        sink.seek(0)
+        return summary
+
     def _build_gcs_path(
         self, original_filename: str, resource_year: int, package_name: str
     ) -> str:
+        """Hive layout, so bronze.raw_{package} can prune on year and ingest_date."""
         parquet_filename = Path(original_filename).with_suffix(".parquet").name
-        now = datetime.now()
-        if resource_year < now.year:
-            return f"{package_name}/{resource_year}/{parquet_filename}"
-        return f"{package_name}/{now.year}/{now.month:02d}/{now.day:02d}/{parquet_filename}"
+        ingest_date = datetime.now().date().isoformat()
+        return f"package={package_name}/year={resource_year}/ingest_date={ingest_date}/{parquet_filename}"
 
     def _save_to_gcs(self, buffer: io.BytesIO, gcs_path: str, _bucket_name: str | None) -> str:
         log(f"Saving buffer to GCS: {gcs_path}", level=LogLevel.DEBUG)
-        save_buffer = io.BytesIO(buffer.getvalue())
-        return self.repository.save(save_buffer, gcs_path, _bucket_name=_bucket_name)
+        buffer.seek(0)
+        return self.repository.save(buffer, gcs_path, _bucket_name=_bucket_name)
+
+    def _save_stream_to_gcs(self, file: IO[bytes], gcs_path: str, _bucket_name: str | None) -> str:
+        log(f"Streaming file to GCS: {gcs_path}", level=LogLevel.DEBUG)
+        return self.repository.save_stream(file, gcs_path, _bucket_name=_bucket_name)
 
     async def _download_parquet(
         self,
@@ -97,6 +516,9 @@ class OnsService:
         """
         Download a file, convert ALL columns to string, save as Parquet, and return result.
         """
+        if download_info.streaming:
+            return await self._download_parquet_streaming(client, download_info)
+
         url = download_info.url
         resource_year = download_info.year
         package_name = download_info.package
@@ -110,39 +532,51 @@ class OnsService:
             success=False,
             bucket=self.repository.bucket_name
         )
+        recorder = StageRecorder()
 
         try:
             log(f"Processing URL ({data_type}): {url}", level=LogLevel.DEBUG)
             
             # Fetch content
             try:
-                content = await self._fetch_bytes(client, url)
+                with recorder.stage("fetch") as timing:
+                    content, validators = await self._fetch_bytes(
+                        client, url, download_info.bucket or self.repository.bucket_name
+                    )
+                    timing.bytes_in = len(content) if content is not None else 0
             except Exception as e:
                 result.error_message = f"Failed to fetch URL: {str(e)}"
                 log(f"Failed to fetch {url}: {e}", level=LogLevel.ERROR)
                 return result
 
             original_filename = Path(url).name
-            
-            # Read DataFrame
-            try:
-                df = self._read_to_dataframe(content, data_type)
-            except Exception as e:
-                result.error_message = f"Failed to read source file {original_filename}: {str(e)}"
-                log(result.error_message, level=LogLevel.ERROR)
+
+            # Same version as the last ingestion: skip parse, convert and upload
+            if content is None or self.fetch_cache.is_unchanged(validators):
+                result.error_message = "Source not modified since last ingestion"
+                result.gcs_path = self._build_gcs_path(original_filename, resource_year, package_name)
+                log(f"Source {url} not modified, skipping", level=LogLevel.DEBUG)
                 return result
 
-            # Convert columns and create buffer
+            # Read, convert and encode off the event loop
             try:
-                df = self._convert_all_columns_to_string(df)
-                buffer = self._dataframe_to_parquet_buffer(df)
-            except Exception as e:
-                result.error_message = f"Failed to process DataFrame: {str(e)}"
+                transformed = await self.executor.run(
+                    self._transform_content, content, data_type, self.conversion_engine
+                )
+            except TransformStageError as e:
+                if e.stage == "read":
+                    result.error_message = f"Failed to read source file {original_filename}: {e.message}"
+                elif e.stage == "convert":
+                    result.error_message = f"Failed to process DataFrame: {e.message}"
+                else:
+                    result.error_message = f"Failed to check existing data: {e.message}"
                 log(result.error_message, level=LogLevel.ERROR)
                 return result
+            del content
+            recorder.extend(transformed.stages)
 
             # Find date column
-            date_column = next((col for col in df.columns if "dat" in col.lower()), None)
+            date_column = transformed.date_column
             if not date_column:
                 result.error_message = "No date column found in the file"
                 log(result.error_message, level=LogLevel.DEBUG)
@@ -152,14 +586,20 @@ class OnsService:
 
             # Check if data already exists
             try:
-                df = df.sort_values(by=date_column)
-                last_value = df[date_column].iloc[-1]
-                
+                last_value = transformed.last_value
+                if last_value is None:
+                    raise ValueError("No rows found in the file")
+
                 log(f"Checking if data already exists with last date: {last_value}", level=LogLevel.DEBUG)
-                
-                if self.repository.raw_table_has_value(package_name, date_column, last_value):
+
+                with recorder.stage("exists_check"):
+                    exists = await asyncio.to_thread(
+                        self.repository.raw_table_has_value, package_name, date_column, last_value
+                    )
+                if exists:
                     result.error_message = "Data already exists in the raw table"
                     result.gcs_path = gcs_path  # Still provide the path for reference
+                    self.fetch_cache.record(validators)
                     log(f"Data from {url} already exists", level=LogLevel.DEBUG)
                     return result
                 
@@ -170,9 +610,18 @@ class OnsService:
 
             # Save to GCS
             try:
-                gcs_url = self._save_to_gcs(buffer, gcs_path, _bucket_name=download_info.bucket)
+                with recorder.stage("upload") as timing:
+                    timing.bytes_out = len(transformed.parquet)
+                    gcs_url = await asyncio.to_thread(
+                        self._save_to_gcs,
+                        io.BytesIO(transformed.parquet),
+                        gcs_path,
+                        download_info.bucket,
+                    )
                 result.success = True
                 result.gcs_path = gcs_path
+                self.watermarks.invalidate(package_name)
+                self.fetch_cache.record(validators)
                 log(f"Successfully saved to bucket path: {gcs_path}, URL: {gcs_url}", level=LogLevel.INFO)
                 return result
                 
@@ -185,6 +634,137 @@ class OnsService:
             result.error_message = f"Unexpected error: {str(e)}"
             log(f"Unexpected error processing URL {url}: {e}\n{traceback.format_exc()}", level=LogLevel.ERROR)
             return result
+        finally:
+            result.stages = recorder.stages
+            observe_stages(package_name, recorder.stages)
+
+    async def _download_parquet_streaming(
+        self,
+        client: httpx.AsyncClient,
+        download_info: DownloadInfo,
+    ) -> DownloadResult:
+        """
+        Streaming variant of _download_parquet: the body is spooled to disk in chunks,
+        converted to string Parquet one record batch at a time and uploaded with a
+        resumable upload, so memory stays bounded regardless of the file size.
+        """
+        url = download_info.url
+        resource_year = download_info.year
+        package_name = download_info.package
+        data_type = download_info.data_type
+
+        result = DownloadResult(
+            url=url,
+            year=resource_year,
+            package=package_name,
+            data_type=data_type,
+            success=False,
+            bucket=self.repository.bucket_name
+        )
+        recorder = StageRecorder()
+
+        try:
+            log(f"Processing URL in streaming mode ({data_type}): {url}", level=LogLevel.DEBUG)
+
+            try:
+                with recorder.stage("fetch") as timing:
+                    source, validators = await self._fetch_to_spool(
+                        client, url, download_info.bucket or self.repository.bucket_name
+                    )
+                    timing.bytes_in = validators.size
+            except Exception as e:
+                result.error_message = f"Failed to fetch URL: {str(e)}"
+                log(f"Failed to fetch {url}: {e}", level=LogLevel.ERROR)
+                return result
+
+            original_filename = Path(url).name
+
+            # Same version as the last ingestion: skip parse, convert and upload
+            if source is None or self.fetch_cache.is_unchanged(validators):
+                if source is not None:
+                    source.close()
+                result.error_message = "Source not modified since last ingestion"
+                result.gcs_path = self._build_gcs_path(original_filename, resource_year, package_name)
+                log(f"Source {url} not modified, skipping", level=LogLevel.DEBUG)
+                return result
+
+            with source, tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_SIZE) as sink:
+                try:
+                    # read, convert and encode are interleaved per record batch here
+                    with recorder.stage("transform") as timing:
+                        summary = await self.executor.run_threaded(
+                            self._transform_stream, source, data_type, sink
+                        )
+                        timing.bytes_in = validators.size
+                        timing.rows = summary.rows
+                        timing.bytes_out = sink.seek(0, io.SEEK_END)
+                        sink.seek(0)
+                except Exception as e:
+                    result.error_message = f"Failed to read source file {original_filename}: {str(e)}"
+                    log(result.error_message, level=LogLevel.ERROR)
+                    return result
+
+                if not summary.date_column:
+                    result.error_message = "No date column found in the file"
+                    log(result.error_message, level=LogLevel.DEBUG)
+                    return result
+
+                gcs_path = self._build_gcs_path(original_filename, resource_year, package_name)
+
+                try:
+                    if summary.last_value is None:
+                        raise ValueError("No rows found in the file")
+
+                    log(f"Checking if data already exists with last date: {summary.last_value}", level=LogLevel.DEBUG)
+
+                    with recorder.stage("exists_check"):
+                        exists = await asyncio.to_thread(
+                            self.repository.raw_table_has_value,
+                            package_name,
+                            summary.date_column,
+                            summary.last_value,
+                        )
+                    if exists:
+                        result.error_message = "Data already exists in the raw table"
+                        result.gcs_path = gcs_path
+                        self.fetch_cache.record(validators)
+                        log(f"Data from {url} already exists", level=LogLevel.DEBUG)
+                        return result
+
+                except Exception as e:
+                    result.error_message = f"Failed to check existing data: {str(e)}"
+                    log(result.error_message, level=LogLevel.ERROR)
+                    return result
+
+                try:
+                    with recorder.stage("upload") as timing:
+                        timing.bytes_out = sink.seek(0, io.SEEK_END)
+                        sink.seek(0)
+                        gcs_url = await asyncio.to_thread(
+                            self._save_stream_to_gcs, sink, gcs_path, download_info.bucket  # type: ignore[arg-type]
+                        )
+                    result.success = True
+                    result.gcs_path = gcs_path
+                    self.watermarks.invalidate(package_name)
+                    self.fetch_cache.record(validators)
+                    log(
+                        f"Successfully streamed {summary.rows} rows to bucket path: {gcs_path}, URL: {gcs_url}",
+                        level=LogLevel.INFO,
+                    )
+                    return result
+
+                except Exception as e:
+                    result.error_message = f"Failed to save to GCS bucket: {str(e)}"
+                    log(f"Failed to save to bucket path {gcs_path}: {e}\n{traceback.format_exc()}", level=LogLevel.ERROR)
+                    return result
+
+        except Exception as e:
+            result.error_message = f"Unexpected error: {str(e)}"
+            log(f"Unexpected error processing URL {url}: {e}\n{traceback.format_exc()}", level=LogLevel.ERROR)
+            return result
+        finally:
+            result.stages = recorder.stages
+            observe_stages(package_name, recorder.stages)
 
     async def process_reservoir_data(self, filters: DateFilterDTO) -> ProcessResponse:
         log(
@@ -207,9 +787,14 @@ class OnsService:
         log(f"Target bucket: {self.repository.bucket_name}", level=LogLevel.INFO)
 
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
+            async with self._client_session() as client:
+                # One scheduler group per DTO, so bulk requests share download slots fairly
+                group = f"{package}#{id(filters)}"
+
                 log("Fetching package information from ONS API", level=LogLevel.DEBUG)
-                response = await client.get(ons_api_url)
+                response = await self.scheduler.run(
+                    group, ons_api_url, lambda: client.get(ons_api_url)
+                )
                 response.raise_for_status()
                 data = response.json()
 
@@ -269,7 +854,8 @@ class OnsService:
                         year=resource_year,
                         package=package,
                         data_type=fmt,
-                        bucket=filters.bucket
+                        bucket=filters.bucket,
+                        streaming=filters.streaming,
                     )
                     parquet_resources_to_download.append(download_info)
                     log(
@@ -299,7 +885,8 @@ class OnsService:
                             year=datetime.now().year,
                             package=package,
                             data_type=fmt,
-                            bucket=filters.bucket
+                            bucket=filters.bucket,
+                            streaming=filters.streaming,
                         )
                         parquet_resources_to_download.append(download_info)
                         log(
@@ -316,18 +903,53 @@ class OnsService:
                     log("No files found for the specified date range", level=LogLevel.ERROR)
                     raise Exception("No files found for the specified date range")
 
-                log("Starting concurrent downloads", level=LogLevel.INFO)
+                # Skip past years already complete in the raw table before fetching anything
+                watermarks = await self.watermarks.get(package)
+                resources_to_fetch = []
+                skipped_resources = []
+                skipped_results: list[DownloadResult | BaseException] = []
+                for resource in parquet_resources_to_download:
+                    if self.watermarks.is_complete(watermarks, resource.year):
+                        log(f"Year {resource.year} of {package} already ingested, skipping {resource.url}", level=LogLevel.DEBUG)
+                        skipped_results.append(DownloadResult(
+                            url=resource.url,
+                            year=resource.year,
+                            package=resource.package,
+                            data_type=resource.data_type,
+                            success=False,
+                            gcs_path=self._build_gcs_path(Path(resource.url).name, resource.year, package),
+                            error_message="Data already exists in the raw table",
+                            bucket=self.repository.bucket_name,
+                        ))
+                        skipped_resources.append(resource)
+                    else:
+                        resources_to_fetch.append(resource)
+
+                log(
+                    f"Scheduling {len(resources_to_fetch)} downloads, {len(skipped_results)} skipped "
+                    f"(active={self.scheduler.active}, pending={self.scheduler.pending})",
+                    level=LogLevel.INFO,
+                )
                 tasks = [
-                    self._download_parquet(client, resource)
-                    for resource in parquet_resources_to_download
+                    self.scheduler.run(
+                        group,
+                        resource.url,
+                        functools.partial(self._download_parquet, client, resource),
+                    )
+                    for resource in resources_to_fetch
                 ]
 
                 download_results = await asyncio.gather(*tasks, return_exceptions=True)
 
                 successful_downloads = []
                 failed_downloads = []
+                stage_timings: list[StageTiming] = []
 
-                for resource, result in zip(parquet_resources_to_download, download_results):
+                processed = zip(
+                    resources_to_fetch + skipped_resources,
+                    list(download_results) + skipped_results,
+                )
+                for resource, result in processed:
                     if isinstance(result, Exception):
                         bucket_name = resource.bucket if resource.bucket else self.repository.bucket_name
                         failed_downloads.append({
@@ -340,6 +962,8 @@ class OnsService:
                         })
                         log(f"Task failed for {resource.url}: {result}", level=LogLevel.ERROR)
                     elif isinstance(result, DownloadResult):
+                        stage_timings.extend(result.stages)
+                        stages = [timing.model_dump() for timing in result.stages]
                         if result.success:
                             successful_downloads.append({
                                 "url": result.url,
@@ -348,6 +972,7 @@ class OnsService:
                                 "data_type": result.data_type,
                                 "gcs_path": result.gcs_path,
                                 "bucket": result.bucket,
+                                "stages": stages,
                             })
                         else:
                             failed_downloads.append({
@@ -358,6 +983,7 @@ class OnsService:
                                 "error_message": result.error_message,
                                 "gcs_path": result.gcs_path,
                                 "bucket": result.bucket,
+                                "stages": stages,
                             })
 
                 success_count = len(successful_downloads)
@@ -368,6 +994,9 @@ class OnsService:
                     f"Download summary: {success_count}/{total_count} files successfully processed, {failure_count} failed",
                     level=LogLevel.INFO,
                 )
+                if success_count:
+                    await self._register_bronze_table(package, filters.bucket)
+                    self._notify_ingestion(package)
 
                 return ProcessResponse(
                     success_downloads=successful_downloads,
@@ -375,6 +1004,7 @@ class OnsService:
                     total_processed=total_count,
                     success_count=success_count,
                     failure_count=failure_count,
+                    stage_totals=summarize_stages(stage_timings),
                 )
 
         except httpx.RequestError as e:
@@ -395,6 +1025,8 @@ class OnsService:
     ) -> List[ProcessResponse | BaseException]:
         """
         Recebe uma lista de filtros DTO e processa cada um em paralelo.
+        Os downloads de todos os DTOs passam pelo mesmo DownloadScheduler, que
+        limita a concorrência e reveza os slots entre os DTOs.
         
         Args:
             filters_list: Uma lista de objetos DateFilterDTO.
@@ -0,0 +1,143 @@
+import re
+from datetime import date, datetime, time
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+from google.cloud import bigquery
+
+# Keyset order of the gold table; every page and cursor relies on it
+ORDER_COLUMNS = ("ena_data", "nom_reservatorio")
+TOTAL_COLUMN = "_total_records"
+
+GRANULARITIES = {"week": "ISOWEEK", "month": "MONTH", "year": "YEAR"}
+GROUP_COLUMNS = {"reservatorio": "nom_reservatorio", "bacia": "nom_bacia", "subsistema": "nom_subsistema"}
+AGGREGATE_FUNCTIONS = {"avg": "AVG", "sum": "SUM", "min": "MIN", "max": "MAX", "count": "COUNT"}
+# Schema field types a metric may have (legacy and standard SQL names)
+NUMERIC_TYPES = {"FLOAT", "FLOAT64", "INTEGER", "INT64", "NUMERIC", "BIGNUMERIC"}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+QueryParameters = List[bigquery.ScalarQueryParameter]
+
+
+class ReservoirQueryBuilder:
+    """
+    Builds parameterized queries over the reservoir table.
+
+    Values only ever travel as query parameters, so the SQL text depends on the
+    *shape* of the request (which filters, which columns), never on its values.
+    Identical logical queries are therefore byte-identical and can be served
+    from BigQuery's result cache.
+    """
+
+    def __init__(self, table: str, start_date: date, end_date: date) -> None:
+        self.table = table
+        self._conditions: List[str] = ["ena_data >= @start_date", "ena_data <= @end_date"]
+        self._parameters: QueryParameters = [
+            bigquery.ScalarQueryParameter("start_date", "DATETIME", datetime.combine(start_date, time.min)),
+            bigquery.ScalarQueryParameter("end_date", "DATETIME", datetime.combine(end_date, time.min)),
+        ]
+        self._columns: Optional[List[str]] = None
+
+    @staticmethod
+    def _identifier(name: str) -> str:
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f"Invalid column name: {name}")
+        return f"`{name}`"
+
+    def where_equals(self, column: str, value: Optional[str]) -> "ReservoirQueryBuilder":
+        """Add ``column = @column`` when ``value`` is given; no-op otherwise."""
+        if value is not None:
+            self._conditions.append(f"{self._identifier(column)} = @{column}")
+            self._parameters.append(bigquery.ScalarQueryParameter(column, "STRING", value))
+        return self
+
+    def after_cursor(self, cursor_data: datetime, cursor_reservatorio: str) -> "ReservoirQueryBuilder":
+        """Keyset predicate: only rows strictly after the cursor in ORDER_COLUMNS order."""
+        self._conditions.append(
+            "(ena_data > @cursor_data"
+            " OR (ena_data = @cursor_data AND nom_reservatorio > @cursor_reservatorio))"
+        )
+        self._parameters.extend([
+            bigquery.ScalarQueryParameter("cursor_data", "DATETIME", cursor_data),
+            bigquery.ScalarQueryParameter("cursor_reservatorio", "STRING", cursor_reservatorio),
+        ])
+        return self
+
+    def select(self, columns: Optional[Sequence[str]]) -> "ReservoirQueryBuilder":
+        """Project ``columns`` (None means all). The order columns are always kept."""
+        if columns:
+            selected = list(dict.fromkeys([*ORDER_COLUMNS, *columns]))
+            self._columns = [self._identifier(column) for column in selected]
+        else:
+            self._columns = None
+        return self
+
+    def _where(self) -> str:
+        return "\n  AND ".join(self._conditions)
+
+    def build(self, with_total: bool = False) -> Tuple[str, QueryParameters]:
+        """Ordered row query, optionally carrying the window count in TOTAL_COLUMN."""
+        projection = ", ".join(self._columns) if self._columns else "*"
+        if with_total:
+            projection += f", COUNT(*) OVER() AS {TOTAL_COLUMN}"
+        query = (
+            f"SELECT {projection}\n"
+            f"FROM `{self.table}`\n"
+            f"WHERE {self._where()}\n"
+            f"ORDER BY {', '.join(f'{column} ASC' for column in ORDER_COLUMNS)}"
+        )
+        return query, list(self._parameters)
+
+    def build_count(self) -> Tuple[str, QueryParameters]:
+        """Count of the rows matching the filters, ignoring any cursor predicate."""
+        conditions = [c for c in self._conditions if "@cursor_" not in c]
+        parameters = [p for p in self._parameters if not (p.name or "").startswith("cursor_")]
+        where = "\n  AND ".join(conditions)
+        return f"SELECT COUNT(*) as total\nFROM `{self.table}`\nWHERE {where}", parameters
+
+    def build_aggregate(
+        self,
+        granularity: str,
+        group_by: Optional[str],
+        metrics: Sequence[str],
+        functions: Sequence[str],
+        column_types: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[str, QueryParameters]:
+        """
+        One GROUP BY over ``periodo`` (ena_data truncated to ``granularity``) and,
+        optionally, a dimension. Each metric/function pair becomes ``{function}_{metric}``.
+        With ``column_types`` (column -> schema field type), metrics must be numeric.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        unknown = [f for f in functions if f not in AGGREGATE_FUNCTIONS]
+        if unknown:
+            raise ValueError(f"Unsupported aggregate functions: {', '.join(unknown)}")
+        if not metrics or not functions:
+            raise ValueError("At least one metric and one aggregate function are required")
+        if column_types is not None:
+            non_numeric = [m for m in metrics if column_types.get(m, "").upper() not in NUMERIC_TYPES]
+            if non_numeric:
+                raise ValueError(f"Metrics must be numeric columns: {', '.join(non_numeric)}")
+
+        keys = ["periodo"]
+        projection = [f"DATETIME_TRUNC(ena_data, {GRANULARITIES[granularity]}) AS periodo"]
+        if group_by is not None:
+            keys.append(GROUP_COLUMNS[group_by])
+            projection.append(self._identifier(GROUP_COLUMNS[group_by]))
+        for metric in dict.fromkeys(metrics):
+            for function in dict.fromkeys(functions):
+                projection.append(
+                    f"{AGGREGATE_FUNCTIONS[function]}({self._identifier(metric)}) AS {function}_{metric}"
+                )
+
+        query = (
+            f"SELECT {', '.join(projection)}\n"
+            f"FROM `{self.table}`\n"
+            f"WHERE {self._where()}\n"
+            f"GROUP BY {', '.join(keys)}\n"
+            f"ORDER BY {', '.join(keys)}"
+        )
+        return query, list(self._parameters)
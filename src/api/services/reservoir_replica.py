@@ -0,0 +1,235 @@
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, datetime, time as dt_time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.compute as pc  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+from repositories.async_bigquery_repository import AsyncBigQueryRepository
+from services.reservoir_query import AGGREGATE_FUNCTIONS, GROUP_COLUMNS, ORDER_COLUMNS
+from utils.logger import LogLevel, log
+
+# floor_temporal arguments matching the DATETIME_TRUNC parts used in BigQuery
+_FLOOR_UNITS = {"week": ("week", True), "month": ("month", False), "year": ("year", False)}
+_ARROW_AGGREGATES = {"avg": "mean", "sum": "sum", "min": "min", "max": "max", "count": "count"}
+
+
+def _bigquery_type(data_type: pa.DataType) -> str:
+    """BigQuery schema field type of a column read back from the gold table."""
+    if pa.types.is_floating(data_type):
+        return "FLOAT"
+    if pa.types.is_integer(data_type):
+        return "INTEGER"
+    if pa.types.is_decimal(data_type):
+        return "NUMERIC"
+    if pa.types.is_timestamp(data_type):
+        return "DATETIME"
+    if pa.types.is_date(data_type):
+        return "DATE"
+    return "STRING"
+
+
+class ReservoirReplica:
+    """
+    In-process copy of the gold reservoir table, snapshotted to Parquet.
+
+    The gold table is small and changes about once a day, so a local snapshot
+    answers /reservoir queries in milliseconds instead of a BigQuery round trip.
+    ``run()`` refreshes it every ``RESERVOIR_REPLICA_REFRESH_SECONDS`` or when
+    ``request_refresh()`` is called (ingestion signal). A snapshot older than
+    ``RESERVOIR_REPLICA_MAX_AGE_SECONDS`` is stale and callers go to BigQuery.
+    """
+
+    def __init__(
+        self,
+        repository: AsyncBigQueryRepository,
+        table_id: str,
+        path: Optional[str] = None,
+        max_age_seconds: Optional[float] = None,
+        refresh_seconds: Optional[float] = None,
+    ) -> None:
+        self.repository = repository
+        self.table_id = table_id
+        self.path: str = (
+            path
+            or os.environ.get("RESERVOIR_REPLICA_PATH")
+            or os.path.join(tempfile.gettempdir(), "reservoir_replica.parquet")
+        )
+        self.max_age_seconds = max_age_seconds or float(
+            os.environ.get("RESERVOIR_REPLICA_MAX_AGE_SECONDS", 36 * 3600)
+        )
+        self.refresh_seconds = refresh_seconds or float(
+            os.environ.get("RESERVOIR_REPLICA_REFRESH_SECONDS", 3600)
+        )
+        self._table: Optional[pa.Table] = None
+        self._snapshot_at = 0.0
+        self._refresh_requested = asyncio.Event()
+
+    @property
+    def fresh(self) -> bool:
+        return self._table is not None and time.time() - self._snapshot_at < self.max_age_seconds
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        return time.time() - self._snapshot_at if self._table is not None else None
+
+    @property
+    def schema(self) -> Dict[str, str]:
+        """Column name -> BigQuery type, like ``get_table_schema`` on the gold table."""
+        if self._table is None:
+            return {}
+        return {field.name: _bigquery_type(field.type) for field in self._table.schema}
+
+    def _install(self, table: pa.Table, snapshot_at: float) -> None:
+        # Sorted once here so every filtered slice is already in keyset order
+        self._table = table.sort_by([(column, "ascending") for column in ORDER_COLUMNS])
+        self._snapshot_at = snapshot_at
+
+    def load(self) -> bool:
+        """Adopt the Parquet snapshot on disk, if any (e.g. after a restart)."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            table = pq.read_table(self.path)
+            self._install(table, os.path.getmtime(self.path))
+        except Exception as e:
+            log(f"Could not load reservoir replica from {self.path}: {e}", LogLevel.ERROR)
+            return False
+        log(f"Loaded reservoir replica from {self.path}: {table.num_rows} rows", LogLevel.INFO)
+        return True
+
+    def _write_snapshot(self, batches: Iterable[pa.RecordBatch]) -> pa.Table:
+        collected = list(batches)
+        if not collected:
+            raise ValueError("Snapshot query returned no rows")
+        table = pa.Table.from_batches(collected)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+        return table
+
+    async def refresh(self) -> None:
+        started = time.time()
+        query = f"SELECT * FROM `{self.repository.project_id}.{self.table_id}`"
+        batches = await self.repository.execute_arrow_query(query, 100000)
+        table = await asyncio.to_thread(self._write_snapshot, batches)
+        self._install(table, started)
+        log(
+            f"Reservoir replica refreshed: {table.num_rows} rows in {time.time() - started:.1f}s",
+            LogLevel.INFO,
+        )
+
+    def request_refresh(self) -> None:
+        self._refresh_requested.set()
+
+    async def run(self) -> None:
+        """Background loop: refresh on schedule or on request until cancelled."""
+        if not self.fresh:
+            self.load()
+        while True:
+            due = self._table is None or time.time() - self._snapshot_at >= self.refresh_seconds
+            if due or self._refresh_requested.is_set():
+                self._refresh_requested.clear()
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    log(f"Reservoir replica refresh failed: {e}", LogLevel.ERROR)
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _filtered(
+        self,
+        start_date: date,
+        end_date: date,
+        filters: Dict[str, Optional[str]],
+    ) -> pa.Table:
+        if self._table is None:
+            raise RuntimeError("Reservoir replica is not loaded")
+        table = self._table
+        ena_data = table["ena_data"]
+        start = pa.scalar(datetime.combine(start_date, dt_time.min), type=ena_data.type)
+        end = pa.scalar(datetime.combine(end_date, dt_time.min), type=ena_data.type)
+        mask = pc.and_(pc.greater_equal(ena_data, start), pc.less_equal(ena_data, end))
+        for column, value in filters.items():
+            if value is not None:
+                mask = pc.and_(mask, pc.equal(table[column], value))
+        return table.filter(mask)
+
+    def query_page(
+        self,
+        start_date: date,
+        end_date: date,
+        filters: Dict[str, Optional[str]],
+        fields: Optional[Sequence[str]],
+        page_offset: int,
+        page_size: int,
+        cursor: Optional[Tuple[datetime, str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Same rows and total as the BigQuery page query, served from memory."""
+        table = self._filtered(start_date, end_date, filters)
+        total = table.num_rows
+        if cursor is not None:
+            cursor_data, cursor_reservatorio = cursor
+            ena_data = table["ena_data"]
+            cursor_scalar = pa.scalar(cursor_data, type=ena_data.type)
+            after = pc.or_(
+                pc.greater(ena_data, cursor_scalar),
+                pc.and_(
+                    pc.equal(ena_data, cursor_scalar),
+                    pc.greater(table["nom_reservatorio"], cursor_reservatorio),
+                ),
+            )
+            page = table.filter(after).slice(0, page_size)
+        else:
+            page = table.slice((page_offset - 1) * page_size, page_size)
+        if fields:
+            page = page.select(list(dict.fromkeys([*ORDER_COLUMNS, *fields])))
+        return page.to_pylist(), total
+
+    def aggregate(
+        self,
+        start_date: date,
+        end_date: date,
+        filters: Dict[str, Optional[str]],
+        granularity: str,
+        group_by: Optional[str],
+        metrics: Sequence[str],
+        functions: Sequence[str],
+    ) -> List[Dict[str, Any]]:
+        """Same rows as ReservoirQueryBuilder.build_aggregate, computed with Arrow."""
+        table = self._filtered(start_date, end_date, filters)
+        unit, week_starts_monday = _FLOOR_UNITS[granularity]
+        periodo = pc.floor_temporal(table["ena_data"], unit=unit, week_starts_monday=week_starts_monday)
+        keys = ["periodo"] + ([GROUP_COLUMNS[group_by]] if group_by else [])
+        source = pa.table({"periodo": periodo, **{key: table[key] for key in keys[1:]}, **{
+            metric: table[metric] for metric in dict.fromkeys(metrics)
+        }})
+        aggregations = [
+            (metric, _ARROW_AGGREGATES[function])
+            for metric in dict.fromkeys(metrics)
+            for function in dict.fromkeys(functions)
+            if function in AGGREGATE_FUNCTIONS
+        ]
+        grouped = source.group_by(keys).aggregate(aggregations)
+        grouped = grouped.rename_columns([
+            name if name in keys else self._aggregate_name(name) for name in grouped.column_names
+        ])
+        return grouped.sort_by([(key, "ascending") for key in keys]).to_pylist()
+
+    @staticmethod
+    def _aggregate_name(arrow_name: str) -> str:
+        """``metric_mean`` -> ``avg_metric``, matching the BigQuery aliases."""
+        for function, arrow_function in _ARROW_AGGREGATES.items():
+            suffix = f"_{arrow_function}"
+            if arrow_name.endswith(suffix):
+                return f"{function}_{arrow_name[: -len(suffix)]}"
+        return arrow_name
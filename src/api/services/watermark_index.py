@@ -0,0 +1,51 @@
+import asyncio
+import os
+from datetime import date, datetime
+from typing import Dict
+
+from repositories.gcs_repository import GCSFileRepository
+from utils.logger import LogLevel, log
+from utils.ttl_cache import TTLCache
+
+
+class WatermarkIndex:
+    """
+    Per-package index of the last ingested day of each year, cached in-process.
+
+    Loaded with a single query per package before any download starts, so
+    historical years that are already complete in the raw table are skipped
+    without fetching a byte.
+    """
+
+    def __init__(self, repository: GCSFileRepository, ttl_seconds: float | None = None) -> None:
+        self.repository = repository
+        ttl = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get("ONS_WATERMARK_TTL_SECONDS", 900)
+        )
+        self._cache: TTLCache[str, Dict[int, date]] = TTLCache(ttl)
+
+    async def get(self, package: str) -> Dict[int, date]:
+        watermarks = self._cache.get(package)
+        if watermarks is not None:
+            log(f"Watermark cache hit for package {package}", LogLevel.DEBUG)
+            return watermarks
+
+        try:
+            watermarks = await asyncio.to_thread(self.repository.raw_table_watermarks, package)
+        except Exception as e:
+            # The per-file check still protects against duplicates
+            log(f"Could not load watermarks for package {package}: {e}", LogLevel.ERROR)
+            return {}
+
+        self._cache.set(package, watermarks)
+        return watermarks
+
+    def is_complete(self, watermarks: Dict[int, date], year: int) -> bool:
+        """A past year is complete once its last day (Dec 31) has been ingested."""
+        if year >= datetime.now().year:
+            return False
+        last_day = watermarks.get(year)
+        return last_day is not None and last_day >= date(year, 12, 31)
+
+    def invalidate(self, package: str) -> None:
+        self._cache.invalidate(package)
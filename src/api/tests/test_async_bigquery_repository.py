@@ -0,0 +1,177 @@
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from repositories.async_bigquery_repository import AsyncBigQueryRepository
+
+
+class FakeJob:
+    def __init__(self, query: str, polls_needed: int, rows: List[Dict[str, Any]], error: bool = False) -> None:
+        self.query = query
+        self.polls_left = polls_needed
+        self.rows = rows
+        self.error_result: Dict[str, str] | None = None
+        self._error = error
+        self.cancelled = False
+
+    def done(self) -> bool:
+        if self.polls_left > 0:
+            self.polls_left -= 1
+            return False
+        if self._error:
+            self.error_result = {"reason": "invalidQuery"}
+        return True
+
+    def exception(self) -> Exception:
+        return RuntimeError("invalidQuery")
+
+    def cancel(self) -> bool:
+        self.cancelled = True
+        return True
+
+
+class FakeGCPRepository:
+    project_id = "proj"
+
+    def __init__(self, polls_needed: int = 2, submit_seconds: float = 0.0) -> None:
+        self.polls_needed = polls_needed
+        self.submit_seconds = submit_seconds
+        self.jobs: List[FakeJob] = []
+
+    def submit_query(self, query: str, query_parameters: Any = ()) -> FakeJob:
+        time.sleep(self.submit_seconds)
+        rows = [{"total": 42}] if "COUNT" in query else [{"id": len(self.jobs)}]
+        # "slow" jobs keep running long enough to be abandoned
+        polls = self.polls_needed * 1000 if "slow" in query else self.polls_needed
+        job = FakeJob(query, polls, rows, error="broken" in query)
+        self.jobs.append(job)
+        return job
+
+    @staticmethod
+    def fetch_rows(job: FakeJob) -> List[Dict[str, Any]]:
+        return job.rows
+
+    def get_table_schema(self, table_id: str) -> Dict[str, str]:
+        return {"a": "STRING", "b": "FLOAT"}
+
+
+def _repo(polls_needed: int = 2, max_workers: int = 1) -> AsyncBigQueryRepository:
+    return AsyncBigQueryRepository(
+        FakeGCPRepository(polls_needed),  # type: ignore[arg-type]
+        max_workers=max_workers,
+        poll_initial=0.001,
+        poll_max=0.002,
+    )
+
+
+def test_running_jobs_do_not_hold_worker_threads() -> None:
+    repo = _repo(polls_needed=5, max_workers=1)
+
+    async def scenario() -> List[List[Dict[str, Any]]]:
+        return await asyncio.gather(*(repo.execute_query(f"SELECT {i}") for i in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert len(results) == 10
+    stats = repo.stats
+    assert stats.jobs_submitted == stats.jobs_completed == 10
+    assert stats.jobs_in_flight == 0
+    assert stats.polls == 50
+    assert stats.executor_workers == 1
+    repo.shutdown()
+
+
+def test_paginated_query_runs_count_and_page_together() -> None:
+    repo = _repo()
+
+    data, total = asyncio.run(
+        repo.execute_paginated_query("SELECT * FROM t", "SELECT COUNT(*) as total FROM t", page=3, page_size=10)
+    )
+
+    assert total == 42
+    assert data == [{"id": 0}] or data == [{"id": 1}]
+    queries = [job.query for job in repo.repository.jobs]  # type: ignore[attr-defined]
+    assert "SELECT * FROM t LIMIT 10 OFFSET 20" in queries
+    repo.shutdown()
+
+
+def test_failed_jobs_raise_and_are_counted() -> None:
+    repo = _repo()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(repo.execute_query("SELECT broken"))
+
+    assert repo.stats.jobs_failed == 1
+    assert repo.stats.jobs_in_flight == 0
+    repo.shutdown()
+
+
+def test_count_query_none_skips_the_job() -> None:
+    repo = _repo()
+
+    assert asyncio.run(repo.execute_count_query(None)) is None
+    assert asyncio.run(repo.get_table_schema("gold.t")) == {"a": "STRING", "b": "FLOAT"}
+    assert repo.stats.jobs_submitted == 0
+    repo.shutdown()
+
+
+def test_cancelled_request_cancels_its_running_job() -> None:
+    repo = _repo()
+
+    async def scenario() -> None:
+        task = asyncio.ensure_future(repo.execute_query("SELECT slow"))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+
+    (job,) = repo.repository.jobs  # type: ignore[attr-defined]
+    assert job.cancelled
+    assert repo.stats.jobs_failed == 1
+    assert repo.stats.jobs_in_flight == 0
+    repo.shutdown()
+
+
+def test_failed_count_cancels_the_page_job() -> None:
+    repo = _repo(max_workers=2)
+
+    async def scenario() -> None:
+        with pytest.raises(RuntimeError):
+            await repo.execute_paginated_query("SELECT slow", "SELECT COUNT(*) broken", page=1, page_size=10)
+        await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+
+    jobs = {job.query: job for job in repo.repository.jobs}  # type: ignore[attr-defined]
+    assert jobs["SELECT slow LIMIT 10 OFFSET 0"].cancelled
+    assert not jobs["SELECT COUNT(*) broken"].cancelled
+    assert repo.stats.jobs_in_flight == 0
+    repo.shutdown()
+
+
+def test_request_cancelled_during_submit_cancels_the_job_once_created() -> None:
+    repo = AsyncBigQueryRepository(
+        FakeGCPRepository(submit_seconds=0.05),  # type: ignore[arg-type]
+        max_workers=1,
+        poll_initial=0.001,
+    )
+
+    async def scenario() -> None:
+        task = asyncio.ensure_future(repo.execute_query("SELECT 1"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+
+    (job,) = repo.repository.jobs  # type: ignore[attr-defined]
+    assert job.cancelled
+    assert repo.stats.jobs_in_flight == 0
+    repo.shutdown()
@@ -0,0 +1,145 @@
+import io
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd  # type: ignore[import-untyped]
+import pytest
+from _pytest.capture import CaptureFixture
+from benchmarks import ingestion
+from benchmarks.fixtures import ensure_fixture, format_size, parse_size
+from benchmarks.ingestion import BenchmarkCase, CaseResult, StageResult, compare, run_case
+from benchmarks.stand_ins import LocalFileServer, NullGCSRepository
+from utils import logger
+
+
+@pytest.fixture(autouse=True)
+def restore_log_level() -> Iterator[None]:
+    min_severity = logger._config.min_severity
+    yield
+    logger._config.min_severity = min_severity
+
+
+def test_parse_and_format_size() -> None:
+    assert parse_size("64KB") == 64 * 1024
+    assert parse_size("1gb") == 1024**3
+    assert parse_size("1000") == 1000
+    assert format_size(parse_size("16MB")) == "16MB"
+    assert format_size(1000) == "1000B"
+
+
+def test_csv_fixture_is_ons_shaped_and_reproducible(tmp_path: Path) -> None:
+    first = ensure_fixture(str(tmp_path / "a"), "csv", parse_size("64KB"))
+    second = ensure_fixture(str(tmp_path / "b"), "csv", parse_size("64KB"))
+
+    content = Path(first.path).read_bytes()
+    assert content == Path(second.path).read_bytes()
+    assert first.size_bytes >= parse_size("64KB")
+
+    df = pd.read_csv(io.BytesIO(content), sep=";", encoding="latin1")
+    assert len(df) == first.rows
+    assert "ear_data" in df.columns
+    assert df["nom_bacia"].str.contains("IGUAÇU").any()
+
+
+def test_xlsx_fixture_beyond_worksheet_limit_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="more than a worksheet holds"):
+        ensure_fixture(str(tmp_path), "xlsx", parse_size("1GB"))
+
+
+def test_null_repository_drains_uploads() -> None:
+    repository = NullGCSRepository()
+    assert repository.save(io.BytesIO(b"x" * 10), "a.parquet", None) == "gs://benchmark-bucket/a.parquet"
+    assert repository.save_stream(io.BytesIO(b"y" * 5), "b.parquet", "other") == "gs://other/b.parquet"
+    assert repository.uploaded_bytes == 15
+    assert repository.uploads == 2
+    assert repository.raw_table_has_value("pkg", "ear_data", "2024-01-01") is False
+
+
+@pytest.mark.parametrize(
+    "data_type, mode, stages",
+    [
+        ("csv", "buffer", ["fetch", "read", "convert", "encode", "exists_check", "upload"]),
+        ("parquet", "stream", ["fetch", "transform", "exists_check", "upload"]),
+    ],
+)
+def test_run_case_reports_throughput_per_stage(
+    tmp_path: Path, data_type: str, mode: str, stages: list[str]
+) -> None:
+    fixture = ensure_fixture(str(tmp_path), data_type, parse_size("64KB"))
+    case = BenchmarkCase(data_type=data_type, size_bytes=parse_size("64KB"), mode=mode, repeat=2)
+
+    with LocalFileServer(str(tmp_path)) as server:
+        result = run_case(case, server.url(Path(fixture.path).name), fixture)
+
+    assert result.case_id == f"{data_type}-64KB-{mode}-arrow"
+    assert result.rows == fixture.rows
+    assert result.mb_per_s > 0 and result.rows_per_s > 0
+    assert result.peak_rss_mb > 0
+    assert result.seconds <= result.seconds_median
+    assert [stage.stage for stage in result.stages] == stages
+    assert result.stages[0].mb_per_s is not None
+
+
+def _result(mb_per_s: float, peak_rss_mb: float, encode_seconds: float) -> CaseResult:
+    return CaseResult(
+        case_id="csv-1MB-buffer-arrow",
+        data_type="csv",
+        size_bytes=1024**2,
+        rows=10,
+        mode="buffer",
+        engine="arrow",
+        repeat=1,
+        seconds=1 / mb_per_s,
+        seconds_median=1 / mb_per_s,
+        mb_per_s=mb_per_s,
+        rows_per_s=10 * mb_per_s,
+        peak_rss_mb=peak_rss_mb,
+        rss_growth_mb=0.0,
+        stages=[StageResult(stage="encode", seconds=encode_seconds, bytes_out=1024**2, mb_per_s=1 / encode_seconds)],
+    )
+
+
+def test_compare_flags_slowdowns_and_memory_growth_beyond_tolerance() -> None:
+    baseline = [_result(mb_per_s=100.0, peak_rss_mb=200.0, encode_seconds=0.1)]
+
+    within = compare([_result(mb_per_s=95.0, peak_rss_mb=210.0, encode_seconds=0.105)], baseline, 0.10)
+    assert not any(item.regressed for item in within)
+
+    worse = compare([_result(mb_per_s=80.0, peak_rss_mb=260.0, encode_seconds=0.2)], baseline, 0.10)
+    assert {item.metric for item in worse if item.regressed} == {"mb_per_s", "peak_rss_mb", "encode.mb_per_s"}
+
+
+def test_compare_does_not_flag_stages_too_short_to_measure() -> None:
+    baseline = [_result(mb_per_s=100.0, peak_rss_mb=200.0, encode_seconds=0.001)]
+    current = [_result(mb_per_s=100.0, peak_rss_mb=200.0, encode_seconds=0.01)]
+
+    comparisons = compare(current, baseline, 0.10)
+    stage = next(item for item in comparisons if item.metric == "encode.mb_per_s")
+    assert stage.change < -0.5
+    assert not stage.regressed
+
+
+def test_main_writes_results_and_fails_on_regression(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    args = [
+        "--formats", "csv", "--sizes", "64KB", "--modes", "buffer", "--repeat", "1",
+        "--fixtures-dir", str(tmp_path / "fixtures"), "--in-process",
+    ]
+    baseline_path = tmp_path / "baseline.json"
+    assert ingestion.main([*args, "--save-baseline", str(baseline_path)]) == 0
+
+    baseline = json.loads(baseline_path.read_text())
+    assert [result["case_id"] for result in baseline["results"]] == ["csv-64KB-buffer-arrow"]
+    assert baseline["environment"]["pyarrow"]
+
+    # A baseline 1000x faster than anything achievable must be reported as a regression
+    baseline["results"][0]["mb_per_s"] *= 1000
+    baseline_path.write_text(json.dumps(baseline))
+    output_path = tmp_path / "latest.json"
+    exit_code = ingestion.main(
+        [*args, "--baseline", str(baseline_path), "--output", str(output_path), "--fail-on-regression"]
+    )
+
+    assert exit_code == 1
+    assert output_path.exists()
+    assert "REGRESSION" in capsys.readouterr().out
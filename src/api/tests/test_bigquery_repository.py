@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from typing import Any
+from unittest.mock import ANY, MagicMock, patch
 from google.cloud.exceptions import GoogleCloudError
 from repositories.bigquery_repository import GCPBigQueryRepository
 
@@ -11,63 +12,42 @@ def mock_client() -> MagicMock:
     return client
 
 
-def test_execute_paginated_query_success(mock_client: MagicMock) -> None:
+def test_submit_query_runs_one_job_with_the_result_cache_on(mock_client: MagicMock) -> None:
     repo = GCPBigQueryRepository()
     repo.client = mock_client
+    mock_client.query.return_value.result.return_value = [
+        {"id": 1, "name": "teste"},
+        {"id": 2, "name": "outro"},
+    ]
 
-    query = "SELECT * FROM tabela"
-    count_query = "SELECT COUNT(*) as total FROM tabela"
+    data = repo.fetch_rows(repo.submit_query("SELECT * FROM tabela"))
 
-    def fake_query(sql: str) -> MagicMock:  # 👈 também tipado
-        mock = MagicMock()
-        if "COUNT" in sql:
-            mock.result.return_value = [{"total": 5}]
-        else:
-            mock.result.return_value = [
-                {"id": 1, "name": "teste"},
-                {"id": 2, "name": "outro"},
-            ]
-        return mock
-
-    mock_client.query.side_effect = fake_query
-
-    data, total = repo.execute_paginated_query(query, count_query, page=1, page_size=2)
-
-    assert total == 5
     assert len(data) == 2
     assert data[0]["id"] == 1
-    mock_client.query.assert_any_call(count_query)
-    mock_client.query.assert_any_call(query + " LIMIT 2 OFFSET 0")
+    mock_client.query.assert_called_once_with("SELECT * FROM tabela", job_config=ANY)
+    assert mock_client.query.call_args.kwargs["job_config"].use_query_cache is True
 
 
-def test_execute_paginated_query_empty_result(mock_client: MagicMock) -> None:
+def test_fetch_rows_empty_result(mock_client: MagicMock) -> None:
     repo = GCPBigQueryRepository()
     repo.client = mock_client
 
-    # Count vazio
+    # Resultado vazio
     mock_client.query.return_value.result.return_value = []
 
-    query = "SELECT * FROM tabela"
-    count_query = "SELECT COUNT(*) as total FROM tabela"
+    assert repo.fetch_rows(repo.submit_query("SELECT COUNT(*) as total FROM tabela")) == []
+    mock_client.query.assert_called_once()
 
-    data, total = repo.execute_paginated_query(query, count_query, page=1, page_size=10)
 
-    assert total == 0
-    assert data == []
-
-
-def test_execute_paginated_query_raises_google_error(mock_client: MagicMock) -> None:
+def test_submit_query_raises_google_error(mock_client: MagicMock) -> None:
     repo = GCPBigQueryRepository()
     repo.client = mock_client
 
     # Simula erro do BigQuery
     mock_client.query.side_effect = GoogleCloudError("erro no bigquery")
 
-    query = "SELECT * FROM tabela"
-    count_query = "SELECT COUNT(*) as total FROM tabela"
-
     with pytest.raises(GoogleCloudError):
-        repo.execute_paginated_query(query, count_query, page=1, page_size=10)
+        repo.submit_query("SELECT * FROM tabela")
 
 
 def test_create_bigquery_client_with_json_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -80,3 +60,121 @@ def test_create_bigquery_client_with_json_credentials(monkeypatch: pytest.Monkey
         repo = GCPBigQueryRepository()
         assert repo.client == mock_client.return_value
         mock_client.assert_called()
+
+
+def test_submit_query_binds_parameters_without_waiting(mock_client: MagicMock) -> None:
+    from google.cloud import bigquery
+
+    repo = GCPBigQueryRepository()
+    repo.client = mock_client
+    params = [bigquery.ScalarQueryParameter("cursor_reservatorio", "STRING", "r1")]
+
+    job = repo.submit_query("SELECT * FROM tabela WHERE x > @cursor_reservatorio LIMIT 5", params)
+
+    assert job is mock_client.query.return_value
+    mock_client.query.return_value.result.assert_not_called()
+    assert mock_client.query.call_args.kwargs["job_config"].query_parameters == params
+
+
+def test_arrow_batches_uses_rest_below_threshold(mock_client: MagicMock) -> None:
+    repo = GCPBigQueryRepository()
+    repo.client = mock_client
+    repo._bqstorage_client = MagicMock()
+    repo.storage_api_min_rows = 100
+    rows = MagicMock(total_rows=10)
+    rows.to_arrow_iterable.return_value = iter(["batch"])
+    mock_client.query.return_value.result.return_value = rows
+
+    batches = list(repo.arrow_batches(repo.submit_query("SELECT * FROM tabela"), page_size=500))
+
+    assert batches == ["batch"]
+    rows.to_arrow_iterable.assert_called_once_with()
+    mock_client.query.return_value.result.assert_called_once_with(page_size=500)
+
+
+def test_arrow_batches_uses_storage_api_above_threshold(mock_client: MagicMock) -> None:
+    repo = GCPBigQueryRepository()
+    repo.client = mock_client
+    storage = MagicMock()
+    repo._bqstorage_client = storage
+    repo.storage_api_min_rows = 100
+    rows = MagicMock(total_rows=1000)
+    rows.to_arrow_iterable.return_value = iter(["b1", "b2"])
+    mock_client.query.return_value.result.return_value = rows
+
+    batches = list(repo.arrow_batches(repo.submit_query("SELECT * FROM tabela"), page_size=500))
+
+    assert batches == ["b1", "b2"]
+    rows.to_arrow_iterable.assert_called_once_with(bqstorage_client=storage)
+
+
+def test_arrow_batches_falls_back_to_rest_when_storage_fails(mock_client: MagicMock) -> None:
+    repo = GCPBigQueryRepository()
+    repo.client = mock_client
+    repo._bqstorage_client = MagicMock()
+    repo.storage_api_min_rows = 100
+
+    def failing() -> Any:
+        raise RuntimeError("permission denied")
+        yield
+
+    storage_rows = MagicMock(total_rows=1000)
+    storage_rows.to_arrow_iterable.return_value = failing()
+    rest_rows = MagicMock(total_rows=1000)
+    rest_rows.to_arrow_iterable.return_value = iter(["rest"])
+    mock_client.query.return_value.result.side_effect = [storage_rows, rest_rows]
+
+    batches = list(repo.arrow_batches(repo.submit_query("SELECT * FROM tabela"), page_size=500))
+
+    assert batches == ["rest"]
+    rest_rows.to_arrow_iterable.assert_called_once_with()
+
+
+def test_bqstorage_client_is_none_without_package(monkeypatch: pytest.MonkeyPatch) -> None:
+    import repositories.bigquery_repository as mod
+
+    monkeypatch.setattr(mod.importlib.util, "find_spec", lambda name: None)
+
+    assert GCPBigQueryRepository().bqstorage_client is None
+
+
+def test_get_table_schema_reads_field_types(mock_client: MagicMock) -> None:
+    repo = GCPBigQueryRepository()
+    repo.client = mock_client
+    field = MagicMock()
+    field.name = "ena_data"
+    field.field_type = "DATETIME"
+    mock_client.get_table.return_value.schema = [field]
+
+    assert repo.get_table_schema("gold.tabela") == {"ena_data": "DATETIME"}
+    mock_client.get_table.assert_called_once_with("sauter-university-challenger.gold.tabela")
+
+
+def test_record_job_metrics_accumulates_job_statistics() -> None:
+    from repositories.bigquery_repository import (
+        BIGQUERY_BYTES_PROCESSED,
+        BIGQUERY_JOBS,
+        BIGQUERY_SLOT_MS,
+        record_job_metrics,
+    )
+
+    class Job:
+        total_bytes_processed = 2048
+        total_bytes_billed = 10485760
+        slot_millis = 30
+        cache_hit = False
+
+    class PendingJob:
+        total_bytes_processed = None
+        cache_hit = True
+
+    processed = BIGQUERY_BYTES_PROCESSED.value()
+    slot_ms = BIGQUERY_SLOT_MS.value()
+    cached = BIGQUERY_JOBS.value(cache_hit="true")
+
+    record_job_metrics(Job())  # type: ignore[arg-type]
+    record_job_metrics(PendingJob())  # type: ignore[arg-type]
+
+    assert BIGQUERY_BYTES_PROCESSED.value() == processed + 2048
+    assert BIGQUERY_SLOT_MS.value() == slot_ms + 30
+    assert BIGQUERY_JOBS.value(cache_hit="true") == cached + 1
@@ -0,0 +1,131 @@
+from datetime import date
+from typing import Any, Iterator
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.bigquery_dto import ReservoirAggregateResponseDTO, ReservoirResponseDTO
+from routers.bigquery_router import create_router
+
+
+class FakeReservoirService:
+    def __init__(self) -> None:
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def get_reservoir_data(self, *args: Any, **kwargs: Any) -> ReservoirResponseDTO:
+        self.calls.append(("data",) + args + (kwargs,))
+        return ReservoirResponseDTO(data=[{"a": 1}], total_records=1, page=1, page_size=100)
+
+    async def get_reservoir_aggregate(self, *args: Any, **kwargs: Any) -> ReservoirAggregateResponseDTO:
+        self.calls.append(("aggregate",) + args + (kwargs,))
+        if kwargs["functions"] == ["median"]:
+            raise ValueError("Unsupported aggregate functions: median")
+        return ReservoirAggregateResponseDTO(data=[], granularity=args[2], group_by=args[3])
+
+    async def export_reservoir_data(self, start_date: date, end_date: date, export_format: str) -> Iterator[bytes]:
+        self.calls.append(("export", start_date, end_date, export_format))
+        return iter([b'{"a": 1}\n', b'{"a": 2}\n'])
+
+
+def _client(service: FakeReservoirService) -> TestClient:
+    app = FastAPI()
+    app.include_router(create_router(service))  # type: ignore[arg-type]
+    return TestClient(app)
+
+
+def test_data_endpoint_passes_pagination_options() -> None:
+    service = FakeReservoirService()
+
+    response = _client(service).get(
+        "/reservoir/data",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-31", "include_total": "false"},
+    )
+
+    assert response.status_code == 200
+    no_filters = {"reservatorio": None, "bacia": None, "subsistema": None, "fields": None}
+    assert service.calls == [("data", date(2024, 1, 1), date(2024, 1, 31), 1, 100, None, False, no_filters)]
+
+
+def test_data_endpoint_parses_fields_and_filters() -> None:
+    service = FakeReservoirService()
+
+    response = _client(service).get(
+        "/reservoir/data",
+        params={
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-31",
+            "fields": "ena_armazenavel_res_mwmed, val_latitude",
+            "bacia": "GRANDE",
+        },
+    )
+
+    assert response.status_code == 200
+    assert service.calls[0][-1] == {
+        "reservatorio": None,
+        "bacia": "GRANDE",
+        "subsistema": None,
+        "fields": ["ena_armazenavel_res_mwmed", "val_latitude"],
+    }
+
+
+def test_data_endpoint_rejects_inverted_range() -> None:
+    response = _client(FakeReservoirService()).get(
+        "/reservoir/data", params={"start_date": "2024-02-01", "end_date": "2024-01-01"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_export_endpoint_streams_ndjson() -> None:
+    service = FakeReservoirService()
+
+    response = _client(service).get(
+        "/reservoir/export", params={"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.splitlines() == [b'{"a": 1}', b'{"a": 2}']
+    assert service.calls == [("export", date(2024, 1, 1), date(2024, 1, 31), "ndjson")]
+
+
+def test_export_endpoint_rejects_unknown_format() -> None:
+    service = FakeReservoirService()
+
+    response = _client(service).get(
+        "/reservoir/export",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-31", "format": "xml"},
+    )
+
+    assert response.status_code == 400
+    assert service.calls == []
+
+
+def test_aggregate_endpoint_passes_options() -> None:
+    service = FakeReservoirService()
+
+    response = _client(service).get(
+        "/reservoir/aggregate",
+        params={
+            "start_date": "2015-01-01",
+            "end_date": "2024-12-31",
+            "granularity": "year",
+            "group_by": "subsistema",
+            "functions": "avg,max",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["group_by"] == "subsistema"
+    call = service.calls[0]
+    assert call[1:5] == (date(2015, 1, 1), date(2024, 12, 31), "year", "subsistema")
+    assert call[-1]["functions"] == ["avg", "max"]
+
+
+def test_aggregate_endpoint_maps_value_errors_to_400() -> None:
+    response = _client(FakeReservoirService()).get(
+        "/reservoir/aggregate",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-31", "functions": "median"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,334 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pytest
+
+from services.bigquery_service import ReservoirService, decode_cursor, encode_cursor
+from utils.result_cache import LRUResultCache
+
+
+class FakeRepository:
+    project_id = "proj"
+    schema = {
+        "ena_data": "DATETIME",
+        "nom_reservatorio": "STRING",
+        "nom_bacia": "STRING",
+        "ena_armazenavel_res_mwmed": "FLOAT",
+        "val_latitude": "FLOAT",
+    }
+
+    def __init__(self, rows: List[Dict[str, Any]], total: int) -> None:
+        self.rows = rows
+        self.total = total
+        self.calls: List[Tuple[str, Any]] = []
+
+    async def execute_query(self, query: str, query_parameters: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        self.calls.append(("query", (query, list(query_parameters))))
+        return [{"periodo": datetime(2024, 1, 1), "avg_ena_armazenavel_res_mwmed": 1.5}]
+
+    async def get_table_schema(self, table_id: str) -> Dict[str, str]:
+        self.calls.append(("schema", table_id))
+        return self.schema
+
+    async def execute_count_query(self, count_query: Optional[str], query_parameters: Sequence[Any] = ()) -> Optional[int]:
+        if count_query is None:
+            return None
+        self.calls.append(("count", count_query))
+        return self.total
+
+    async def execute_paginated_query(
+        self,
+        query: str,
+        count_query: Optional[str],
+        page: int,
+        page_size: int,
+        query_parameters: Sequence[Any] = (),
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        self.calls.append(("offset", (query, page, page_size)))
+        self.parameters = list(query_parameters)
+        rows = [dict(row) for row in self.rows[:page_size]]
+        if "COUNT(*) OVER()" in query:
+            for row in rows:
+                row["_total_records"] = self.total
+        return rows, await self.execute_count_query(count_query)
+
+    async def execute_arrow_query(self, query: str, page_size: int, query_parameters: Sequence[Any] = ()) -> Iterator[Any]:
+        self.calls.append(("stream", (query, page_size)))
+        return iter([
+            pa.RecordBatch.from_pylist(self.rows[start:start + page_size])
+            for start in range(0, len(self.rows), page_size)
+        ])
+
+    async def execute_keyset_query(
+        self, query: str, count_query: Optional[str], page_size: int, query_parameters: Sequence[Any]
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        self.calls.append(("keyset", (query, page_size, list(query_parameters))))
+        return self.rows[:page_size], await self.execute_count_query(count_query)
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {"ena_data": datetime(2024, 1, 1 + i), "nom_reservatorio": f"r{i}", "ena_armazenavel_res_mwmed": float(i)}
+        for i in range(n)
+    ]
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor({"ena_data": datetime(2024, 1, 2), "nom_reservatorio": "furnas"})
+
+    assert decode_cursor(cursor) == (datetime(2024, 1, 2), "furnas")
+
+
+def test_decode_cursor_rejects_garbage() -> None:
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_first_page_returns_next_cursor_from_last_row() -> None:
+    repo = FakeRepository(_rows(3), total=10)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    response = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+
+    assert repo.calls[0][0] == "offset"
+    assert "ORDER BY ena_data ASC, nom_reservatorio ASC" in repo.calls[0][1][0]
+    assert response.next_cursor is not None
+    assert decode_cursor(response.next_cursor) == (datetime(2024, 1, 2), "r1")
+
+
+def test_cursor_page_uses_keyset_predicate() -> None:
+    repo = FakeRepository(_rows(1), total=10)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+    cursor = encode_cursor({"ena_data": datetime(2024, 1, 2), "nom_reservatorio": "r1"})
+
+    response = asyncio.run(
+        service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2, cursor=cursor)
+    )
+
+    kind, (query, page_size, params) = repo.calls[0]
+    assert repo.calls[1][0] == "count"
+    assert kind == "keyset"
+    assert "OFFSET" not in query
+    assert "nom_reservatorio > @cursor_reservatorio" in query
+    assert {p.name: p.value for p in params} == {
+        "start_date": datetime(2024, 1, 1),
+        "end_date": datetime(2024, 1, 31),
+        "cursor_data": datetime(2024, 1, 2),
+        "cursor_reservatorio": "r1",
+    }
+    # Short page: nothing after it
+    assert response.next_cursor is None
+
+
+def test_total_comes_from_window_and_is_cached() -> None:
+    repo = FakeRepository(_rows(2), total=10)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    first = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+    second = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 2, 2))
+
+    assert first.total_records == second.total_records == 10
+    assert "_total_records" not in first.data[0]
+    assert [kind for kind, _ in repo.calls] == ["offset", "offset"]
+    assert "COUNT(*) OVER()" in repo.calls[0][1][0]
+    assert "COUNT(*) OVER()" not in repo.calls[1][1][0]
+
+
+def test_page_past_the_end_falls_back_to_count_query() -> None:
+    repo = FakeRepository([], total=4)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    response = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 9, 2))
+
+    assert response.total_records == 4
+    assert [kind for kind, _ in repo.calls] == ["offset", "count"]
+
+
+def test_include_total_false_runs_a_single_job() -> None:
+    repo = FakeRepository(_rows(2), total=10)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+    cursor = encode_cursor({"ena_data": datetime(2024, 1, 2), "nom_reservatorio": "r1"})
+
+    offset_page = asyncio.run(
+        service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2, include_total=False)
+    )
+    keyset_page = asyncio.run(
+        service.get_reservoir_data(
+            date(2024, 1, 1), date(2024, 1, 31), 1, 2, cursor=cursor, include_total=False
+        )
+    )
+
+    assert offset_page.total_records is None and keyset_page.total_records is None
+    assert [kind for kind, _ in repo.calls] == ["offset", "keyset"]
+    assert "COUNT(*) OVER()" not in repo.calls[0][1][0]
+
+
+def test_results_are_cached_until_invalidated() -> None:
+    repo = FakeRepository(_rows(2), total=10)
+    service = ReservoirService(repository=repo, result_cache=LRUResultCache(1024 * 1024))  # type: ignore[arg-type]
+
+    first = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+    second = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+    assert len(repo.calls) == 1
+    assert second.total_records == first.total_records
+    assert second.next_cursor == first.next_cursor
+
+    service.invalidate_cache("ear-diario-por-reservatorio")
+    asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+    assert len(repo.calls) == 2
+
+
+def test_result_ttl_is_short_for_ranges_touching_today() -> None:
+    service = ReservoirService(repository=FakeRepository([], 0))  # type: ignore[arg-type]
+
+    assert service._result_ttl(date(2020, 12, 31)) == service.historical_ttl
+    assert service._result_ttl(date.today()) == service.recent_ttl
+    # The daily gold refresh still rewrites the last reprocess_days days
+    assert service._result_ttl(date.today() - timedelta(days=1)) == service.recent_ttl
+    assert service._result_ttl(date.today() - timedelta(days=service.reprocess_days)) == service.recent_ttl
+    assert service._result_ttl(date.today() - timedelta(days=service.reprocess_days + 1)) == service.historical_ttl
+
+
+def test_export_ndjson_yields_one_chunk_per_page() -> None:
+    repo = FakeRepository(_rows(3), total=3)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+    service.export_page_size = 2
+
+    chunks = list(asyncio.run(service.export_reservoir_data(date(2024, 1, 1), date(2024, 1, 31))))
+
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode().splitlines()
+    assert json.loads(lines[0]) == {"ena_data": "2024-01-01T00:00:00", "nom_reservatorio": "r0", "ena_armazenavel_res_mwmed": 0.0}
+    assert len(lines) == 3
+    assert repo.calls[0] == ("stream", (repo.calls[0][1][0], 2))
+
+
+def test_export_arrow_produces_a_readable_ipc_stream() -> None:
+    repo = FakeRepository(_rows(3), total=3)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+    service.export_page_size = 2
+
+    chunks = list(asyncio.run(service.export_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), "arrow")))
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+
+    assert table.num_rows == 3
+    assert table.column("nom_reservatorio").to_pylist() == ["r0", "r1", "r2"]
+
+
+def test_export_arrow_empty_result_is_a_valid_stream() -> None:
+    service = ReservoirService(repository=FakeRepository([], total=0))  # type: ignore[arg-type]
+
+    chunks = list(asyncio.run(service.export_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), "arrow")))
+
+    assert pa.ipc.open_stream(b"".join(chunks)).read_all().num_rows == 0
+
+
+def test_export_rejects_unknown_format() -> None:
+    service = ReservoirService(repository=FakeRepository([], total=0))  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.export_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), "xml"))
+
+
+def test_filters_and_fields_reach_the_query_as_parameters() -> None:
+    repo = FakeRepository(_rows(1), total=1)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    asyncio.run(
+        service.get_reservoir_data(
+            date(2024, 1, 1), date(2024, 1, 31), 1, 2, bacia="GRANDE", fields=["val_latitude"]
+        )
+    )
+
+    assert repo.calls[0] == ("schema", "gold.dados_reservatorios_completo")
+    query = repo.calls[1][1][0]
+    assert "`nom_bacia` = @nom_bacia" in query
+    assert "SELECT `ena_data`, `nom_reservatorio`, `val_latitude`" in query
+    assert {p.name: p.value for p in repo.parameters}["nom_bacia"] == "GRANDE"
+
+
+def test_unknown_fields_are_rejected_and_schema_is_cached() -> None:
+    repo = FakeRepository(_rows(1), total=1)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError, match="bogus"):
+        asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2, fields=["bogus"]))
+    asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2, fields=["val_latitude"]))
+
+    assert [kind for kind, _ in repo.calls].count("schema") == 1
+
+
+def test_aggregate_runs_one_group_by_job_and_is_cached() -> None:
+    repo = FakeRepository([], total=0)
+    service = ReservoirService(repository=repo, result_cache=LRUResultCache(1024 * 1024))  # type: ignore[arg-type]
+
+    first = asyncio.run(
+        service.get_reservoir_aggregate(date(2015, 1, 1), date(2024, 12, 31), "month", subsistema="SE")
+    )
+    second = asyncio.run(
+        service.get_reservoir_aggregate(date(2015, 1, 1), date(2024, 12, 31), "month", subsistema="SE")
+    )
+
+    queries = [call for call in repo.calls if call[0] == "query"]
+    assert len(queries) == 1
+    query, params = queries[0][1]
+    assert "GROUP BY periodo" in query
+    assert {p.name: p.value for p in params}["nom_subsistema"] == "SE"
+    assert first.data == [{"periodo": datetime(2024, 1, 1), "avg_ena_armazenavel_res_mwmed": 1.5}]
+    assert second.data[0]["avg_ena_armazenavel_res_mwmed"] == 1.5
+
+
+def test_aggregate_rejects_unknown_metric() -> None:
+    service = ReservoirService(repository=FakeRepository([], total=0))  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_reservoir_aggregate(date(2024, 1, 1), date(2024, 1, 31), "month", metrics=["nope"]))
+
+
+def test_aggregate_rejects_string_metric_before_querying() -> None:
+    repo = FakeRepository([], total=0)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError, match="numeric"):
+        asyncio.run(
+            service.get_reservoir_aggregate(
+                date(2024, 1, 1), date(2024, 1, 31), "month", metrics=["nom_bacia"], functions=["avg"]
+            )
+        )
+    assert [kind for kind, _ in repo.calls] == ["schema"]
+
+
+def test_concurrent_identical_requests_share_one_query() -> None:
+    repo = FakeRepository(_rows(2), total=10)
+    service = ReservoirService(repository=repo)  # type: ignore[arg-type]
+
+    async def scenario() -> List[Any]:
+        return await asyncio.gather(
+            *(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2) for _ in range(10))
+        )
+
+    responses = asyncio.run(scenario())
+
+    assert [kind for kind, _ in repo.calls] == ["offset"]
+    assert all(response.total_records == 10 for response in responses)
+
+
+def test_fresh_replica_serves_without_bigquery(tmp_path: Any) -> None:
+    from services.reservoir_replica import ReservoirReplica
+    from tests.test_reservoir_replica import FakeAsyncRepository
+
+    replica = ReservoirReplica(FakeAsyncRepository(), "gold.t", path=str(tmp_path / "r.parquet"))  # type: ignore[arg-type]
+    asyncio.run(replica.refresh())
+    repo = FakeRepository([], total=0)
+    service = ReservoirService(repository=repo, replica=replica)  # type: ignore[arg-type]
+
+    response = asyncio.run(service.get_reservoir_data(date(2024, 1, 1), date(2024, 1, 31), 1, 2))
+    aggregate = asyncio.run(service.get_reservoir_aggregate(date(2024, 1, 1), date(2024, 12, 31), "year"))
+
+    assert repo.calls == []
+    assert response.total_records == 3
+    assert response.next_cursor is not None
+    assert aggregate.data[0]["avg_ena_armazenavel_res_mwmed"] == 2.75
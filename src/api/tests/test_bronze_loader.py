@@ -0,0 +1,82 @@
+from typing import Any, List
+
+import google.cloud.bigquery as bigquery  # type: ignore[import-untyped]
+from google.api_core.exceptions import NotFound  # type: ignore[import-untyped]
+
+from repositories.bronze_loader import BronzeTableLoader
+
+
+class FakeBigQueryClient:
+    def __init__(self, table: Any = None) -> None:
+        self.table = table
+        self.calls: List[str] = []
+
+    def dataset(self, dataset_id: str) -> bigquery.DatasetReference:
+        return bigquery.DatasetReference("proj", dataset_id)
+
+    def get_table(self, table_ref: Any) -> Any:
+        self.calls.append("get")
+        if self.table is None:
+            raise NotFound("missing")
+        return self.table
+
+    def delete_table(self, table_ref: Any) -> None:
+        self.calls.append("delete")
+        self.table = None
+
+    def create_table(self, table: bigquery.Table) -> bigquery.Table:
+        self.calls.append("create")
+        self.table = table
+        return table
+
+
+class FakeRepo:
+    def __init__(self, client: FakeBigQueryClient) -> None:
+        self.bq_client = client
+
+
+def test_external_config_uses_hive_layout() -> None:
+    loader = BronzeTableLoader(FakeRepo(FakeBigQueryClient()))  # type: ignore[arg-type]
+
+    config = loader.external_config("raw", "pkg").to_api_repr()
+
+    assert config["sourceUris"] == ["gs://raw/package=pkg/*"]
+    assert config["hivePartitioningOptions"]["mode"] == "CUSTOM"
+    assert config["hivePartitioningOptions"]["sourceUriPrefix"] == (
+        "gs://raw/package=pkg/{year:INTEGER}/{ingest_date:DATE}"
+    )
+
+
+def test_ensure_table_creates_missing_table_once() -> None:
+    client = FakeBigQueryClient()
+    loader = BronzeTableLoader(FakeRepo(client))  # type: ignore[arg-type]
+
+    assert loader.ensure_table("pkg", "raw") is True
+    assert loader.ensure_table("pkg", "raw") is False
+
+    assert client.calls == ["get", "create"]
+    assert client.table.table_id == "raw_pkg"
+    assert client.table.external_data_configuration.hive_partitioning is not None
+
+
+def test_ensure_table_replaces_flat_layout_definition() -> None:
+    old = bigquery.Table("proj.bronze.raw_pkg")
+    flat = bigquery.ExternalConfig("PARQUET")
+    flat.source_uris = ["gs://raw/pkg/*"]
+    old.external_data_configuration = flat
+    client = FakeBigQueryClient(old)
+    loader = BronzeTableLoader(FakeRepo(client))  # type: ignore[arg-type]
+
+    assert loader.ensure_table("pkg", "raw") is True
+
+    assert client.calls == ["get", "delete", "create"]
+    assert client.table.external_data_configuration.source_uris == ["gs://raw/package=pkg/*"]
+
+
+def test_ensure_table_keeps_current_definition() -> None:
+    client = FakeBigQueryClient()
+    BronzeTableLoader(FakeRepo(client)).ensure_table("pkg", "raw")  # type: ignore[arg-type]
+    client.calls.clear()
+
+    assert BronzeTableLoader(FakeRepo(client)).ensure_table("pkg", "raw") is False  # type: ignore[arg-type]
+    assert client.calls == ["get"]
@@ -0,0 +1,96 @@
+import asyncio
+from typing import List
+
+from services.download_scheduler import DownloadScheduler
+
+
+def test_scheduler_limits_global_and_per_host_concurrency() -> None:
+    scheduler = DownloadScheduler(max_concurrency=3, per_host_limit=2, max_pending=100)
+    running: dict[str, int] = {}
+    peaks = {"total": 0, "a": 0, "b": 0}
+
+    async def job(host: str) -> str:
+        running[host] = running.get(host, 0) + 1
+        peaks[host] = max(peaks[host], running[host])
+        peaks["total"] = max(peaks["total"], sum(running.values()))
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        return host
+
+    async def main() -> List[str]:
+        tasks = [
+            scheduler.run("g", f"https://{host}/file_{i}.csv", lambda host=host: job(host))  # type: ignore[misc]
+            for i in range(6)
+            for host in ("a", "b")
+        ]
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+
+    assert len(results) == 12
+    assert peaks["total"] <= 3
+    assert peaks["a"] <= 2 and peaks["b"] <= 2
+    assert scheduler.active == 0 and scheduler.pending == 0
+
+
+def test_scheduler_serves_groups_round_robin() -> None:
+    scheduler = DownloadScheduler(max_concurrency=1, per_host_limit=1, max_pending=100)
+    order: List[str] = []
+
+    async def job(name: str) -> None:
+        order.append(name)
+        await asyncio.sleep(0)
+
+    async def main() -> None:
+        tasks = [
+            scheduler.run("big", "https://ons/x", lambda i=i: job(f"big-{i}"))  # type: ignore[misc]
+            for i in range(4)
+        ] + [
+            scheduler.run("small", "https://ons/y", lambda: job("small-0")),
+        ]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+    # The small group gets the second slot instead of waiting for the whole backfill
+    assert order.index("small-0") <= 2
+
+
+def test_scheduler_applies_backpressure_on_admission() -> None:
+    scheduler = DownloadScheduler(max_concurrency=1, per_host_limit=1, max_pending=2)
+    admitted_peak = 0
+
+    async def job() -> None:
+        nonlocal admitted_peak
+        admitted_peak = max(admitted_peak, scheduler.active + scheduler.pending)
+        await asyncio.sleep(0.005)
+
+    async def main() -> None:
+        await asyncio.gather(*[scheduler.run("g", "https://ons/f", job) for _ in range(5)])
+
+    asyncio.run(main())
+
+    assert admitted_peak <= 2
+
+
+def test_scheduler_releases_slot_when_job_fails() -> None:
+    scheduler = DownloadScheduler(max_concurrency=1, per_host_limit=1, max_pending=4)
+
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    async def ok() -> str:
+        return "ok"
+
+    async def main() -> List[object]:
+        return await asyncio.gather(  # type: ignore[return-value]
+            scheduler.run("g", "https://ons/a", boom),
+            scheduler.run("g", "https://ons/b", ok),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == "ok"
+    assert scheduler.active == 0
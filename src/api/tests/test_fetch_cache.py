@@ -0,0 +1,54 @@
+import json
+from typing import Any
+
+from services.fetch_cache import FetchCache, FetchCacheEntry
+
+
+def test_fetch_cache_builds_conditional_headers() -> None:
+    cache = FetchCache(path=None)
+    assert cache.conditional_headers("http://u/a.csv", "b") == {}
+
+    cache.record(
+        FetchCacheEntry(url="http://u/a.csv", bucket="b", etag='"abc"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    )
+
+    assert cache.conditional_headers("http://u/a.csv", "b") == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.conditional_headers("http://u/a.csv", "other") == {}
+
+
+def test_fetch_cache_detects_unchanged_content_hash() -> None:
+    cache = FetchCache(path=None)
+    cache.record(FetchCacheEntry(url="http://u/a.csv", bucket="b", size=3, content_hash="h1"))
+
+    assert cache.is_unchanged(FetchCacheEntry(url="http://u/a.csv", bucket="b", content_hash="h1")) is True
+    assert cache.is_unchanged(FetchCacheEntry(url="http://u/a.csv", bucket="b", content_hash="h2")) is False
+    assert cache.is_unchanged(FetchCacheEntry(url="http://u/b.csv", bucket="b", content_hash="h1")) is False
+    # Ingested into bucket b only: another bucket still needs it
+    assert cache.is_unchanged(FetchCacheEntry(url="http://u/a.csv", bucket="c", content_hash="h1")) is False
+
+
+def test_fetch_cache_persists_to_json_file(tmp_path: Any) -> None:
+    path = str(tmp_path / "cache" / "fetch.json")
+    cache = FetchCache(path=path)
+    cache.record(FetchCacheEntry(url="http://u/a.csv", bucket="b", etag='"e"', content_hash="h"))
+    cache.record(FetchCacheEntry(url="http://u/a.csv", bucket="c", etag='"f"'))
+
+    reloaded = FetchCache(path=path)
+
+    assert reloaded.get("http://u/a.csv", "c") is not None
+    entry = reloaded.get("http://u/a.csv", "b")
+    assert entry is not None
+    assert entry.etag == '"e"'
+    assert entry.content_hash == "h"
+
+
+def test_fetch_cache_ignores_entries_without_a_bucket(tmp_path: Any) -> None:
+    path = tmp_path / "fetch.json"
+    path.write_text(json.dumps({"http://u/a.csv": {"url": "http://u/a.csv", "content_hash": "h"}}))
+
+    cache = FetchCache(path=str(path))
+
+    assert cache.get("http://u/a.csv", "b") is None
@@ -133,4 +133,44 @@ def test_gcs_repository_file_credentials(monkeypatch: Any, tmp_path: Any) -> Non
 
     repo = g.GCSFileRepository()
     url = repo.save(io.BytesIO(b"x"), "b.bin", _bucket_name="test-bucket")
-    assert url.startswith("gs://test-bucket/")
\ No newline at end of file
+    assert url.startswith("gs://test-bucket/")
+
+def test_gcs_repository_save_stream_uses_chunked_upload(monkeypatch: Any) -> None:
+    uploads: list[dict[str, Any]] = []
+
+    class FakeClient:
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+        def bucket(self, name: str) -> Any:
+            class B:
+                def exists(self) -> bool:
+                    return True
+                def blob(self, filename: str, chunk_size: int | None = None) -> Any:
+                    class BL:
+                        public_url = f"gs://{name}/{filename}"
+                        def upload_from_file(self, file: Any, **kwargs: Any) -> None:
+                            uploads.append({"chunk_size": chunk_size, "data": file.read(), **kwargs})
+                    return BL()
+            return B()
+
+    import repositories.gcs_repository as g
+    monkeypatch.setenv("GCS_BUCKET_NAME", "test-bucket")
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "pid")
+    monkeypatch.delenv("GOOGLE_CREDENTIALS_JSON", raising=False)
+    monkeypatch.delenv("GOOGLE_APPLICATION_CREDENTIALS", raising=False)
+    monkeypatch.setattr(g, "storage", type("S", (), {"Client": FakeClient}))
+
+    import google.auth # type: ignore[import-untyped]
+    def fake_default(*args: Any, **kwargs: Any) -> Any:
+        return object(), "test-project"
+    monkeypatch.setattr(google.auth, "default", fake_default)
+
+    repo = g.GCSFileRepository()
+    uploaded = g.GCS_UPLOADED_BYTES.value(bucket="test-bucket", mode="stream")
+    url = repo.save_stream(io.BytesIO(b"xyz"), "c.parquet", _bucket_name=None)
+
+    assert url == "gs://test-bucket/c.parquet"
+    assert uploads[0]["chunk_size"] == g.UPLOAD_CHUNK_SIZE
+    assert uploads[0]["rewind"] is True
+    assert uploads[0]["data"] == b"xyz"
+    assert g.GCS_UPLOADED_BYTES.value(bucket="test-bucket", mode="stream") == uploaded + 3
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, List
+
+import httpx
+import pytest
+
+from utils.http_client import RetryTransport, create_http_client
+
+
+def _client(statuses: List[int], calls: List[str], retries: int = 3) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        return httpx.Response(statuses[min(len(calls), len(statuses)) - 1])
+
+    transport = RetryTransport(httpx.MockTransport(handler), retries=retries, backoff_factor=0)
+    return httpx.AsyncClient(transport=transport)
+
+
+def test_retry_transport_retries_transient_statuses() -> None:
+    calls: List[str] = []
+
+    async def main() -> int:
+        async with _client([503, 502, 200], calls) as client:
+            return (await client.get("https://ons/x")).status_code
+
+    assert asyncio.run(main()) == 200
+    assert len(calls) == 3
+
+
+def test_retry_transport_gives_up_after_max_retries() -> None:
+    calls: List[str] = []
+
+    async def main() -> int:
+        async with _client([503], calls, retries=2) as client:
+            return (await client.get("https://ons/x")).status_code
+
+    assert asyncio.run(main()) == 503
+    assert len(calls) == 3
+
+
+def test_retry_transport_does_not_retry_non_idempotent_methods() -> None:
+    calls: List[str] = []
+
+    async def main() -> int:
+        async with _client([503, 200], calls) as client:
+            return (await client.post("https://ons/x")).status_code
+
+    assert asyncio.run(main()) == 503
+    assert calls == ["POST"]
+
+
+def test_retry_transport_retries_connection_errors() -> None:
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 2:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    async def main() -> int:
+        transport = RetryTransport(httpx.MockTransport(handler), retries=3, backoff_factor=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return (await client.get("https://ons/x")).status_code
+
+    assert asyncio.run(main()) == 200
+    assert attempts == 2
+
+
+def test_create_http_client_falls_back_without_h2(monkeypatch: pytest.MonkeyPatch) -> None:
+    import utils.http_client as mod
+
+    monkeypatch.setenv("ONS_HTTP2", "true")
+    monkeypatch.setattr(mod.importlib.util, "find_spec", lambda name: None)
+    created: dict[str, Any] = {}
+    real_transport = httpx.AsyncHTTPTransport
+
+    def fake_transport(**kwargs: Any) -> httpx.AsyncHTTPTransport:
+        created.update(kwargs)
+        return real_transport()
+
+    monkeypatch.setattr(mod.httpx, "AsyncHTTPTransport", fake_transport)
+
+    client = create_http_client()
+
+    assert created["http2"] is False
+    assert isinstance(client._transport, RetryTransport)
+    asyncio.run(client.aclose())
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.ingestion_executor import IngestionExecutor
+from services.ons_service import OnsService, TransformStageError, TransformedContent
+
+
+CSV = "nom_reservatorio;ena_data;val\nFURNAS;2023-01-02;1\nSOBRADINHO;2023-01-01;2\n".encode("latin1")
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_thread_executor_runs_off_the_event_loop() -> None:
+    executor = IngestionExecutor(kind="thread", max_workers=2)
+    try:
+        name = asyncio.run(executor.run(_thread_name))
+    finally:
+        executor.shutdown()
+
+    assert name.startswith("ingestion")
+
+
+def test_inline_executor_runs_on_the_caller() -> None:
+    executor = IngestionExecutor(kind="inline")
+
+    name = asyncio.run(executor.run(_thread_name))
+
+    assert name == threading.current_thread().name
+
+
+def test_process_executor_runs_transform_stage() -> None:
+    executor = IngestionExecutor(kind="process", max_workers=1)
+    try:
+        out = asyncio.run(executor.run(OnsService._transform_content, CSV, "csv"))
+    finally:
+        executor.shutdown()
+
+    assert isinstance(out, TransformedContent)
+    assert out.rows == 2
+    assert out.date_column == "ena_data"
+    assert out.last_value == "2023-01-02"
+    assert out.parquet.startswith(b"PAR1")
+
+
+def test_transform_stage_reports_failing_stage() -> None:
+    with pytest.raises(TransformStageError) as exc_info:
+        OnsService._transform_content(b"data", "unsupported_format")
+
+    assert exc_info.value.stage == "read"
+
+
+def test_unknown_executor_kind_raises() -> None:
+    with pytest.raises(ValueError):
+        IngestionExecutor(kind="gpu")
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+import pytest
+from benchmarks.bigquery_stand_in import FIRST_DAY, SQLiteBigQueryRepository, to_sqlite
+from benchmarks.load_test import (
+    LoadReport,
+    StandInSettings,
+    create_app,
+    create_stand_in_service,
+    format_report,
+    parse_metrics,
+    percentile,
+    request_mix,
+    run_load,
+    summarize_pools,
+)
+from google.api_core.exceptions import BadRequest  # type: ignore[import-untyped]
+from repositories.async_bigquery_repository import AsyncBigQueryRepository
+from services.bigquery_service import ReservoirService
+
+
+@pytest.fixture(scope="module")
+def repository() -> Iterator[SQLiteBigQueryRepository]:
+    repository = SQLiteBigQueryRepository(days=60, latency_seconds=0.01)
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def service(repository: SQLiteBigQueryRepository) -> Iterator[ReservoirService]:
+    service = ReservoirService(repository=AsyncBigQueryRepository(repository, poll_initial=0.005))
+    yield service
+    service.close()
+
+
+def test_datetime_trunc_is_rewritten_for_sqlite() -> None:
+    query = "SELECT DATETIME_TRUNC(ena_data, MONTH) AS periodo FROM `t` GROUP BY periodo"
+    assert to_sqlite(query) == (
+        "SELECT strftime('%Y-%m-01 00:00:00', ena_data) AS periodo FROM `t` GROUP BY periodo"
+    )
+
+
+def test_stand_in_serves_offset_and_keyset_pages(service: ReservoirService) -> None:
+    first = asyncio.run(service.get_reservoir_data(date(2015, 1, 1), date(2015, 1, 10), 1, 50))
+    assert first.total_records == 10 * 160
+    assert isinstance(first.data[0]["ena_data"], datetime)
+    assert isinstance(first.data[0]["dat_entrada"], date)
+    assert first.next_cursor is not None
+
+    second = asyncio.run(
+        service.get_reservoir_data(
+            date(2015, 1, 1), date(2015, 1, 10), 1, 50, cursor=first.next_cursor, bacia="GRANDE"
+        )
+    )
+    assert second.total_records == 10 * 20
+    assert {row["nom_bacia"] for row in second.data} == {"GRANDE"}
+    assert (second.data[0]["ena_data"], second.data[0]["nom_reservatorio"]) > (
+        first.data[-1]["ena_data"], first.data[-1]["nom_reservatorio"]
+    )
+
+
+def test_stand_in_aggregates_by_iso_week(service: ReservoirService) -> None:
+    response = asyncio.run(
+        service.get_reservoir_aggregate(date(2015, 1, 1), date(2015, 1, 31), "week", functions=["count"])
+    )
+    # 2015-01-01 is a Thursday: its ISO week starts on Monday 2014-12-29
+    assert response.data[0]["periodo"] == datetime(2014, 12, 29)
+    assert sum(row["count_ena_armazenavel_res_mwmed"] for row in response.data) == 31 * 160
+
+
+def test_stand_in_reports_invalid_sql_as_job_error(repository: SQLiteBigQueryRepository) -> None:
+    job = repository.submit_query("SELECT missing FROM `nowhere`")
+    with pytest.raises(BadRequest):
+        job.result()
+    assert job.done()
+    assert job.error_result is not None
+
+
+def test_stand_in_schema_matches_gold_table(repository: SQLiteBigQueryRepository) -> None:
+    schema = repository.get_table_schema("gold.dados_reservatorios_completo")
+    assert list(schema)[:5] == ["nom_reservatorio", "tip_reservatorio", "nom_bacia", "nom_subsistema", "ena_data"]
+    assert schema["ena_armazenavel_res_mwmed"] == "FLOAT"
+    assert repository.rows == 60 * 160
+
+
+def test_stand_in_reuses_an_existing_database(tmp_path: Path) -> None:
+    path = str(tmp_path / "gold.sqlite")
+    built = SQLiteBigQueryRepository(path=path, days=2)
+    reused = SQLiteBigQueryRepository(path=path, days=100)
+
+    assert built.rows == 2 * 160
+    assert reused.rows is None
+    table = f"{reused.project_id}.gold.dados_reservatorios_completo"
+    job = reused.submit_query(f"SELECT COUNT(*) AS total FROM `{table}`")
+    assert reused.fetch_rows(job) == [{"total": 2 * 160}]
+    reused.close()
+    assert Path(path).exists()
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_pool_saturation_from_metrics_samples() -> None:
+    def sample(depth: int, active: int) -> str:
+        return (
+            "# TYPE executor_queue_depth gauge\n"
+            f'executor_queue_depth{{executor="bigquery"}} {depth}\n'
+            f'executor_active_tasks{{executor="bigquery"}} {active}\n'
+            'executor_max_workers{executor="bigquery"} 4\n'
+            'http_requests_in_flight{method="GET"} 3\n'
+        )
+
+    pools = summarize_pools([parse_metrics(sample(0, 2)), parse_metrics(sample(6, 4))])
+
+    assert len(pools) == 1
+    assert pools[0].executor == "bigquery"
+    assert pools[0].max_queue_depth == 6
+    assert pools[0].max_active_tasks == 4
+    assert pools[0].mean_queue_depth == 3.0
+    assert pools[0].saturated_ratio == 0.5
+
+
+def test_request_mix_stays_inside_the_data() -> None:
+    mix = request_mix(200, FIRST_DAY, 60, seed=1)
+    assert mix == request_mix(200, FIRST_DAY, 60, seed=1)
+    for params in mix:
+        assert FIRST_DAY.isoformat() <= params["start_date"] <= params["end_date"] <= "2015-03-01"
+
+
+def test_run_load_reports_latency_throughput_and_pools(tmp_path: Path) -> None:
+    settings = StandInSettings(
+        database_path=str(tmp_path / "gold.sqlite"), days=30, latency_seconds=0.01, rpc_latency_seconds=0.0
+    )
+    service = create_stand_in_service(settings)
+    app = create_app(service)
+
+    async def scenario() -> LoadReport:
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        # ASGITransport skips the lifespan, which the served app runs under uvicorn
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                mix = request_mix(20, FIRST_DAY, 30)
+                return await run_load(client, mix, rps=50, duration=0.6, warmup=0.2, sample_interval=0.1)
+
+    try:
+        report = asyncio.run(scenario())
+    finally:
+        service.close()
+
+    assert report.sent == 30
+    assert report.completed == 30
+    assert report.statuses == {"200": 30}
+    assert report.achieved_rps > 0
+    assert 0 < report.latency.p50_ms <= report.latency.p95_ms <= report.latency.p99_ms <= report.latency.max_ms
+    assert {"bigquery", "to_thread"} <= {pool.executor for pool in report.pools}
+    assert "p95" in format_report(report)
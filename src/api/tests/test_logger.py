@@ -1,16 +1,113 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import pytest
 from _pytest.capture import CaptureFixture
+from utils import logger
 from utils.logger import log, LogLevel
 
 
+@pytest.fixture(autouse=True)
+def debug_json_logging() -> Iterator[None]:
+    min_severity, text = logger._config.min_severity, logger._config.text
+    logger.set_level(LogLevel.DEBUG)
+    logger.set_format("json")
+    yield
+    logger.flush()
+    logger._config.min_severity, logger._config.text = min_severity, text
+
+
 def test_log_levels_do_not_crash(capsys: CaptureFixture[str]) -> None:
     log("info message", level=LogLevel.INFO)
     log("error message", level=LogLevel.ERROR)
     log("debug message", level=LogLevel.DEBUG)
     # default level
     log("default message")
+    logger.flush()
 
     out = capsys.readouterr().out
     assert "info message" in out
     assert "error message" in out
     assert "debug message" in out
     assert "default message" in out
+
+
+def test_log_writes_one_json_object_per_line_with_caller(capsys: CaptureFixture[str]) -> None:
+    log("structured", level=LogLevel.INFO)
+    logger.flush()
+
+    record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert record["message"] == "structured"
+    assert record["severity"] == "INFO"
+    assert record["file"] == "test_logger.py"
+    assert record["line"] > 0
+
+
+def test_levels_below_threshold_are_dropped(capsys: CaptureFixture[str]) -> None:
+    logger.set_level(LogLevel.INFO)
+    log("hidden debug", level=LogLevel.DEBUG)
+    log("visible error", level=LogLevel.ERROR)
+    logger.flush()
+
+    out = capsys.readouterr().out
+    assert "hidden debug" not in out
+    assert "visible error" in out
+    assert not logger.is_enabled(LogLevel.DEBUG)
+
+
+def test_text_format_keeps_colored_output(capsys: CaptureFixture[str]) -> None:
+    logger.set_format("text")
+    log("colored", level=LogLevel.ERROR)
+    logger.flush()
+
+    out = capsys.readouterr().out
+    assert "[\033[91mERROR\033[0m] colored" in out
+    assert "test_logger.py:" in out
+
+
+@pytest.mark.parametrize(
+    "value, level",
+    [
+        ("warning", LogLevel.WARNING),
+        ("WARN", LogLevel.WARNING),
+        ("critical", LogLevel.ERROR),
+        (" debug ", LogLevel.DEBUG),
+    ],
+)
+def test_log_level_env_accepts_common_spellings(
+    monkeypatch: pytest.MonkeyPatch, value: str, level: LogLevel
+) -> None:
+    monkeypatch.setenv("LOG_LEVEL", value)
+    config = logger._LoggerConfig()
+    assert config.min_severity == logger._SEVERITY[level]
+    assert config.invalid_level is None
+
+
+def test_unknown_log_level_env_falls_back_to_info(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_LEVEL", "verbose")
+    config = logger._LoggerConfig()
+    assert config.min_severity == logger._SEVERITY[LogLevel.INFO]
+    assert config.invalid_level == "verbose"
+
+
+def _log_from_worker(message: str) -> int:
+    log(message, level=LogLevel.INFO)
+    return os.getpid()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_process_pool_workers_write_their_log_lines(capfd: CaptureFixture[str]) -> None:
+    # Start the writer thread in the parent, so the worker inherits a stale one
+    log("parent line", level=LogLevel.INFO)
+    logger.flush()
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        worker_pid = pool.submit(_log_from_worker, "worker line").result(timeout=10)
+
+    out = capfd.readouterr().out
+    assert worker_pid != os.getpid()
+    assert "parent line" in out
+    assert "worker line" in out
@@ -50,3 +50,39 @@ def test_openapi_and_docs(client: TestClient) -> None:
 
     response = client.get("/docs")
     assert response.status_code == 200
+
+
+def test_lifespan_injects_shared_http_client(client: TestClient) -> None:
+    import main
+
+    assert main.ons_service.http_client is not None
+    assert not main.ons_service.http_client.is_closed
+
+
+def test_metrics_endpoint_serves_prometheus_text(client: TestClient) -> None:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE ons_ingestion_stage_duration_seconds histogram" in response.text
+
+
+def test_lifespan_shuts_down_the_to_thread_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    import application
+    import main
+
+    pools: list[ThreadPoolExecutor] = []
+
+    class RecordingPool(ThreadPoolExecutor):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(application, "ThreadPoolExecutor", RecordingPool)
+    with TestClient(main.app):
+        pass
+
+    assert len(pools) == 1
+    with pytest.raises(RuntimeError):
+        pools[0].submit(print)
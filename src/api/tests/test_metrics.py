@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from utils.metrics import MetricsRegistry
+from utils.stage_timer import StageRecorder, StageTiming, summarize_stages
+
+
+def test_counter_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run", labels=("kind",))
+    counter.inc(kind="a")
+    counter.inc(2.5, kind='b"x')
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 1\n' in text
+    assert 'jobs_total{kind="b\\"x"} 2.5\n' in text
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_registry_returns_existing_metric_and_rejects_other_shapes() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("x_total", "X", labels=("a",))
+
+    assert registry.counter("x_total", "X", labels=("a",)) is counter
+    with pytest.raises(ValueError):
+        registry.histogram("x_total", "X", labels=("a",))
+    with pytest.raises(ValueError):
+        counter.inc(other="1")
+
+
+def test_stage_recorder_times_blocks_and_summarizes() -> None:
+    recorder = StageRecorder()
+    with recorder.stage("read") as timing:
+        timing.rows = 3
+    with pytest.raises(RuntimeError):
+        with recorder.stage("upload"):
+            raise RuntimeError("boom")
+    recorder.extend([StageTiming(stage="read", duration_seconds=1.0, rows=2, bytes_in=10)])
+
+    assert [timing.stage for timing in recorder.stages] == ["read", "upload", "read"]
+    totals = {timing.stage: timing for timing in summarize_stages(recorder.stages)}
+    assert totals["read"].rows == 5
+    assert totals["read"].bytes_in == 10
+    assert totals["read"].duration_seconds >= 1.0
+    assert totals["upload"].rows is None
+
+
+def test_gauge_reads_callbacks_at_scrape_time() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.metrics import EXECUTOR_MAX_WORKERS, EXECUTOR_QUEUE_DEPTH, track_executor
+
+    registry = MetricsRegistry()
+    gauge = registry.gauge("depth", "Depth", labels=("pool",))
+    depth = [3]
+    gauge.set_function(lambda: depth[0], pool="a")
+    gauge.set(1, pool="b")
+    gauge.dec(pool="b")
+    depth[0] = 5
+
+    assert 'depth{pool="a"} 5' in registry.render()
+    assert gauge.value(pool="b") == 0
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        track_executor("test-pool", executor, 2)
+        assert EXECUTOR_QUEUE_DEPTH.value(executor="test-pool") == 0
+        assert EXECUTOR_MAX_WORKERS.value(executor="test-pool") == 2
+
+
+def test_track_executor_counts_queued_and_running_tasks() -> None:
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.metrics import EXECUTOR_ACTIVE_TASKS, EXECUTOR_QUEUE_DEPTH, track_executor
+
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        track_executor("counted-pool", executor, 1)
+        running = executor.submit(release.wait)
+        queued = executor.submit(lambda: 42)
+        cancelled = executor.submit(lambda: 0)
+        while EXECUTOR_ACTIVE_TASKS.value(executor="counted-pool") == 0:
+            time.sleep(0.001)
+
+        assert EXECUTOR_QUEUE_DEPTH.value(executor="counted-pool") == 2
+        assert cancelled.cancel()
+        assert EXECUTOR_QUEUE_DEPTH.value(executor="counted-pool") == 1
+
+        release.set()
+        assert running.result() is True
+        assert queued.result() == 42
+
+    assert EXECUTOR_QUEUE_DEPTH.value(executor="counted-pool") == 0
+    assert EXECUTOR_ACTIVE_TASKS.value(executor="counted-pool") == 0
+
+
+def test_request_middleware_labels_route_template_and_status() -> None:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from utils.request_metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, RequestMetricsMiddleware
+
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    assert REQUEST_DURATION.count(method="GET", route="/items/{item_id}", status="200") == 2
+    assert REQUEST_DURATION.count(method="GET", route="unmatched", status="404") == 1
+    assert REQUESTS_IN_FLIGHT.value(method="GET") == 0
@@ -3,6 +3,7 @@
 import os
 import asyncio
 import httpx
+from datetime import datetime
 from typing import Any
 import pytest
 from services.ons_service import OnsService, DownloadInfo, DownloadResult, ProcessResponse
@@ -53,6 +54,8 @@ def test_process_reservoir_data_success_filters_and_downloads(monkeypatch: Any)
         )
 
     monkeypatch.setattr(service, "_download_parquet", fake_download_parquet)
+    notified: list[str] = []
+    service.ingestion_listeners.append(notified.append)
 
     # CORREÇÃO: Adicionado o argumento 'bucket'
     filters = DateFilterDTO(start_year=2022, end_year=2023, package="ear-diario-por-reservatorio", bucket="test-bucket")
@@ -64,6 +67,7 @@ def test_process_reservoir_data_success_filters_and_downloads(monkeypatch: Any)
     urls = [r["url"] for r in result.success_downloads]
     assert "https://cdn/ear_2022.parquet" in urls
     assert "https://cdn/ear_2023.parquet" in urls
+    assert notified == ["ear-diario-por-reservatorio"]
 
 
 def test_process_reservoir_data_partial_success(monkeypatch: Any) -> None:
@@ -203,9 +207,16 @@ def test_process_reservoir_data_missing_env_var(monkeypatch: Any) -> None:
 # ===================================================================
 
 def test_download_parquet_success(monkeypatch: Any) -> None:
+    import io
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    saved: dict[str, bytes] = {}
+
     class FakeRepo:
         def __init__(self) -> None: self.bucket_name = "b"
-        def save(self, file: Any, filename: str) -> str: return f"gs://b/{filename}"
+        def save(self, file: Any, filename: str, **kwargs: Any) -> str:
+            saved[filename] = file.read()
+            return f"gs://b/{filename}"
         def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool: return False
 
     import services.ons_service as mod
@@ -214,6 +225,8 @@ def test_download_parquet_success(monkeypatch: Any) -> None:
     s = OnsService()
     class R:
         content = b"data"
+        status_code = 200
+        headers: dict[str, str] = {}
         def raise_for_status(self) -> None: return
 
     async def fake_get(url: str, *args: Any, **kwargs: Any) -> R:
@@ -222,15 +235,18 @@ def test_download_parquet_success(monkeypatch: Any) -> None:
     monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
     monkeypatch.setattr(
         OnsService,
-        "_read_to_dataframe",
-        lambda *a, **k: __import__("pandas").DataFrame({"date_column": ["2023-01-01", "2023-01-02"]}),
+        "_read_to_table",
+        lambda *a, **k: __import__("pyarrow").table({"date_column": ["2023-01-01", "2023-01-02"], "val": [1.5, None]}),
     )
     info = DownloadInfo(url="http://u/f.parquet", year=2023, package="p", data_type="parquet")
     out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
     
     assert isinstance(out, DownloadResult)
-    assert out.success is False
-    assert out.gcs_path == ""
+    assert out.success is True
+    assert out.gcs_path.endswith("/f.parquet")
+    # Default (arrow) engine: numbers as raw text, nulls stay null
+    table = pq.read_table(io.BytesIO(saved[out.gcs_path]))
+    assert table.column("val").to_pylist() == ["1.5", None]
 
 
 def test_download_parquet_data_already_exists(monkeypatch: Any) -> None:
@@ -245,6 +261,8 @@ def test_download_parquet_data_already_exists(monkeypatch: Any) -> None:
 
     class R:
         content = b"data"
+        status_code = 200
+        headers: dict[str, str] = {}
         def raise_for_status(self) -> None: return
 
     async def fake_get(url: str, *args: Any, **kwargs: Any) -> R:
@@ -253,8 +271,8 @@ def test_download_parquet_data_already_exists(monkeypatch: Any) -> None:
     monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
     monkeypatch.setattr(
         OnsService,
-        "_read_to_dataframe",
-        lambda *a, **k: __import__("pandas").DataFrame({"date_column": ["2023-01-01", "2023-01-02"]}),
+        "_read_to_table",
+        lambda *a, **k: __import__("pyarrow").table({"date_column": ["2023-01-01", "2023-01-02"]}),
     )
     info = DownloadInfo(url="http://u/f.parquet", year=2023, package="p", data_type="parquet")
     out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
@@ -276,6 +294,8 @@ def test_download_parquet_save_to_gcs_fails(monkeypatch: Any) -> None:
 
     class R:
         content = b"data"
+        status_code = 200
+        headers: dict[str, str] = {}
         def raise_for_status(self) -> None: return
 
     async def fake_get(url: str, *args: Any, **kwargs: Any) -> R:
@@ -284,8 +304,8 @@ def test_download_parquet_save_to_gcs_fails(monkeypatch: Any) -> None:
     monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
     monkeypatch.setattr(
         OnsService,
-        "_read_to_dataframe",
-        lambda *a, **k: __import__("pandas").DataFrame({"date_column": ["2023-01-01"]}),
+        "_read_to_table",
+        lambda *a, **k: __import__("pyarrow").table({"date_column": ["2023-01-01"]}),
     )
     info = DownloadInfo(url="http://u/f.parquet", year=2023, package="p", data_type="parquet")
     out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
@@ -306,6 +326,8 @@ def test_download_parquet_handles_read_error(monkeypatch: Any) -> None:
 
     class R:
         content = b"data"
+        status_code = 200
+        headers: dict[str, str] = {}
         def raise_for_status(self) -> None: return
 
     async def fake_get(url: str, *args: Any, **kwargs: Any) -> R:
@@ -314,7 +336,7 @@ def test_download_parquet_handles_read_error(monkeypatch: Any) -> None:
     monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
     monkeypatch.setattr(
         OnsService,
-        "_read_to_dataframe",
+        "_read_to_table",
         lambda *a, **k: (_ for _ in ()).throw(ValueError("bad format")),
     )
     info = DownloadInfo(url="http://u/f.parquet", year=2023, package="p", data_type="parquet")
@@ -337,8 +359,9 @@ def test_build_gcs_path_for_past_year(monkeypatch: Any) -> None:
     monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
     s = OnsService()
     
-    path = s._build_gcs_path("file_2020.parquet", resource_year=2020, package_name="pkg")
-    assert path == "pkg/2020/file_2020.parquet"
+    path = s._build_gcs_path("file_2020.csv", resource_year=2020, package_name="pkg")
+    today = datetime.now().date().isoformat()
+    assert path == f"package=pkg/year=2020/ingest_date={today}/file_2020.parquet"
 
 
 def test_build_gcs_path_for_future_year(monkeypatch: Any) -> None:
@@ -350,7 +373,24 @@ def test_build_gcs_path_for_future_year(monkeypatch: Any) -> None:
     s = OnsService()
     
     path = s._build_gcs_path("file_9999.parquet", resource_year=9999, package_name="pkg")
-    assert path.startswith("pkg/") and path.endswith(".parquet")
+    assert path.startswith("package=pkg/year=9999/ingest_date=") and path.endswith("/file_9999.parquet")
+
+
+def test_successful_run_registers_bronze_table_for_default_bucket(monkeypatch: Any) -> None:
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "raw"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+    registered: list[tuple[str, str]] = []
+    monkeypatch.setattr(s.bronze_loader, "ensure_table", lambda package, bucket: registered.append((package, bucket)))
+
+    asyncio.run(s._register_bronze_table("pkg", None))
+    asyncio.run(s._register_bronze_table("pkg", "raw"))
+    asyncio.run(s._register_bronze_table("pkg", "other-bucket"))
+
+    assert registered == [("pkg", "raw"), ("pkg", "raw")]
 
 
 def test_read_to_dataframe_unsupported_format_raises_error(monkeypatch: Any) -> None:
@@ -362,4 +402,457 @@ def test_read_to_dataframe_unsupported_format_raises_error(monkeypatch: Any) ->
     s = OnsService()
 
     with pytest.raises(ValueError):
-        s._read_to_dataframe(b"some_data", "unsupported_format")
\ No newline at end of file
+        s._read_to_dataframe(b"some_data", "unsupported_format")
+
+# ===================================================================
+# region: Tests for the streaming ingestion mode
+# ===================================================================
+
+class _StreamResponse:
+    status_code = 200
+    headers: dict[str, str] = {}
+    def __init__(self, body: bytes) -> None: self._body = body
+    async def __aenter__(self) -> "_StreamResponse": return self
+    async def __aexit__(self, *exc: Any) -> None: return None
+    def raise_for_status(self) -> None: return
+    async def aiter_bytes(self, chunk_size: int) -> Any:
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+def test_download_parquet_streaming_converts_and_uploads(monkeypatch: Any) -> None:
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+    saved: dict[str, Any] = {}
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool:
+            saved["checked"] = (column_name, last_day)
+            return False
+        def save_stream(self, file: Any, filename: str, _bucket_name: str | None) -> str:
+            saved["table"] = pq.read_table(file)
+            return f"gs://b/{filename}"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    monkeypatch.setattr(mod, "STREAM_CHUNK_SIZE", 8)
+    s = OnsService()
+
+    body = "nom_reservatorio;ena_data;val\nFURNAS;2023-01-02;1,5\nSOBRADINHO;2023-01-01;\n".encode("latin1")
+
+    def fake_stream(self: Any, method: str, url: str, **kwargs: Any) -> _StreamResponse:
+        return _StreamResponse(body)
+
+    monkeypatch.setattr(httpx.AsyncClient, "stream", fake_stream, raising=True)
+
+    info = DownloadInfo(url="http://u/f_2023.csv", year=2023, package="p", data_type="csv", streaming=True)
+    out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+
+    assert out.success is True
+    assert out.gcs_path == f"package=p/year=2023/ingest_date={datetime.now().date().isoformat()}/f_2023.parquet"
+    assert saved["checked"] == ("ena_data", "2023-01-02")
+    table = saved["table"]
+    assert table.num_rows == 2
+    assert all(str(field.type) == "string" for field in table.schema)
+    assert table.column("val").to_pylist() == ["1,5", None]
+    assert [timing.stage for timing in out.stages] == ["fetch", "transform", "exists_check", "upload"]
+    assert out.stages[0].bytes_in == len(body)
+    assert out.stages[1].rows == 2
+
+
+def test_download_parquet_records_stage_timings(monkeypatch: Any) -> None:
+    from utils.stage_timer import STAGE_DURATION, STAGE_ROWS
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool: return False
+        def save(self, file: Any, filename: str, _bucket_name: str | None) -> str: return f"gs://b/{filename}"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+    body = b"nom_reservatorio;ena_data\nFURNAS;2023-01-02\nSOBRADINHO;2023-01-01\n"
+
+    class R:
+        content = body
+        status_code = 200
+        headers: dict[str, str] = {}
+        def raise_for_status(self) -> None: return
+
+    async def fake_get(self: Any, url: str, *args: Any, **kwargs: Any) -> R:
+        return R()
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+    info = DownloadInfo(url="http://u/f_2023.csv", year=2023, package="stages", data_type="csv")
+    out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+
+    assert out.success is True
+    stages = {timing.stage: timing for timing in out.stages}
+    assert list(stages) == ["fetch", "read", "convert", "encode", "exists_check", "upload"]
+    assert stages["fetch"].bytes_in == len(body)
+    assert stages["read"].rows == 2
+    assert stages["encode"].bytes_out == stages["upload"].bytes_out
+    assert all(timing.duration_seconds >= 0 for timing in out.stages)
+    assert STAGE_DURATION.count(package="stages", stage="upload") == 1
+    assert STAGE_ROWS.value(package="stages", stage="read") == 2
+
+
+def test_download_parquet_streaming_data_already_exists(monkeypatch: Any) -> None:
+    import io
+    import pandas as pd  # type: ignore[import-untyped]
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool: return True
+        def save_stream(self, file: Any, filename: str, _bucket_name: str | None) -> str:
+            raise AssertionError("should not upload")
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+
+    source = io.BytesIO()
+    pd.DataFrame({"ear_data": ["2023-01-01", "2023-01-02"], "v": [1, 2]}).to_parquet(source, index=False)
+
+    def fake_stream(self: Any, method: str, url: str, **kwargs: Any) -> _StreamResponse:
+        return _StreamResponse(source.getvalue())
+
+    monkeypatch.setattr(httpx.AsyncClient, "stream", fake_stream, raising=True)
+
+    info = DownloadInfo(url="http://u/f.parquet", year=2023, package="p", data_type="parquet", streaming=True)
+    out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+
+    assert out.success is False
+    assert out.error_message == "Data already exists in the raw table"
+
+
+@pytest.mark.parametrize("data_type", ["csv", "parquet"])
+def test_download_parquet_streaming_rejects_files_without_rows(monkeypatch: Any, data_type: str) -> None:
+    import io
+    import pandas as pd  # type: ignore[import-untyped]
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool:
+            raise AssertionError("should not check")
+        def save(self, file: Any, filename: str, **kwargs: Any) -> str:
+            raise AssertionError("should not upload")
+        def save_stream(self, file: Any, filename: str, _bucket_name: str | None) -> str:
+            raise AssertionError("should not upload")
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+
+    if data_type == "csv":
+        body = "nom_reservatorio;ena_data;val\n".encode("latin1")
+    else:
+        source = io.BytesIO()
+        pd.DataFrame({"ena_data": pd.Series([], dtype="string"), "val": pd.Series([], dtype="float")}).to_parquet(source, index=False)
+        body = source.getvalue()
+
+    def fake_stream(self: Any, method: str, url: str, **kwargs: Any) -> _StreamResponse:
+        return _StreamResponse(body)
+
+    class R:
+        content = body
+        status_code = 200
+        headers: dict[str, str] = {}
+        def raise_for_status(self) -> None: return
+
+    async def fake_get(url: str, *args: Any, **kwargs: Any) -> R:
+        return R()
+
+    monkeypatch.setattr(httpx.AsyncClient, "stream", fake_stream, raising=True)
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+
+    url = f"http://u/f.{data_type}"
+    streamed = asyncio.run(s._download_parquet(
+        httpx.AsyncClient(), DownloadInfo(url=url, year=2023, package="p", data_type=data_type, streaming=True)
+    ))
+    buffered = asyncio.run(s._download_parquet(
+        httpx.AsyncClient(), DownloadInfo(url=url, year=2023, package="p", data_type=data_type)
+    ))
+
+    assert streamed.success is False
+    assert streamed.error_message == buffered.error_message == "Failed to check existing data: No rows found in the file"
+
+
+# ===================================================================
+# region: Tests for the Arrow-native conversion path
+# ===================================================================
+
+def test_transform_content_arrow_preserves_nulls() -> None:
+    import io
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    csv = "nom_reservatorio;ena_data;val\nFURNAS;2023-01-02;1,5\nSOBRADINHO;2023-01-01;\n".encode("latin1")
+
+    out = OnsService._transform_content(csv, "csv", "arrow")
+
+    table = pq.read_table(io.BytesIO(out.parquet))
+    assert out.rows == 2
+    assert out.date_column == "ena_data"
+    assert out.last_value == "2023-01-02"
+    assert all(str(field.type) == "string" for field in table.schema)
+    assert table.column("val").to_pylist() == ["1,5", None]
+
+
+def test_transform_content_arrow_formats_typed_parquet_columns() -> None:
+    import io
+    import pandas as pd  # type: ignore[import-untyped]
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    source = io.BytesIO()
+    pd.DataFrame({
+        "ear_data": pd.to_datetime(["2023-01-01", "2023-01-02"]),
+        "val": [1.5, None],
+        "cod": pd.Series(["a", "b"], dtype="category"),
+    }).to_parquet(source, index=False)
+
+    out = OnsService._transform_content(source.getvalue(), "parquet", "arrow")
+
+    table = pq.read_table(io.BytesIO(out.parquet))
+    assert table.column("ear_data").to_pylist() == ["2023-01-01", "2023-01-02"]
+    assert table.column("val").to_pylist() == ["1.5", None]
+    assert table.column("cod").to_pylist() == ["a", "b"]
+    assert out.last_value == "2023-01-02"
+
+
+def _timestamp_parquet(values: list[str], row_group_size: int | None = None) -> bytes:
+    import io
+    import pandas as pd  # type: ignore[import-untyped]
+
+    source = io.BytesIO()
+    pd.DataFrame({"ena_data": pd.to_datetime(values, format="ISO8601"), "val": range(len(values))}).to_parquet(
+        source, index=False, row_group_size=row_group_size
+    )
+    return source.getvalue()
+
+
+def test_streamed_timestamp_format_is_fixed_across_row_groups(monkeypatch: Any) -> None:
+    import io
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    monkeypatch.setattr(mod, "STREAM_BATCH_SIZE", 2)
+    s = OnsService()
+    # The first batch has a time of day, the later ones are midnight only
+    content = _timestamp_parquet(
+        ["2023-01-01 06:00", "2023-01-01 12:00", "2023-01-02", "2023-01-03", "2023-01-04"]
+    )
+
+    sink = io.BytesIO()
+    summary = s._transform_stream(io.BytesIO(content), "parquet", sink)
+
+    streamed = pq.ParquetFile(sink)
+    assert streamed.num_row_groups == 3
+    values = streamed.read().column("ena_data").to_pylist()
+    assert values[2:] == ["2023-01-02 00:00:00", "2023-01-03 00:00:00", "2023-01-04 00:00:00"]
+    assert summary.last_value == "2023-01-04 00:00:00"
+    buffered = pq.read_table(io.BytesIO(OnsService._transform_content(content, "parquet", "arrow").parquet))
+    assert buffered.column("ena_data").to_pylist() == values
+
+
+def test_streamed_times_of_day_after_midnight_only_row_groups_match_buffer_path(monkeypatch: Any) -> None:
+    import io
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    monkeypatch.setattr(mod, "STREAM_BATCH_SIZE", 2)
+    s = OnsService()
+    # The first row group is midnight only, a later one has a time of day
+    content = _timestamp_parquet(["2023-01-01", "2023-01-02", "2023-01-03 06:00"], row_group_size=2)
+    assert pq.ParquetFile(io.BytesIO(content)).num_row_groups == 2
+
+    sink = io.BytesIO()
+    s._transform_stream(io.BytesIO(content), "parquet", sink)
+
+    streamed = pq.read_table(sink).column("ena_data").to_pylist()
+    assert streamed == ["2023-01-01 00:00:00", "2023-01-02 00:00:00", "2023-01-03 06:00:00"]
+    buffered = pq.read_table(io.BytesIO(OnsService._transform_content(content, "parquet", "arrow").parquet))
+    assert buffered.column("ena_data").to_pylist() == streamed
+
+
+def test_unknown_conversion_engine_raises(monkeypatch: Any) -> None:
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+
+    with pytest.raises(ValueError):
+        OnsService(conversion_engine="polars")
+
+
+def test_process_reservoir_data_skips_years_already_ingested(monkeypatch: Any) -> None:
+    from datetime import date
+    os.environ["ONS_API_URL"] = "https://example.com/api"
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_watermarks(self, package_name: str) -> dict[int, date]:
+            return {2021: date(2021, 12, 31), 2022: date(2022, 5, 1)}
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+
+    resources = [
+        {"format": "PARQUET", "url": "http://u/2021.parquet", "name": "n 2021"},
+        {"format": "PARQUET", "url": "http://u/2022.parquet", "name": "n 2022"},
+    ]
+
+    class Resp:
+        def __init__(self, obj: dict[str, Any]): self._obj = obj
+        def raise_for_status(self) -> None: return
+        def json(self) -> dict[str, Any]: return self._obj
+
+    async def fake_get(self: Any, url: str, *a: Any, **k: Any) -> Resp:
+        return Resp({"result": {"resources": resources}})
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+
+    s = OnsService()
+    fetched: list[int] = []
+
+    async def fake_download(client: Any, info: DownloadInfo) -> DownloadResult:
+        fetched.append(info.year)
+        return DownloadResult(success=True, url=info.url, year=info.year, package=info.package, data_type=info.data_type, gcs_path="p", bucket="b")
+
+    monkeypatch.setattr(s, "_download_parquet", fake_download)
+
+    filters = DateFilterDTO(start_year=2021, end_year=2022, package="pkg", bucket="test-bucket")
+    result = asyncio.run(s.process_reservoir_data(filters))
+
+    assert fetched == [2022]
+    assert result.total_processed == 2
+    assert result.success_count == 1
+    assert result.failed_downloads[0]["year"] == 2021
+    assert result.failed_downloads[0]["error_message"] == "Data already exists in the raw table"
+
+
+# ===================================================================
+# region: Tests for conditional fetching
+# ===================================================================
+
+def test_download_parquet_skips_not_modified_resources(monkeypatch: Any) -> None:
+    from services.fetch_cache import FetchCacheEntry
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool:
+            raise AssertionError("should short-circuit before the BigQuery check")
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+    s.fetch_cache.record(FetchCacheEntry(url="http://u/f_2020.csv", bucket="b", etag='"v1"'))
+    sent_headers: dict[str, str] = {}
+
+    class R:
+        status_code = 304
+        headers = {"ETag": '"v1"'}
+        content = b""
+        def raise_for_status(self) -> None: raise AssertionError("304 is not an error here")
+
+    async def fake_get(self: Any, url: str, *args: Any, **kwargs: Any) -> R:
+        sent_headers.update(kwargs.get("headers", {}))
+        return R()
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+
+    info = DownloadInfo(url="http://u/f_2020.csv", year=2020, package="p", data_type="csv")
+    out = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+
+    assert sent_headers == {"If-None-Match": '"v1"'}
+    assert out.success is False
+    assert out.error_message == "Source not modified since last ingestion"
+    assert out.gcs_path == f"package=p/year=2020/ingest_date={datetime.now().date().isoformat()}/f_2020.parquet"
+
+
+def test_download_parquet_records_validators_and_skips_same_content(monkeypatch: Any) -> None:
+    uploads: list[str] = []
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool: return False
+        def save(self, file: Any, filename: str, _bucket_name: str | None) -> str:
+            uploads.append(filename)
+            return f"gs://b/{filename}"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+
+    class R:
+        status_code = 200
+        headers = {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        content = "ena_data;val\n2020-12-31;1\n".encode("latin1")
+        def raise_for_status(self) -> None: return
+
+    async def fake_get(self: Any, url: str, *args: Any, **kwargs: Any) -> R:
+        return R()
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+
+    info = DownloadInfo(url="http://u/f_2020.csv", year=2020, package="p", data_type="csv")
+    first = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+    second = asyncio.run(s._download_parquet(httpx.AsyncClient(), info))
+
+    assert first.success is True
+    assert second.error_message == "Source not modified since last ingestion"
+    assert uploads == [f"package=p/year=2020/ingest_date={datetime.now().date().isoformat()}/f_2020.parquet"]
+    entry = s.fetch_cache.get("http://u/f_2020.csv", "b")
+    assert entry is not None and entry.size == len(R.content)
+
+
+def test_download_parquet_fetch_cache_is_kept_per_bucket(monkeypatch: Any) -> None:
+    uploads: list[str | None] = []
+    existing = {"b": True}
+
+    class FakeRepo:
+        def __init__(self) -> None: self.bucket_name = "b"
+        def raw_table_has_value(self, package_name: str, column_name: str, last_day: str) -> bool:
+            return existing["b"]
+        def save(self, file: Any, filename: str, _bucket_name: str | None) -> str:
+            uploads.append(_bucket_name)
+            return f"gs://{_bucket_name}/{filename}"
+
+    import services.ons_service as mod
+    monkeypatch.setattr(mod, "GCSFileRepository", FakeRepo, raising=True)
+    s = OnsService()
+
+    class R:
+        status_code = 200
+        headers = {"ETag": '"v1"'}
+        content = "ena_data;val\n2020-12-31;1\n".encode("latin1")
+        def raise_for_status(self) -> None: return
+
+    async def fake_get(self: Any, url: str, *args: Any, **kwargs: Any) -> R:
+        return R()
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get, raising=True)
+
+    default = DownloadInfo(url="http://u/f_2020.csv", year=2020, package="p", data_type="csv")
+    already = asyncio.run(s._download_parquet(httpx.AsyncClient(), default))
+    # Found in the raw table: recorded, so the next run is skipped before parsing
+    assert already.error_message == "Data already exists in the raw table"
+    assert s.fetch_cache.get("http://u/f_2020.csv", "b") is not None
+    again = asyncio.run(s._download_parquet(httpx.AsyncClient(), default))
+    assert again.error_message == "Source not modified since last ingestion"
+
+    existing["b"] = False
+    other = DownloadInfo(url="http://u/f_2020.csv", year=2020, package="p", data_type="csv", bucket="other")
+    out = asyncio.run(s._download_parquet(httpx.AsyncClient(), other))
+
+    assert out.success is True
+    assert uploads == ["other"]
+    assert s.fetch_cache.get("http://u/f_2020.csv", "other") is not None
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.reservoir_query import ReservoirQueryBuilder
+
+
+def _params(parameters: list) -> dict:
+    return {p.name: p.value for p in parameters}
+
+
+def test_query_text_is_stable_across_values() -> None:
+    first, first_params = ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31)).build()
+    second, second_params = ReservoirQueryBuilder("p.gold.t", date(2020, 5, 1), date(2020, 6, 30)).build()
+
+    assert first == second
+    assert "2024" not in first
+    assert _params(first_params) == {"start_date": datetime(2024, 1, 1), "end_date": datetime(2024, 1, 31)}
+    assert _params(second_params)["start_date"] == datetime(2020, 5, 1)
+
+
+def test_optional_filters_are_bound_as_parameters() -> None:
+    builder = (
+        ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31))
+        .where_equals("nom_bacia", "GRANDE'; DROP TABLE x; --")
+        .where_equals("nom_subsistema", None)
+    )
+
+    query, parameters = builder.build()
+
+    assert "`nom_bacia` = @nom_bacia" in query
+    assert "nom_subsistema" not in query
+    assert "DROP" not in query
+    assert _params(parameters)["nom_bacia"] == "GRANDE'; DROP TABLE x; --"
+
+
+def test_select_keeps_order_columns_and_rejects_bad_identifiers() -> None:
+    builder = ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31))
+
+    query, _ = builder.select(["val_latitude", "ena_data"]).build(with_total=True)
+
+    assert query.startswith(
+        "SELECT `ena_data`, `nom_reservatorio`, `val_latitude`, COUNT(*) OVER() AS _total_records"
+    )
+    with pytest.raises(ValueError):
+        builder.select(["val_latitude FROM x --"])
+
+
+def test_count_query_ignores_cursor() -> None:
+    builder = ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31))
+    builder.where_equals("nom_reservatorio", "FURNAS").after_cursor(datetime(2024, 1, 2), "A")
+
+    query, parameters = builder.build()
+    count_query, count_parameters = builder.build_count()
+
+    assert "@cursor_data" in query
+    assert "@cursor_data" not in count_query
+    assert set(_params(count_parameters)) == {"start_date", "end_date", "nom_reservatorio"}
+
+
+def test_build_aggregate_groups_by_period_and_dimension() -> None:
+    builder = ReservoirQueryBuilder("p.gold.t", date(2015, 1, 1), date(2024, 12, 31))
+
+    query, parameters = builder.build_aggregate(
+        "month", "bacia", ["ena_armazenavel_res_mwmed"], ["avg", "max"]
+    )
+
+    assert "DATETIME_TRUNC(ena_data, MONTH) AS periodo" in query
+    assert "AVG(`ena_armazenavel_res_mwmed`) AS avg_ena_armazenavel_res_mwmed" in query
+    assert "MAX(`ena_armazenavel_res_mwmed`) AS max_ena_armazenavel_res_mwmed" in query
+    assert query.endswith("GROUP BY periodo, nom_bacia\nORDER BY periodo, nom_bacia")
+    assert set(_params(parameters)) == {"start_date", "end_date"}
+
+
+def test_build_aggregate_rejects_unknown_options() -> None:
+    builder = ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31))
+
+    with pytest.raises(ValueError):
+        builder.build_aggregate("day", None, ["x"], ["avg"])
+    with pytest.raises(ValueError):
+        builder.build_aggregate("month", "usina", ["x"], ["avg"])
+    with pytest.raises(ValueError):
+        builder.build_aggregate("month", None, ["x"], ["median"])
+
+
+def test_build_aggregate_rejects_non_numeric_metrics() -> None:
+    builder = ReservoirQueryBuilder("p.gold.t", date(2024, 1, 1), date(2024, 1, 31))
+    types = {"nom_reservatorio": "STRING", "ena_armazenavel_res_mwmed": "FLOAT", "codigo": "INTEGER"}
+
+    with pytest.raises(ValueError, match="numeric columns: nom_reservatorio"):
+        builder.build_aggregate("month", None, ["ena_armazenavel_res_mwmed", "nom_reservatorio"], ["avg"], types)
+    query, _ = builder.build_aggregate("month", None, ["ena_armazenavel_res_mwmed", "codigo"], ["sum"], types)
+    assert "SUM(`codigo`) AS sum_codigo" in query
@@ -0,0 +1,99 @@
+import asyncio
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa  # type: ignore[import-untyped]
+
+from services.reservoir_replica import ReservoirReplica
+
+
+ROWS = [
+    {"ena_data": datetime(2024, 1, 2), "nom_reservatorio": "B", "nom_bacia": "GRANDE", "nom_subsistema": "SE", "ena_armazenavel_res_mwmed": 2.0},
+    {"ena_data": datetime(2024, 1, 1), "nom_reservatorio": "A", "nom_bacia": "GRANDE", "nom_subsistema": "SE", "ena_armazenavel_res_mwmed": 1.0},
+    {"ena_data": datetime(2024, 1, 1), "nom_reservatorio": "C", "nom_bacia": "PARANA", "nom_subsistema": "S", "ena_armazenavel_res_mwmed": 3.0},
+    {"ena_data": datetime(2024, 2, 1), "nom_reservatorio": "A", "nom_bacia": "GRANDE", "nom_subsistema": "SE", "ena_armazenavel_res_mwmed": 5.0},
+]
+NO_FILTERS: Dict[str, Optional[str]] = {"nom_reservatorio": None, "nom_bacia": None, "nom_subsistema": None}
+
+
+class FakeAsyncRepository:
+    project_id = "proj"
+
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+
+    async def execute_arrow_query(self, query: str, page_size: int, query_parameters: Any = ()) -> Iterator[Any]:
+        self.queries.append(query)
+        table = pa.Table.from_pylist(ROWS)
+        table = table.set_column(0, "ena_data", table["ena_data"].cast(pa.timestamp("us")))
+        return iter(table.to_batches(max_chunksize=2))
+
+
+def _replica(tmp_path: Any, **kwargs: Any) -> ReservoirReplica:
+    replica = ReservoirReplica(
+        FakeAsyncRepository(), "gold.t", path=str(tmp_path / "replica.parquet"), **kwargs  # type: ignore[arg-type]
+    )
+    asyncio.run(replica.refresh())
+    return replica
+
+
+def test_refresh_writes_snapshot_and_marks_fresh(tmp_path: Any) -> None:
+    replica = _replica(tmp_path)
+
+    assert replica.fresh
+    assert os.path.exists(tmp_path / "replica.parquet")
+    assert replica.repository.queries == ["SELECT * FROM `proj.gold.t`"]  # type: ignore[attr-defined]
+
+    reloaded = ReservoirReplica(replica.repository, "gold.t", path=replica.path)
+    assert reloaded.load() and reloaded.fresh
+    assert reloaded.schema == {
+        "ena_data": "DATETIME",
+        "nom_reservatorio": "STRING",
+        "nom_bacia": "STRING",
+        "nom_subsistema": "STRING",
+        "ena_armazenavel_res_mwmed": "FLOAT",
+    }
+
+
+def test_stale_snapshot_is_not_served(tmp_path: Any) -> None:
+    replica = _replica(tmp_path, max_age_seconds=0.000001)
+
+    assert not replica.fresh
+
+
+def test_query_page_matches_keyset_order_filters_and_projection(tmp_path: Any) -> None:
+    replica = _replica(tmp_path)
+
+    page, total = replica.query_page(date(2024, 1, 1), date(2024, 1, 31), NO_FILTERS, None, 1, 2)
+    assert total == 3
+    assert [(r["ena_data"], r["nom_reservatorio"]) for r in page] == [
+        (datetime(2024, 1, 1), "A"),
+        (datetime(2024, 1, 1), "C"),
+    ]
+
+    after, _ = replica.query_page(
+        date(2024, 1, 1), date(2024, 12, 31), NO_FILTERS, None, 1, 10, cursor=(datetime(2024, 1, 1), "C")
+    )
+    assert [r["nom_reservatorio"] for r in after] == ["B", "A"]
+
+    filtered, total = replica.query_page(
+        date(2024, 1, 1), date(2024, 12, 31), {**NO_FILTERS, "nom_bacia": "GRANDE"}, ["ena_armazenavel_res_mwmed"], 1, 10
+    )
+    assert total == 3
+    assert set(filtered[0]) == {"ena_data", "nom_reservatorio", "ena_armazenavel_res_mwmed"}
+
+
+def test_aggregate_matches_bigquery_aliases(tmp_path: Any) -> None:
+    replica = _replica(tmp_path)
+
+    rows = replica.aggregate(
+        date(2024, 1, 1), date(2024, 12, 31), NO_FILTERS, "month", "subsistema",
+        ["ena_armazenavel_res_mwmed"], ["avg", "count"],
+    )
+
+    assert rows == [
+        {"periodo": datetime(2024, 1, 1), "nom_subsistema": "S", "avg_ena_armazenavel_res_mwmed": 3.0, "count_ena_armazenavel_res_mwmed": 1},
+        {"periodo": datetime(2024, 1, 1), "nom_subsistema": "SE", "avg_ena_armazenavel_res_mwmed": 1.5, "count_ena_armazenavel_res_mwmed": 2},
+        {"periodo": datetime(2024, 2, 1), "nom_subsistema": "SE", "avg_ena_armazenavel_res_mwmed": 5.0, "count_ena_armazenavel_res_mwmed": 1},
+    ]
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from utils.result_cache import LRUResultCache, create_result_cache
+
+
+def test_lru_evicts_least_recently_used_to_fit_byte_cap() -> None:
+    cache = LRUResultCache(max_bytes=10)
+    cache.set("a", b"aaaa", 60)
+    cache.set("b", b"bbbb", 60)
+    assert cache.get("a") == b"aaaa"  # "b" is now the oldest
+
+    cache.set("c", b"cccc", 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+
+
+def test_lru_skips_values_larger_than_cap() -> None:
+    cache = LRUResultCache(max_bytes=4)
+    cache.set("big", b"12345", 60)
+
+    assert cache.get("big") is None
+    assert len(cache) == 0
+
+
+def test_lru_entries_expire() -> None:
+    cache = LRUResultCache(max_bytes=100)
+    cache.set("a", b"x", 0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.size_bytes == 0
+
+
+def test_lru_clear_drops_everything() -> None:
+    cache = LRUResultCache(max_bytes=100)
+    cache.set("a", b"x", 60)
+    cache.clear()
+
+    assert len(cache) == 0 and cache.size_bytes == 0
+
+
+def test_create_result_cache_falls_back_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    import utils.result_cache as mod
+
+    monkeypatch.setenv("RESERVOIR_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setenv("RESERVOIR_CACHE_MAX_BYTES", "2048")
+    monkeypatch.setattr(mod.importlib.util, "find_spec", lambda name: None)
+
+    cache = create_result_cache()
+
+    assert isinstance(cache, LRUResultCache)
+    assert cache.max_bytes == 2048
@@ -0,0 +1,66 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+    runs: List[str] = []
+
+    async def work() -> int:
+        runs.append("run")
+        await asyncio.sleep(0.01)
+        return 7
+
+    async def scenario() -> List[int]:
+        return await asyncio.gather(*(flight.run("k", work) for _ in range(20)))
+
+    assert asyncio.run(scenario()) == [7] * 20
+    assert runs == ["run"]
+    assert flight.executions == 1
+    assert flight.coalesced == 19
+    assert flight.inflight == 0
+
+
+def test_exceptions_reach_every_waiter_and_key_is_released() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    async def boom() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def ok() -> int:
+        return 1
+
+    async def scenario() -> List[object]:
+        results: List[object] = list(
+            await asyncio.gather(flight.run("k", boom), flight.run("k", boom), return_exceptions=True)
+        )
+        results.append(await flight.run("k", ok))
+        return results
+
+    first, second, third = asyncio.run(scenario())
+    assert isinstance(first, RuntimeError) and isinstance(second, RuntimeError)
+    assert third == 1
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    async def slow() -> int:
+        await asyncio.sleep(0.02)
+        return 3
+
+    async def scenario() -> int:
+        first = asyncio.ensure_future(flight.run("k", slow))
+        second = asyncio.ensure_future(flight.run("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == 3
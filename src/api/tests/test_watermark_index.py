@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date, datetime
+from typing import Any, Dict, List
+
+from services.watermark_index import WatermarkIndex
+from utils.ttl_cache import TTLCache
+
+
+class FakeRepo:
+    def __init__(self, watermarks: Dict[int, date]) -> None:
+        self.watermarks = watermarks
+        self.calls: List[str] = []
+
+    def raw_table_watermarks(self, package_name: str) -> Dict[int, date]:
+        self.calls.append(package_name)
+        return self.watermarks
+
+
+def test_watermarks_are_loaded_once_and_cached() -> None:
+    repo = FakeRepo({2020: date(2020, 12, 31)})
+    index = WatermarkIndex(repo, ttl_seconds=60)  # type: ignore[arg-type]
+
+    first = asyncio.run(index.get("pkg"))
+    second = asyncio.run(index.get("pkg"))
+
+    assert first == second == {2020: date(2020, 12, 31)}
+    assert repo.calls == ["pkg"]
+
+    index.invalidate("pkg")
+    asyncio.run(index.get("pkg"))
+    assert repo.calls == ["pkg", "pkg"]
+
+
+def test_is_complete_only_for_fully_ingested_past_years() -> None:
+    index = WatermarkIndex(FakeRepo({}), ttl_seconds=60)  # type: ignore[arg-type]
+    now_year = datetime.now().year
+    watermarks = {
+        2019: date(2019, 12, 31),
+        2020: date(2020, 6, 30),
+        now_year: date(now_year, 12, 31),
+    }
+
+    assert index.is_complete(watermarks, 2019) is True
+    assert index.is_complete(watermarks, 2020) is False
+    assert index.is_complete(watermarks, 2018) is False
+    assert index.is_complete(watermarks, now_year) is False
+
+
+def test_repository_errors_fall_back_to_empty_watermarks() -> None:
+    class BrokenRepo:
+        def raw_table_watermarks(self, package_name: str) -> Any:
+            raise RuntimeError("bigquery down")
+
+    index = WatermarkIndex(BrokenRepo(), ttl_seconds=60)  # type: ignore[arg-type]
+
+    assert asyncio.run(index.get("pkg")) == {}
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=0)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 1
@@ -0,0 +1,93 @@
+import asyncio
+import importlib.util
+import os
+
+import httpx
+
+from utils.logger import LogLevel, log
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport and retries idempotent requests on transient failures
+    (connection/timeout errors, 429 and 5xx) with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self._transport = transport
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def _delay(self, attempt: int, response: httpx.Response | None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(self.max_backoff, float(retry_after))
+        return min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in RETRY_METHODS:
+            return await self._transport.handle_async_request(request)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt, None)
+                log(f"{type(e).__name__} on {request.url}, retrying in {delay:.1f}s", LogLevel.DEBUG)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                delay = self._delay(attempt, response)
+                await response.aclose()
+                log(f"HTTP {response.status_code} on {request.url}, retrying in {delay:.1f}s", LogLevel.DEBUG)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """
+    Build the pooled HTTP client used to talk to the ONS portal.
+
+    Pool size, keep-alive, HTTP/2 and retries come from ``ONS_HTTP_*`` variables.
+    HTTP/2 needs the ``h2`` package and falls back to HTTP/1.1 without it.
+    """
+    http2 = os.environ.get("ONS_HTTP2", "true").lower() == "true"
+    if http2 and importlib.util.find_spec("h2") is None:
+        log("h2 is not installed, falling back to HTTP/1.1", LogLevel.INFO)
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("ONS_HTTP_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.environ.get("ONS_HTTP_MAX_KEEPALIVE", 10)),
+        keepalive_expiry=float(os.environ.get("ONS_HTTP_KEEPALIVE_EXPIRY", 30.0)),
+    )
+    base_transport = transport or httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+    retry_transport = RetryTransport(
+        base_transport,
+        retries=int(os.environ.get("ONS_HTTP_RETRIES", 3)),
+        backoff_factor=float(os.environ.get("ONS_HTTP_BACKOFF", 0.5)),
+    )
+
+    log(
+        f"Creating HTTP client - http2={http2}, max_connections={limits.max_connections}, "
+        f"max_keepalive={limits.max_keepalive_connections}, retries={retry_transport.retries}",
+        LogLevel.DEBUG,
+    )
+    return httpx.AsyncClient(transport=retry_transport, timeout=httpx.Timeout(60.0))
@@ -1,9 +1,13 @@
-import inspect
+import atexit
+import json
 import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 from enum import Enum
-from types import FrameType
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class LogColors:
@@ -19,50 +23,197 @@ class LogColors:
 
 class LogLevel(str, Enum):
     INFO = "INFO"
+    WARNING = "WARNING"
     ERROR = "ERROR"
     DEBUG = "DEBUG"
 
 
+_SEVERITY: dict[LogLevel, int] = {
+    LogLevel.DEBUG: 10,
+    LogLevel.INFO: 20,
+    LogLevel.WARNING: 30,
+    LogLevel.ERROR: 40,
+}
+
+# Other common LOG_LEVEL spellings, mapped to the nearest level
+_LEVEL_ALIASES: dict[str, LogLevel] = {
+    "WARN": LogLevel.WARNING,
+    "CRITICAL": LogLevel.ERROR,
+    "FATAL": LogLevel.ERROR,
+}
+
+_COLOR_MAP: dict[LogLevel, str] = {
+    LogLevel.INFO: LogColors.GREEN,
+    LogLevel.WARNING: LogColors.YELLOW,
+    LogLevel.ERROR: LogColors.RED,
+    LogLevel.DEBUG: LogColors.MAGENTA,
+}
+
+# (created, level, filename, lineno, message): formatted on the writer thread
+_Entry = Tuple[float, LogLevel, str, int, str]
+
+
+def _format_json(entry: _Entry) -> str:
+    created, level, filename, lineno, message = entry
+    # "severity" and "message" are the keys Cloud Logging reads from JSON stdout
+    return json.dumps(
+        {
+            "timestamp": datetime.fromtimestamp(created).isoformat(timespec="milliseconds"),
+            "severity": level.value,
+            "file": filename,
+            "line": lineno,
+            "message": message,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _format_text(entry: _Entry) -> str:
+    created, level, filename, lineno, message = entry
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+    message_color = _COLOR_MAP.get(level, LogColors.RESET)
+    return (
+        f"{LogColors.YELLOW}{timestamp}{LogColors.RESET} | "
+        f"{LogColors.CYAN}{filename}:{lineno}{LogColors.RESET} - "
+        f"[{message_color}{level.value}{LogColors.RESET}] {message}"
+    )
+
+
+class _QueueWriter:
+    """
+    Formats and writes log entries on a daemon thread, so ``log()`` only pays
+    for a queue put. ``flush()`` blocks until everything queued is written.
+
+    A forked child (e.g. a process pool worker) inherits the queue, the lock and
+    a thread object whose thread does not exist there, and may leave through
+    ``os._exit`` without running atexit. It gets fresh state and writes inline.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self, synchronous: bool = False) -> None:
+        self._queue: "queue.Queue[_Entry]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._synchronous = synchronous
+
+    def after_fork_in_child(self) -> None:
+        self._reset(synchronous=True)
+
+    def put(self, entry: _Entry) -> None:
+        if self._synchronous:
+            self._write(entry, flush=True)
+            return
+        if self._thread is None:
+            self._start()
+        self._queue.put(entry)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    @staticmethod
+    def _write(entry: _Entry, flush: bool) -> None:
+        try:
+            formatter = _format_text if _config.text else _format_json
+            # sys.stdout looked up per line, so redirected/captured stdout is honoured
+            sys.stdout.write(formatter(entry) + "\n")
+            if flush:
+                sys.stdout.flush()
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(entry, flush=self._queue.empty())
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+
+def parse_level(value: str) -> Optional[LogLevel]:
+    """The LogLevel named by ``value`` (case-insensitive, aliases included), or None."""
+    name = value.strip().upper()
+    try:
+        return LogLevel(name)
+    except ValueError:
+        return _LEVEL_ALIASES.get(name)
+
+
+class _LoggerConfig:
+    def __init__(self) -> None:
+        self.invalid_level: Optional[str] = None
+        level = parse_level(os.environ.get("LOG_LEVEL", "INFO"))
+        if level is None:
+            # An unknown LOG_LEVEL must not stop every importing module from loading
+            self.invalid_level = os.environ["LOG_LEVEL"]
+            level = LogLevel.INFO
+        self.min_severity = _SEVERITY[level]
+        self.text = os.environ.get("LOG_FORMAT", "json").lower() == "text"
+
+
+_config = _LoggerConfig()
+_writer = _QueueWriter()
+atexit.register(_writer.flush)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer.after_fork_in_child)
+
+
+def set_level(level: LogLevel) -> None:
+    """Change the minimum level at runtime (``LOG_LEVEL`` sets it at startup)."""
+    _config.min_severity = _SEVERITY[level]
+
+
+def set_format(fmt: str) -> None:
+    """``json`` (default, one object per line) or ``text`` (colored, for terminals)."""
+    _config.text = fmt.lower() == "text"
+
+
+def is_enabled(level: LogLevel) -> bool:
+    return _SEVERITY[level] >= _config.min_severity
+
+
+def flush() -> None:
+    """Wait until every queued log line has been written."""
+    _writer.flush()
+
+
 def log(message: str, level: LogLevel = LogLevel.DEBUG) -> None:
     """
-    Prints a formatted log message with timestamp, caller script, line number, and colors.
+    Queues a structured log line with timestamp, caller script, line number and level.
+
+    Levels below ``LOG_LEVEL`` return before any caller lookup or formatting.
 
     Args:
         message (str): The message to log.
         level (LogLevel): The log level (e.g., "INFO", "ERROR", "DEBUG").
-                     This determines the message color.
     """
-    current: Optional[FrameType] = inspect.currentframe()
-    caller_frame: Optional[FrameType] = (
-        current.f_back if current and current.f_back else None
-    )
-
-    if caller_frame is not None:
-        frame_info = inspect.getframeinfo(caller_frame)
-        filename = os.path.basename(frame_info.filename)
-        lineno = frame_info.lineno
-    else:
-        filename = "<unknown>"
-        lineno = 0
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if _SEVERITY[level] < _config.min_severity:
+        return
+    try:
+        caller = sys._getframe(1)
+        filename = os.path.basename(caller.f_code.co_filename)
+        lineno = caller.f_lineno
+    except ValueError:
+        filename, lineno = "<unknown>", 0
+    _writer.put((time.time(), level, filename, lineno, message))
 
-    color_map: dict[LogLevel, str] = {
-        LogLevel.INFO: LogColors.GREEN,
-        LogLevel.ERROR: LogColors.RED,
-        LogLevel.DEBUG: LogColors.MAGENTA,
-    }
-    message_color: str = color_map.get(level, LogColors.RESET)
 
-    print(
-        f"{LogColors.YELLOW}{timestamp}{LogColors.RESET} | "
-        f"{LogColors.CYAN}{filename}:{lineno}{LogColors.RESET} - "
-        f"[{message_color}{level.value}{LogColors.RESET}] {message}"
-    )
+if _config.invalid_level is not None:
+    log(f"Unknown LOG_LEVEL {_config.invalid_level!r}, using INFO", level=LogLevel.WARNING)
 
 
 if __name__ == "__main__":
     print("--- Running Log Examples ---")
+    set_level(LogLevel.DEBUG)
 
     my_variable = 42
     log(
@@ -76,3 +227,4 @@ if __name__ == "__main__":
         log(f"An error occurred: {e}", level=LogLevel.ERROR)
 
     log("This is a debug message for troubleshooting.", level=LogLevel.DEBUG)
+    flush()
@@ -0,0 +1,268 @@
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Prometheus text exposition format, served by GET /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _label_text(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labels, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Current value per label set, either set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        function = self._functions.get(key)
+        return function() if function is not None else self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        return [
+            f"{self.name}{self._label_text(key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts plus sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines: List[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics rendered together on /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metric {metric.name} already registered with another shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = self._register(Counter(name, documentation, labels))
+        assert isinstance(metric, Counter)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        metric = self._register(Gauge(name, documentation, labels))
+        assert isinstance(metric, Gauge)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = self._register(Histogram(name, documentation, labels, buckets))
+        assert isinstance(metric, Histogram)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+EXECUTOR_QUEUE_DEPTH = REGISTRY.gauge(
+    "executor_queue_depth", "Tasks waiting for a worker thread", labels=("executor",)
+)
+EXECUTOR_ACTIVE_TASKS = REGISTRY.gauge(
+    "executor_active_tasks", "Tasks running on a worker thread", labels=("executor",)
+)
+EXECUTOR_MAX_WORKERS = REGISTRY.gauge(
+    "executor_max_workers", "Configured size of the pool", labels=("executor",)
+)
+
+
+def track_executor(name: str, executor: ThreadPoolExecutor, max_workers: int) -> None:
+    """
+    Expose queued and running tasks of ``executor``. ThreadPoolExecutor has no
+    public accessors for these, so they are counted by wrapping its ``submit``
+    (which ``run_in_executor`` and ``to_thread`` go through).
+    """
+    # inc(0), not set(0): other pools tracked under this name may still have tasks
+    EXECUTOR_QUEUE_DEPTH.inc(0, executor=name)
+    EXECUTOR_ACTIVE_TASKS.inc(0, executor=name)
+    EXECUTOR_MAX_WORKERS.set(max_workers, executor=name)
+    submit = executor.submit
+
+    def tracked_submit(fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> "Future[Any]":
+        def run() -> Any:
+            EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+            EXECUTOR_ACTIVE_TASKS.inc(executor=name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                EXECUTOR_ACTIVE_TASKS.dec(executor=name)
+
+        def forget_cancelled(future: "Future[Any]") -> None:
+            # Cancelled while still queued (future.cancel(), cancel_futures): run() never starts
+            if future.cancelled():
+                EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+
+        EXECUTOR_QUEUE_DEPTH.inc(executor=name)
+        try:
+            future = submit(run)
+        except BaseException:
+            EXECUTOR_QUEUE_DEPTH.dec(executor=name)
+            raise
+        future.add_done_callback(forget_cancelled)
+        return future
+
+    executor.submit = tracked_submit  # type: ignore[method-assign]
@@ -0,0 +1,69 @@
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import REGISTRY
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers were sent, per route template",
+    labels=("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "Requests currently being handled", labels=("method",)
+)
+
+
+def _route_template(scope: Scope) -> str:
+    # FastAPI's router stores the matched route in the scope; unmatched paths
+    # share one label so random 404 URLs cannot explode the series count
+    route: Any = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency and in-flight requests.
+
+    Latency stops at ``http.response.start``, so a streamed export is measured
+    until its first byte rather than for the whole download.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status = "500"
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    method=method,
+                    route=_route_template(scope),
+                    status=status,
+                )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                record()
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method)
+            record()
@@ -0,0 +1,125 @@
+import importlib.util
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from utils.logger import LogLevel, log
+
+
+class ResultCache(ABC):
+    """Byte-valued cache for serialized query results, with per-entry TTL."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry owned by this cache."""
+        raise NotImplementedError
+
+
+class LRUResultCache(ResultCache):
+    """
+    In-process LRU bounded by the total size of the stored payloads.
+
+    Entries larger than ``max_bytes`` are never stored; inserting evicts the
+    least recently used entries until the new one fits.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes:
+            log(f"Result of {len(value)} bytes exceeds cache cap, not caching", LogLevel.DEBUG)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            while self._entries and self._size + len(value) > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._size += len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisResultCache(ResultCache):
+    """Shared cache on any Redis-compatible server; keys live under ``prefix``."""
+
+    def __init__(self, url: str, prefix: str = "reservoir:") -> None:
+        import redis  # type: ignore[import-not-found, import-untyped, unused-ignore]
+
+        self.prefix = prefix
+        self._client: Any = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._client.get(self.prefix + key)
+        return bytes(value) if value is not None else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._client.set(self.prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+
+def create_result_cache() -> ResultCache:
+    """
+    Build the result cache from ``RESERVOIR_CACHE_*`` variables.
+
+    ``RESERVOIR_CACHE_REDIS_URL`` selects the Redis backend (needs the ``redis``
+    package); otherwise, or when it cannot be used, an in-process LRU capped at
+    ``RESERVOIR_CACHE_MAX_BYTES`` is returned.
+    """
+    redis_url = os.environ.get("RESERVOIR_CACHE_REDIS_URL")
+    if redis_url:
+        if importlib.util.find_spec("redis") is None:
+            log("redis is not installed, falling back to in-memory result cache", LogLevel.INFO)
+        else:
+            try:
+                return RedisResultCache(redis_url)
+            except Exception as e:
+                log(f"Could not connect result cache to Redis: {e}", LogLevel.ERROR)
+
+    return LRUResultCache(int(os.environ.get("RESERVOIR_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Collapses concurrent calls with the same key onto one execution.
+
+    The first caller starts ``factory()`` as a task; callers arriving while it
+    runs await the same task and get the same result (or exception). The key
+    is released as soon as the task finishes, so later calls run again. A
+    cancelled waiter does not cancel the shared task for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[K, "asyncio.Task[T]"] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def _release(self, key: K, task: "asyncio.Task[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every waiter went away
+
+    async def run(self, key: K, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
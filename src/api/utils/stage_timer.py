@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+from pydantic import BaseModel
+
+from utils.metrics import REGISTRY
+
+STAGE_DURATION = REGISTRY.histogram(
+    "ons_ingestion_stage_duration_seconds",
+    "Duration of each ONS ingestion stage per resource",
+    labels=("package", "stage"),
+)
+STAGE_BYTES_IN = REGISTRY.counter(
+    "ons_ingestion_stage_bytes_in_total",
+    "Bytes consumed by each ONS ingestion stage",
+    labels=("package", "stage"),
+)
+STAGE_BYTES_OUT = REGISTRY.counter(
+    "ons_ingestion_stage_bytes_out_total",
+    "Bytes produced by each ONS ingestion stage",
+    labels=("package", "stage"),
+)
+STAGE_ROWS = REGISTRY.counter(
+    "ons_ingestion_stage_rows_total",
+    "Rows handled by each ONS ingestion stage",
+    labels=("package", "stage"),
+)
+
+
+class StageTiming(BaseModel):
+    stage: str
+    duration_seconds: float = 0.0
+    bytes_in: int | None = None
+    bytes_out: int | None = None
+    rows: int | None = None
+
+
+class StageRecorder:
+    """
+    Collects the StageTiming of each pipeline step of one resource.
+
+    Plain data, so a recorder can run inside an IngestionExecutor worker
+    process and its ``stages`` be shipped back with the result; metrics are
+    only published by ``observe_stages`` in the API process.
+    """
+
+    def __init__(self) -> None:
+        self.stages: List[StageTiming] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTiming]:
+        """Time the block; the caller fills bytes/rows on the yielded timing."""
+        timing = StageTiming(stage=name)
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.duration_seconds = time.perf_counter() - started
+            self.stages.append(timing)
+
+    def extend(self, stages: Iterable[StageTiming]) -> None:
+        self.stages.extend(stages)
+
+
+def observe_stages(package: str, stages: Iterable[StageTiming]) -> None:
+    for timing in stages:
+        labels = {"package": package, "stage": timing.stage}
+        STAGE_DURATION.observe(timing.duration_seconds, **labels)
+        if timing.bytes_in:
+            STAGE_BYTES_IN.inc(timing.bytes_in, **labels)
+        if timing.bytes_out:
+            STAGE_BYTES_OUT.inc(timing.bytes_out, **labels)
+        if timing.rows:
+            STAGE_ROWS.inc(timing.rows, **labels)
+
+
+def summarize_stages(stages: Iterable[StageTiming]) -> List[StageTiming]:
+    """Per-stage totals across resources, in first-seen order."""
+    totals: Dict[str, StageTiming] = {}
+    for timing in stages:
+        total = totals.setdefault(timing.stage, StageTiming(stage=timing.stage))
+        total.duration_seconds += timing.duration_seconds
+        for field in ("bytes_in", "bytes_out", "rows"):
+            value = getattr(timing, field)
+            if value is not None:
+                setattr(total, field, (getattr(total, field) or 0) + value)
+    return list(totals.values())